@@ -1,17 +1,60 @@
 import io
 import math
+import os
+from functools import partial
 import pandas as pd
 import streamlit as st
 from datetime import date
 
 # Local imports
-from src.config import load_all, load_employees_from_csv
-from src.scheduler import build_and_solve
-from src.postprocess import build_formatted_workbook_bytes
+from src.config import load_all, load_employees_from_csv, parse_shift_list, shift_masks_from
+from src.solve_cache import cached_build_and_solve
+from src.jobs import SolveJob
+from src.service import RemoteSolveJob, ServiceError
+from src.scheduler import describe_status, explain_infeasibility, history_span, history_tail
+from src.precheck import run_prechecks
+from src.postprocess import EXPORTERS, export_schedule, load_schedule_table
+from src.aggregate import schedule_digest, schedule_frame, summarize
 
 # Page Config
 st.set_page_config(page_title="교대근무 스케줄러", page_icon="🗓️", layout="wide")
 
+# --- 재실행(rerun) 캐시 ---
+# 위젯을 건드릴 때마다 스크립트 전체가 다시 실행되므로, 입력이 같으면 업로드 파싱/보고서 생성을 건너뜀
+# (설정 파일은 src.config 가 mtime/내용 해시 기준으로 캐시)
+@st.cache_data(max_entries=8, show_spinner=False)
+def _parse_uploaded_table(name, data):
+    buf = io.BytesIO(data)
+    buf.name = name  # load_schedule_table 이 확장자로 형식 판단
+    return load_schedule_table(buf)
+
+def uploaded_table(file):
+    """업로드한 근무표 → dict (같은 파일 내용이면 다시 읽지 않음)"""
+    return _parse_uploaded_table(file.name, file.getvalue())
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def result_tables(schedule_key, _schedule, hours_map, base_month_hours):
+    """
+    결과 화면용 근무표/집계 표.
+    (근무표 해시, 시간표, 기준 월 소정근로시간)이 같으면 다시 만들지 않음 (_schedule 은 키에서 제외)
+    """
+    summary = summarize(_schedule, hours_map, int(base_month_hours))
+    return {
+        "table": schedule_frame(_schedule, "name"),
+        "employee_summary": summary.employee_frame("name"),
+        "day_summary": summary.day_frame(),
+    }
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def export_file(fmt, schedule_key, _schedule, hours_map, month_start, base_month_hours):
+    """다운로드 파일 bytes. 버튼을 누를 때 처음 만들고, 같은 (형식, 근무표 해시, 월 설정)이면 재사용"""
+    return export_schedule(
+        _schedule, fmt, hours_map,
+        month_title=f"{month_start.year}년 {month_start.month}월 근무명령서",
+        start_date=month_start,
+        base_month_hours=int(base_month_hours),
+    )
+
 # --- 보안 접속 설정 ---
 def check_password():
     """로그인 상태를 확인하고 비밀번호 입력창을 표시합니다."""
@@ -71,10 +114,11 @@ with st.sidebar:
     # Determine employees list here to calculate defaults for next inputs
     current_employees_obj = default_employees_obj
     if source == "파일 업로드":
-        uploaded_emps = st.file_uploader("직원 CSV 업로드 (name,team,role)", type=["csv"])
+        uploaded_emps = st.file_uploader("직원 CSV 업로드 (name,team,role[,forbidden_shifts])", type=["csv"])
         if uploaded_emps is not None:
             emp_df = pd.read_csv(uploaded_emps)
-            current_employees_obj = [type(default_employees_obj[0])(name=str(r["name"]), team=r.get("team"), role=r.get("role"))
+            current_employees_obj = [type(default_employees_obj[0])(name=str(r["name"]), team=r.get("team"), role=r.get("role"),
+                                                                    forbidden_shifts=parse_shift_list(r.get("forbidden_shifts")))
                                      for _, r in emp_df.iterrows() if str(r.get("name", "")).strip()]
     
     employees_all = [e.name for e in current_employees_obj]
@@ -126,6 +170,12 @@ with st.sidebar:
         default=[],
         help="여기 선택된 직원은 1일차에 반드시 '주휴' 또는 '휴가'가 배정됩니다."
     )
+    history_file = st.file_uploader(
+        "전월 근무표 (경계 이력, 선택)", type=["xlsx", "csv"], key="history_file",
+        help="원시 엑셀/CSV (직원, D1..Dn)의 마지막 며칠을 1일 이전 근무로 반영해, 월초에 걸치는 "
+             "N 후 휴무·주간 근무시간·연속 근무/휴무 규칙을 전월과 이어서 적용합니다.",
+    )
+    prev_table = uploaded_table(history_file) if history_file is not None else None
 
     # (NEW) N 근무 후 최소 휴무 설정 (전체/개별)
     st.header("🛏️ N 근무 후 휴식 설정")
@@ -152,6 +202,20 @@ with st.sidebar:
         employees,
         help="여기 선택된 인원들끼리는 같은 날 동시에 N(야간) 근무에 들어가지 않습니다. (최대 1명만 배치)"
     )
+    # 직원별 금지 시프트 (CSV forbidden_shifts 열) + 야간 제외 선택
+    shift_masks = {e: m for e, m in shift_masks_from(current_employees_obj).items() if e in employees}
+    no_night = st.multiselect(
+        "야간(N) 근무 제외 직원",
+        employees,
+        default=[e for e, m in shift_masks.items() if "N" in m],
+        help="선택된 직원에게는 N 이 배정되지 않으며, 직원별 최소 야간 횟수 대상에서도 빠집니다."
+    )
+    for e in employees:
+        rest = [s for s in shift_masks.get(e, []) if s != "N"] + (["N"] if e in no_night else [])
+        if rest:
+            shift_masks[e] = rest
+        else:
+            shift_masks.pop(e, None)
 
     # (NEW) 고급 설정 (제약 완화)
     with st.expander("⚙️ 고급 제약 조건 설정 (제약 완화)"):
@@ -177,6 +241,53 @@ with st.sidebar:
     rules.constraints["min_night_shifts_per_employee"] = c_min_n
     rules.constraints["max_night_shifts_per_employee"] = c_max_n
 
+    # (NEW) 솔버 예산 / 조기 종료
+    with st.expander("⏱️ 솔버 설정 (시간/조기 종료)"):
+        def_solver = rules.solver
+        s_time = st.number_input("최대 풀이 시간(초)", min_value=1, max_value=600,
+                                 value=int(def_solver.get("max_time_in_seconds", 60)), step=5)
+        s_workers = st.number_input("탐색 워커 수", min_value=1, max_value=64,
+                                    value=int(def_solver.get("num_search_workers", 8)), step=1)
+        s_rel_gap = st.number_input("상대 gap 목표(%)", min_value=0.0, max_value=100.0,
+                                    value=float(def_solver.get("relative_gap_limit", 0)) * 100, step=1.0,
+                                    help="현재 해와 하한의 차이가 이 비율 이하가 되면 종료합니다. 0이면 사용 안 함")
+        s_abs_gap = st.number_input("절대 gap 목표", min_value=0.0, max_value=100000.0,
+                                    value=float(def_solver.get("absolute_gap_limit", 0)), step=1.0)
+        s_stall = st.number_input("개선 없음 N초 후 종료", min_value=0, max_value=600,
+                                  value=int(def_solver.get("stall_seconds", 0)), step=5,
+                                  help="마지막으로 더 좋은 해를 찾은 뒤 이 시간 동안 개선이 없으면 종료합니다. 0이면 사용 안 함")
+        service_url = st.text_input(
+            "스케줄링 서비스 URL (선택)", value=os.environ.get("SCHEDULER_SERVICE_URL", ""),
+            placeholder="예: http://127.0.0.1:8765",
+            help="지정하면 이 앱에서 직접 풀지 않고 로컬 스케줄링 서비스(python -m src.service)의 대기열로 보냅니다. "
+                 "여러 사람이 동시에 생성해도 서비스의 작업자 수/코어 수 안에서 차례로 풉니다.",
+        ).strip()
+    solver_options = {
+        "max_time_in_seconds": float(s_time),
+        "num_search_workers": int(s_workers),
+        "relative_gap_limit": float(s_rel_gap) / 100.0,
+        "absolute_gap_limit": float(s_abs_gap),
+        "stall_seconds": float(s_stall),
+    }
+
+    # (NEW) 초기해 힌트: 직전 결과나 전월 근무표로 탐색 시작점을 잡아 첫 해를 빨리 찾음
+    st.header("⚡ 초기해 힌트")
+    hint_source = st.radio(
+        "힌트 소스",
+        ["사용 안 함", "직전 생성 결과", "전월 근무표 파일"],
+        index=1 if st.session_state.get("schedule_result") else 0,
+        help="비슷한 근무표에서 출발하면 짧은 시간 안에 좋은 해를 찾기 쉽습니다. (일자는 D1부터 같은 순서로 대응)",
+    )
+    hint_schedule = None
+    if hint_source == "직전 생성 결과":
+        hint_schedule = st.session_state.get("schedule_result") or None
+        if hint_schedule is None:
+            st.caption("아직 생성 결과가 없어 힌트 없이 실행합니다.")
+    elif hint_source == "전월 근무표 파일":
+        hint_file = st.file_uploader("원시 엑셀/CSV (직원, D1..Dn)", type=["xlsx", "csv"])
+        if hint_file is not None:
+            hint_schedule = uploaded_table(hint_file)
+
     run_btn = st.button("🚀 스케줄 생성")
 
 # ----- Main Content -----
@@ -193,85 +304,159 @@ if employees:
     
     # Execution
 
+def schedule_to_df(schedule):
+    return schedule_frame(schedule, "name")
+
 # Execution
+# 풀이는 백그라운드 스레드(SolveJob)에서 진행하고, 아래 fragment가 1초마다 진행 상황을 갱신
 if run_btn:
     if len(employees) < 3:
         st.warning("직원 수가 너무 적습니다. 정상적인 스케줄 생성이 어려울 수 있습니다.")
 
-    with st.spinner("스케줄을 생성 중입니다..."):
-        # Update global rule based on UI selection
-        rules.constraints["min_off_after_N"] = global_min_off
-        
-        schedule, status = build_and_solve(
-            employees=employees,
-            horizon=int(horizon),
-            hours=rules.hours,
-            constraints=rules.constraints,
-            weights=rules.weights,
-            demand=demand,
-            vacations=vacations,
-            workers_per_day=int(exact_workers) if exact_workers not in (None, 0) else None,
-            min_workers_per_day=int(min_workers) if use_range and min_workers not in (None, 0) else None,
-            max_workers_per_day=int(max_workers) if use_range and max_workers not in (None, 0) else None,
-            forbid_free_vac=True,
-            prev_n_employees=prev_n_emps,
-            min_off_overrides=overrides, # Pass overrides
-            incompatible_employees=incompatible_group,
-        )
-        
-        # Save to session state
-        st.session_state["schedule_result"] = schedule
-        st.session_state["status_result"] = status
+    # Update global rule based on UI selection
+    rules.constraints["min_off_after_N"] = global_min_off
+
+    prev_job = st.session_state.get("solve_job")
+    if prev_job is not None and not prev_job.done:
+        prev_job.cancel()
+
+    solve_kwargs = dict(
+        employees=employees,
+        horizon=int(horizon),
+        hours=rules.hours,
+        constraints=dict(rules.constraints),
+        weights=rules.weights,
+        demand=demand,
+        vacations=vacations,
+        workers_per_day=int(exact_workers) if exact_workers not in (None, 0) else None,
+        min_workers_per_day=int(min_workers) if use_range and min_workers not in (None, 0) else None,
+        max_workers_per_day=int(max_workers) if use_range and max_workers not in (None, 0) else None,
+        forbid_free_vac=True,
+        prev_n_employees=prev_n_emps,
+        min_off_overrides=overrides, # Pass overrides
+        incompatible_employees=incompatible_group,
+        shift_masks=shift_masks,
+        history=history_tail(prev_table, history_span(rules.constraints, overrides)) if prev_table else None,
+        hint_schedule=hint_schedule,
+        solver_options=solver_options,
+    )
+    # 산술 사전 점검: 명백히 해가 없으면 솔버를 돌리지 않음
+    model_kwargs = {k: v for k, v in solve_kwargs.items() if k not in ("hint_schedule", "solver_options")}
+    violations = run_prechecks(**model_kwargs)
+    if violations:
+        st.session_state["schedule_result"] = {}
+        st.session_state["status_result"] = "INFEASIBLE"
+        st.session_state["stats_result"] = None
+        st.session_state["solve_error"] = None
+        st.session_state["conflicts_result"] = []
+        st.session_state["precheck_result"] = violations
+        st.session_state["just_finished"] = True
+    else:
+        st.session_state["precheck_result"] = []
+        # 해가 없으면 원인 진단(최대 30초)도 풀이 작업에 이어서 백그라운드/서비스 작업자에서 실행
+        if service_url:
+            try:
+                st.session_state["solve_job"] = RemoteSolveJob(service_url, solve_kwargs, explain=True).start()
+            except ServiceError as exc:
+                st.error(f"스케줄링 서비스에 작업을 보내지 못했습니다: {exc}")
+        else:
+            diagnose = partial(explain_infeasibility, **model_kwargs)
+            st.session_state["solve_job"] = SolveJob(cached_build_and_solve, solve_kwargs, diagnose=diagnose).start()
+
+@st.fragment(run_every=1.0 if "solve_job" in st.session_state else None)
+def solve_progress():
+    job = st.session_state.get("solve_job")
+    if job is None:
+        return
+    try:
+        snap = job.snapshot()
+    except ServiceError as exc:
+        # 서비스 연결이 끊기면 작업을 실패로 정리
+        st.session_state.update(schedule_result={}, status_result="ERROR", stats_result=None,
+                                solve_error=str(exc), conflicts_result=[], just_finished=True)
+        del st.session_state["solve_job"]
+        st.rerun()
+    if snap["done"]:
+        # Save to session state → 전체 화면 다시 그리기
+        st.session_state["schedule_result"] = job.schedule
+        st.session_state["status_result"] = job.status
+        st.session_state["stats_result"] = job.stats
+        st.session_state["solve_error"] = job.error
+        st.session_state["conflicts_result"] = job.conflicts
+        st.session_state["just_finished"] = True
+        del st.session_state["solve_job"]
+        st.rerun()
+
+    if snap.get("state") == "queued":
+        st.info(f"⏳ 스케줄링 서비스 대기열 {snap['position']}번째입니다...")
+    elif snap.get("diagnosing"):
+        st.info(f"⏳ 해가 없어 원인을 분석 중입니다... {snap['elapsed']}초 경과")
+    else:
+        st.info(f"⏳ 스케줄을 생성 중입니다... {snap['elapsed']}초 경과 · 찾은 해 {len(snap['history'])}개")
+    if st.button("⏹ 중단하고 현재 최선 사용", disabled=snap["cancelled"]):
+        job.cancel()
+    if snap["history"]:
+        st.caption(f"현재 최선 목적값: {snap['best_objective']:.0f} (낮을수록 좋음)")
+        st.line_chart(pd.DataFrame(snap["history"]).set_index("t"))
+    if snap["best_schedule"]:
+        st.dataframe(schedule_to_df(snap["best_schedule"]))
+
+solve_progress()
 
 # Check if result exists in session state
-if "schedule_result" in st.session_state and "status_result" in st.session_state:
+if "schedule_result" in st.session_state and "status_result" in st.session_state and "solve_job" not in st.session_state:
     schedule = st.session_state["schedule_result"]
     status = st.session_state["status_result"]
+    just_finished = st.session_state.pop("just_finished", False)
 
     if schedule and status in ("OPTIMAL", "FEASIBLE"):
-        if run_btn:
-             st.success(f"해 상태: {status}")
+        status_label = describe_status(status, st.session_state.get("stats_result"))
+        if just_finished:
+             st.success(f"해 상태: {status_label}")
         else:
-             st.info(f"이전 생성 결과 (상태: {status})")
+             st.info(f"이전 생성 결과 (상태: {status_label})")
         
+        # 표/집계는 근무표·기준 시간이 바뀔 때만 다시 생성
+        schedule_key = schedule_digest(schedule)
+        tables = result_tables(schedule_key, schedule, rules.hours, int(base_month_hours))
+
         # Display DataFrame
-        rows = []
-        for e, days in schedule.items():
-            row = {"name": e}
-            for i, s in enumerate(days):
-                row[f"D{i+1}"] = s
-            rows.append(row)
-        df = pd.DataFrame(rows)
-        st.dataframe(df)
-
-        # 1) Raw Excel
-        raw_buf = io.BytesIO()
-        with pd.ExcelWriter(raw_buf, engine="openpyxl") as writer:
-            df.to_excel(writer, index=False, sheet_name="schedule")
-        raw_buf.seek(0)
-        col1, col2 = st.columns(2)
-        with col1:
-            st.download_button(
-                label="⬇️ 원시 엑셀 다운로드",
-                data=raw_buf,
-                file_name="schedule_raw.xlsx",
-                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            )
-        # 2) Report Excel
-        pretty_bytes = build_formatted_workbook_bytes(
-            schedule=schedule,
-            hours_map=rules.hours,
-            month_title=f"{month_start.year}년 {month_start.month}월 근무명령서",
-            start_date=month_start,
-            base_month_hours=int(base_month_hours),
-        )
-        with col2:
-            st.download_button(
-                label="⬇️ 보고서형 엑셀 다운로드",
-                data=pretty_bytes,
-                file_name=f"근무명령서_{month_start.year}-{month_start.month:02d}.xlsx",
-                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            )
+        st.dataframe(tables["table"])
+        with st.expander("📊 직원별/일자별 집계"):
+            st.dataframe(tables["employee_summary"], hide_index=True)
+            st.dataframe(tables["day_summary"])
+
+        # 다운로드: 파일은 버튼을 눌렀을 때 생성 (엑셀 2종 + 급여/인트라넷 연동용 CSV/JSON/Parquet)
+        ym = f"{month_start.year}-{month_start.month:02d}"
+        file_names = {"excel": "schedule_raw.xlsx", "report": f"근무명령서_{ym}.xlsx"}
+        cols = st.columns(len(EXPORTERS))
+        for col, exp in zip(cols, EXPORTERS.values()):
+            with col:
+                st.download_button(
+                    label=f"⬇️ {exp.label} 다운로드",
+                    data=partial(export_file, exp.name, schedule_key, schedule, rules.hours, month_start, int(base_month_hours)),
+                    file_name=file_names.get(exp.name, f"schedule_{ym}{exp.suffix}"),
+                    mime=exp.mime,
+                    key=f"download_{exp.name}",
+                )
     else:
         st.error(f"스케줄 생성 실패 (Status: {status})")
-        st.error("힌트: 하루 근무 인원 최소/최대 범위를 넓히거나, 제약조건을 완화해보세요.")
\ No newline at end of file
+        conflicts = st.session_state.get("conflicts_result") or []
+        precheck = st.session_state.get("precheck_result") or []
+        if st.session_state.get("solve_error"):
+            st.code(st.session_state["solve_error"])
+        elif precheck:
+            st.error("사전 점검에서 해가 없음이 확인되어 솔버를 실행하지 않았습니다. 아래 항목을 모두 해소해 주세요.")
+            st.dataframe(pd.DataFrame([v.as_row() for v in precheck]), hide_index=True)
+        elif conflicts:
+            st.error("아래 규칙/입력은 함께 만족할 수 없습니다. 이 중 하나 이상을 완화해 주세요.")
+            st.dataframe(pd.DataFrame([c.as_row() for c in conflicts]), hide_index=True)
+        else:
+            st.error("힌트: 하루 근무 인원 최소/최대 범위를 넓히거나, 제약조건을 완화해보세요.")
+
+    # 모델/솔버 통계 (느린 제약 파악용)
+    stats = st.session_state.get("stats_result")
+    if stats is not None:
+        with st.expander("📊 모델/솔버 통계"):
+            st.dataframe(pd.DataFrame(stats.summary_rows()).astype({"value": str}), hide_index=True)
+            st.dataframe(pd.DataFrame(stats.family_rows()), hide_index=True)
\ No newline at end of file
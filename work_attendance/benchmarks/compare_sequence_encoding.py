@@ -0,0 +1,63 @@
+"""
+순서 규칙 인코딩 비교: linear(규칙별 슬라이딩 부등식) vs automaton(직원별 AddAutomaton)
+
+실행 (work_attendance 폴더에서):
+    python benchmarks/compare_sequence_encoding.py --time-limit 60 --workers 8
+
+기본 인스턴스: configs/employees.csv 앞 16명, 28일/31일, 하루 근무 인원은 앱 권장 범위.
+인코딩마다 모델 크기, 생성 시간, 첫 해까지 시간, 목적값/하한을 표로 출력한다.
+"""
+import argparse
+import math
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.config import load_all  # noqa: E402
+from src.scheduler import SEQUENCE_ENCODINGS, build_and_solve  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description="sequence_encoding 벤치마크")
+    parser.add_argument("--employees", type=int, default=16, help="사용할 직원 수 (employees.csv 앞에서부터)")
+    parser.add_argument("--horizons", type=str, default="28,31", help="쉼표로 구분한 계획 일수 목록")
+    parser.add_argument("--time-limit", type=float, default=60.0, help="인스턴스/인코딩당 풀이 시간(초)")
+    parser.add_argument("--workers", type=int, default=8, help="CP-SAT 탐색 워커 수")
+    parser.add_argument("--seed", type=int, default=0, help="random_seed")
+    args = parser.parse_args()
+
+    rules, emps, _, vacations = load_all()
+    names = [e.name for e in emps][: args.employees]
+    center = len(names) * 5 / 7
+    lo, hi = max(0, math.floor(center - 1.5)), math.ceil(center + 1.5)
+
+    header = f"{'H':>3} {'encoding':<10}{'status':<10}{'vars':>7}{'cons':>7}{'build_s':>9}{'first_s':>9}{'wall_s':>8}{'objective':>11}{'bound':>9}"
+    print(f"직원 {len(names)}명, 하루 {lo}~{hi}명, 제한 {args.time_limit:g}초, 워커 {args.workers}")
+    print(header)
+    for horizon in [int(h) for h in args.horizons.split(",") if h.strip()]:
+        for enc in SEQUENCE_ENCODINGS:
+            _, status, stats = build_and_solve(
+                names, horizon, rules.hours,
+                dict(rules.constraints, sequence_encoding=enc),
+                rules.weights,
+                vacations=vacations,
+                min_workers_per_day=lo,
+                max_workers_per_day=hi,
+                collect_stats=True,
+                reuse_model=False,
+                solver_options={
+                    "max_time_in_seconds": args.time_limit,
+                    "num_search_workers": args.workers,
+                    "random_seed": args.seed,
+                },
+            )
+            first = "-" if stats.first_solution_seconds is None else f"{stats.first_solution_seconds:.2f}"
+            obj = "-" if stats.objective is None else f"{stats.objective:g}"
+            bound = "-" if stats.best_bound is None else f"{stats.best_bound:g}"
+            print(f"{horizon:>3} {enc:<10}{status:<10}{stats.num_variables:>7}{stats.num_constraints:>7}"
+                  f"{stats.build_seconds:>9.3f}{first:>9}{stats.wall_time:>8.1f}{obj:>11}{bound:>9}")
+
+
+if __name__ == "__main__":
+    main()
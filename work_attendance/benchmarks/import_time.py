@@ -0,0 +1,115 @@
+"""
+시작 시간 회귀 점검: 진입 모듈마다 `python -X importtime -c "import <모듈>"` 을 새 프로세스로 실행해
+- 누적 import 시간이 예산(ms) 이내인지
+- 그 경로에서 쓰지 않는 무거운 의존성(ortools, pandas, openpyxl, xlsxwriter, 일부 경로는 numpy)을 불러오지 않는지
+- import 만으로 outputs 아래 폴더가 생기지 않는지
+확인하고, `python -m src.cli --help` 전체 실행 시간도 예산과 비교한다.
+
+실행 (work_attendance 폴더에서):
+    python benchmarks/import_time.py                 # 예산 초과/금지 모듈이 있으면 종료 코드 1
+    python benchmarks/import_time.py --scale 2 --top 10   # 느린 머신: 예산 2배, 느린 모듈 10개 출력
+
+시간은 머신마다 다르므로 예산은 여유 있게 잡고, 금지 모듈 검사는 머신과 무관하게 항상 같은 결과가 나온다.
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+OUTPUT_DIR = os.path.join(BASE_DIR, "outputs")
+
+HEAVY = ("ortools", "pandas", "openpyxl", "xlsxwriter")
+# 근무표 배열(ScheduleMatrix)을 다루지 않는 경로는 numpy 도 불러오지 않아야 함
+LIGHT = HEAVY + ("numpy",)
+
+# (진입 모듈, 불러오면 안 되는 최상위 패키지, 누적 import 예산 ms)
+ENTRY_POINTS = [
+    ("src.cli", LIGHT, 50),
+    ("src.config", LIGHT, 150),
+    ("src.precheck", LIGHT, 150),
+    ("src.validators", HEAVY, 200),
+    ("src.batch", HEAVY, 200),
+    ("src.service", LIGHT, 150),
+    ("src.aggregate", HEAVY, 200),
+    ("src.postprocess", ("ortools", "openpyxl", "xlsxwriter"), 800),
+]
+HELP_BUDGET_MS = 500
+
+
+def import_profile(module):
+    """새 프로세스에서 module import → ({모듈: 누적 µs}, 전체 누적 ms)"""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BASE_DIR, capture_output=True, text=True, timeout=120,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"import {module} 실패:\n{proc.stderr[-2000:]}")
+    cumulative = {}
+    for line in proc.stderr.splitlines():
+        # "import time:   self [us] | cumulative | imported package"
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        _, _, cum_us, name = (p.strip() for p in line.replace("import time:", "|", 1).split("|"))
+        cumulative[name] = int(cum_us)
+    return cumulative, cumulative.get(module, 0) / 1000
+
+
+def output_dirs():
+    """outputs 아래 폴더 목록 (import 전후 비교용)"""
+    if not os.path.isdir(OUTPUT_DIR):
+        return set()
+    return {root for root, _, _ in os.walk(OUTPUT_DIR)}
+
+
+def check_entry(module, forbidden, budget_ms, top):
+    before = output_dirs()
+    cumulative, total_ms = import_profile(module)
+    created = sorted(output_dirs() - before)
+    loaded = sorted({n.split(".")[0] for n in cumulative} & set(forbidden))
+    ok = total_ms <= budget_ms and not loaded and not created
+    print(f"{module:<18}{total_ms:>9.1f}{budget_ms:>9}  {'OK' if ok else '실패'}"
+          + (f"  금지 모듈: {', '.join(loaded)}" if loaded else "")
+          + (f"  생성된 폴더: {', '.join(os.path.relpath(d, BASE_DIR) for d in created)}" if created else ""))
+    if top:
+        heavy = sorted(((us, n) for n, us in cumulative.items() if n != module and "." not in n), reverse=True)
+        for us, n in heavy[:top]:
+            print(f"{'':<4}{n:<30}{us / 1000:>9.1f} ms")
+    return ok
+
+
+def check_help(budget_ms):
+    """python -m src.cli --help 전체 실행 시간 (인터프리터 시작 포함, 3회 중 최솟값)"""
+    best = None
+    for _ in range(3):
+        t0 = time.perf_counter()
+        proc = subprocess.run([sys.executable, "-m", "src.cli", "--help"], cwd=BASE_DIR,
+                              capture_output=True, text=True, timeout=120)
+        wall = (time.perf_counter() - t0) * 1000
+        if proc.returncode != 0:
+            print(f"--help 실패:\n{proc.stderr[-2000:]}")
+            return False
+        best = wall if best is None else min(best, wall)
+    ok = best <= budget_ms
+    print(f"{'cli --help':<18}{best:>9.1f}{budget_ms:>9}  {'OK' if ok else '실패'}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="import 시간 회귀 점검")
+    parser.add_argument("--scale", type=float, default=1.0, help="예산 배율 (느린 머신/CI)")
+    parser.add_argument("--top", type=int, default=0, help="진입 모듈마다 누적 시간이 큰 최상위 패키지 N개 출력")
+    args = parser.parse_args()
+
+    print(f"{'module':<18}{'ms':>9}{'budget':>9}")
+    failures = 0
+    for module, forbidden, budget in ENTRY_POINTS:
+        failures += 0 if check_entry(module, forbidden, round(budget * args.scale), args.top) else 1
+    failures += 0 if check_help(round(HELP_BUDGET_MS * args.scale)) else 1
+    print(f"실패 {failures}건")
+    return failures
+
+
+if __name__ == "__main__":
+    sys.exit(1 if main() else 0)
@@ -0,0 +1,242 @@
+"""
+규모별 벤치마크: 시드 고정 합성 인스턴스(직원 수 × 계획 일수 × 휴가 밀도 × 규칙 조합)를 build_and_solve 로 풀고
+모델 생성 시간, 최대 메모리(peak RSS), 첫 해까지 시간, 최종 목적값/하한/gap 을 기록한다.
+결과는 JSON 이력 파일에 실행 단위로 누적되어, 인코딩/솔버 설정 변경 전후를 같은 사례끼리 비교할 수 있다.
+
+실행 (work_attendance 폴더에서):
+    python benchmarks/scaling.py                                   # 기본 격자
+    python benchmarks/scaling.py --employees 16,50 --horizons 28 --time-limit 10 --label "automaton 시험"
+    python benchmarks/scaling.py --toggles default,automaton --compare   # 직전 실행과 사례별 비교
+
+각 사례는 별도 프로세스(spawn)에서 풀어 peak RSS 가 사례마다 따로 측정된다.
+"""
+import argparse
+import json
+import math
+import multiprocessing
+import os
+import random
+import resource
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+DEFAULT_HISTORY = os.path.join(BASE_DIR, "benchmarks", "results", "scaling_history.json")
+
+# 규칙 조합: rules.yaml constraints 위에 덮어쓸 값
+TOGGLE_SETS = {
+    "default": {},
+    "minimal": {
+        "forbid_B_then_A": False,
+        "forbid_A_after_N_rest": False,
+        "forbid_three_A_in_row": False,
+        "forbid_N_OFF_N": False,
+        "forbid_off_after_day_shift": False,
+        "prefer_ideal_pattern": False,
+        "min_consecutive_work_days": 0,
+        "max_consecutive_off_days": 0,
+    },
+    "no_forward_rotation": {"forbid_off_after_day_shift": False},
+    "automaton": {"sequence_encoding": "automaton"},
+}
+
+
+def make_instance(n_employees, horizon, vac_density, toggles, seed, base_constraints):
+    """
+    시드 고정 합성 인스턴스 → build_and_solve 인자 dict (hours/weights 제외).
+    - 휴가: 1~2일 묶음을 칸 비율이 vac_density 정도가 되게 배치. 묶음 사이는 3일 이상 띄워
+      휴가만으로 최소 연속 근무/최대 연속 휴무 규칙이 깨지지 않게 함
+    - 직원별 N 횟수: rules.yaml 의 28일 기준 값을 계획 일수에 비례해 조정
+    - 하루 N 상한 / 근무 인원: 직원 수에 맞춰 조정 (앱 권장 범위와 같은 기준)
+    """
+    rng = random.Random(f"{seed}-{n_employees}-{horizon}-{vac_density}-{toggles}")
+    employees = [f"E{i:03d}" for i in range(n_employees)]
+    vacations = {}
+    for e in employees:
+        days, d = [], 0
+        while d < horizon:
+            if rng.random() < vac_density / 1.5:  # 묶음 평균 1.5일
+                run = rng.randint(1, 2)
+                days.extend(range(d, min(d + run, horizon)))
+                d += run + 3
+            else:
+                d += 1
+        if days:
+            vacations[e] = days
+    constraints = dict(base_constraints, **TOGGLE_SETS[toggles])
+    scale = horizon / 28
+    min_n = int(round(int(base_constraints.get("min_night_shifts_per_employee", 0)) * scale))
+    max_n = int(round(int(base_constraints.get("max_night_shifts_per_employee", 0)) * scale))
+    constraints["min_night_shifts_per_employee"] = min_n
+    constraints["max_night_shifts_per_employee"] = max(min_n, max_n) if max_n else 0
+    if int(base_constraints.get("max_night_workers_per_day", 0)) > 0:
+        need = math.ceil(min_n * n_employees / horizon) + 1
+        constraints["max_night_workers_per_day"] = max(int(base_constraints["max_night_workers_per_day"]), need)
+    center = n_employees * 5 / 7
+    return dict(
+        employees=employees,
+        horizon=horizon,
+        constraints=constraints,
+        vacations=vacations,
+        min_workers_per_day=max(0, math.floor(center - 1.5)),
+        max_workers_per_day=math.ceil(center + 1.5),
+    )
+
+
+def _peak_rss_mb():
+    """현재 프로세스 최대 RSS (Linux: KB, macOS: bytes)"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _run_case(case, solver_options, queue):
+    """자식 프로세스: 사례 하나 풀이 후 측정값을 queue 로 전달"""
+    from src.config import load_all
+    from src.scheduler import build_and_solve
+
+    rules, _, _, _ = load_all()
+    inst = make_instance(case["employees"], case["horizon"], case["vac_density"], case["toggles"],
+                         case["seed"], rules.constraints)
+    rss0 = _peak_rss_mb()
+    t0 = time.perf_counter()
+    _, status, stats = build_and_solve(
+        hours=rules.hours, weights=rules.weights, **inst,
+        collect_stats=True, reuse_model=False, solver_options=solver_options,
+    )
+    gap = None
+    if stats.objective is not None and stats.best_bound is not None:
+        gap = abs(stats.objective - stats.best_bound) / max(1.0, abs(stats.objective))
+    queue.put(dict(
+        case,
+        status=status,
+        stop_reason=stats.stop_reason,
+        num_variables=stats.num_variables,
+        num_constraints=stats.num_constraints,
+        build_seconds=round(stats.build_seconds, 3),
+        first_solution_seconds=None if stats.first_solution_seconds is None else round(stats.first_solution_seconds, 3),
+        wall_seconds=round(time.perf_counter() - t0, 3),
+        objective=stats.objective,
+        best_bound=stats.best_bound,
+        gap=None if gap is None else round(gap, 4),
+        peak_rss_mb=round(_peak_rss_mb(), 1),
+        base_rss_mb=round(rss0, 1),
+    ))
+
+
+def run_case(case, solver_options):
+    ctx = multiprocessing.get_context("spawn")
+    queue = ctx.Queue()
+    proc = ctx.Process(target=_run_case, args=(case, solver_options, queue))
+    proc.start()
+    try:
+        result = queue.get(timeout=float(solver_options["max_time_in_seconds"]) * 3 + 300)
+    except Exception as exc:
+        result = dict(case, status="ERROR", error=f"{type(exc).__name__}: {exc}")
+    proc.join()
+    if proc.exitcode not in (0, None) and "error" not in result:
+        result = dict(case, status="ERROR", error=f"exit code {proc.exitcode}")
+    return result
+
+
+def case_key(r):
+    return f"{r['employees']}x{r['horizon']}/vac{r['vac_density']}/{r['toggles']}/seed{r['seed']}"
+
+
+def load_history(path):
+    if not os.path.exists(path):
+        return []
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_history(path, runs):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(runs, f, ensure_ascii=False, indent=1)
+    os.replace(tmp, path)
+
+
+def _git_commit():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BASE_DIR,
+                             capture_output=True, text=True, timeout=10)
+        return out.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def _fmt(v, spec):
+    return "-" if v is None else format(v, spec)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="스케줄러 규모별 벤치마크")
+    parser.add_argument("--employees", type=str, default="16,50,100,200", help="쉼표로 구분한 직원 수 목록")
+    parser.add_argument("--horizons", type=str, default="28,62", help="쉼표로 구분한 계획 일수 목록")
+    parser.add_argument("--vac-density", type=str, default="0.03", help="쉼표로 구분한 휴가 밀도 목록 (칸당 확률)")
+    parser.add_argument("--toggles", type=str, default="default",
+                        help=f"쉼표로 구분한 규칙 조합 ({', '.join(TOGGLE_SETS)})")
+    parser.add_argument("--seed", type=int, default=0, help="인스턴스 생성 시드 (random_seed 도 같은 값)")
+    parser.add_argument("--time-limit", type=float, default=60.0, help="사례당 풀이 시간(초)")
+    parser.add_argument("--workers", type=int, default=8, help="CP-SAT 탐색 워커 수")
+    parser.add_argument("--label", type=str, default="", help="이력에 남길 실행 설명 (예: 'automaton 기본값')")
+    parser.add_argument("--history", type=str, default=DEFAULT_HISTORY, help="결과 JSON 이력 파일")
+    parser.add_argument("--no-save", action="store_true", help="이력 파일에 기록하지 않음")
+    parser.add_argument("--compare", action="store_true", help="이력의 직전 실행과 같은 사례끼리 비교 출력")
+    args = parser.parse_args()
+
+    toggles = [t.strip() for t in args.toggles.split(",") if t.strip()]
+    unknown = [t for t in toggles if t not in TOGGLE_SETS]
+    if unknown:
+        parser.error(f"알 수 없는 규칙 조합: {unknown}")
+    cases = [
+        dict(employees=int(n), horizon=int(h), vac_density=float(v), toggles=t, seed=args.seed)
+        for n in args.employees.split(",") if n.strip()
+        for h in args.horizons.split(",") if h.strip()
+        for v in args.vac_density.split(",") if v.strip()
+        for t in toggles
+    ]
+    solver_options = {
+        "max_time_in_seconds": args.time_limit,
+        "num_search_workers": args.workers,
+        "random_seed": args.seed,
+    }
+
+    history = load_history(args.history)
+    previous = {case_key(r): r for r in (history[-1]["results"] if history else [])}
+
+    print(f"사례 {len(cases)}개, 제한 {args.time_limit:g}초, 워커 {args.workers}")
+    print(f"{'case':<34}{'status':<11}{'vars':>8}{'build_s':>9}{'first_s':>9}{'objective':>11}{'gap':>8}{'rss_mb':>8}")
+    results = []
+    for case in cases:
+        r = run_case(case, solver_options)
+        results.append(r)
+        line = (f"{case_key(r):<34}{r['status']:<11}{_fmt(r.get('num_variables'), 'd'):>8}"
+                f"{_fmt(r.get('build_seconds'), '.2f'):>9}{_fmt(r.get('first_solution_seconds'), '.2f'):>9}"
+                f"{_fmt(r.get('objective'), 'g'):>11}{_fmt(r.get('gap'), '.3f'):>8}{_fmt(r.get('peak_rss_mb'), '.0f'):>8}")
+        print(line + (f"  {r['error']}" if r.get("error") else ""))
+        prev = previous.get(case_key(r))
+        if args.compare and prev:
+            print(f"{'  └ 직전':<34}{prev['status']:<11}{_fmt(prev.get('num_variables'), 'd'):>8}"
+                  f"{_fmt(prev.get('build_seconds'), '.2f'):>9}{_fmt(prev.get('first_solution_seconds'), '.2f'):>9}"
+                  f"{_fmt(prev.get('objective'), 'g'):>11}{_fmt(prev.get('gap'), '.3f'):>8}{_fmt(prev.get('peak_rss_mb'), '.0f'):>8}")
+
+    if not args.no_save:
+        history.append({
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "commit": _git_commit(),
+            "label": args.label,
+            "solver_options": solver_options,
+            "results": results,
+        })
+        save_history(args.history, history)
+        print(f"이력 저장: {args.history} (실행 {len(history)}회)")
+
+
+if __name__ == "__main__":
+    main()
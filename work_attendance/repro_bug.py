@@ -1,73 +1,180 @@
+"""
+회귀 점검 스크립트
+
+1) min_consecutive_work_days (전수 비교)
+
+예전 구현은 w_block 보조 변수로 "패턴 → 요구조건"을 걸다가, w_block 을 False 로 두면
+제약이 무력화되는 버그가 있었다 (OFF, OFF, B, N, OFF 가 min_cons=4 에서 통과).
+지금 구현(scheduler._min_work_run)은 보조 변수 없이
+    rest[d-1] + rest[d+k] - sum(rest[d..d+k-1]) <= 1
+로 표현한다. 이 스크립트는 짧은 길이의 모든 휴무/근무 패턴에 대해
+CP-SAT 이 허용하는 패턴 집합과 순수 파이썬 판정 결과가 같은지 확인한다.
+
+경계 규칙: 기간 첫날/마지막 날에 붙은 근무 구간은 길이와 무관하게 허용
+(전월/다음 달로 이어질 수 있으므로). 양쪽이 휴무로 막힌 근무 구간만 min_len 이상이어야 함.
+
+2) 목적함수 검산: 작은 인스턴스를 풀며 나온 모든 해에 대해 솔버 목적값과
+   validators.evaluate_objective(근무표만으로 재계산)가 같은지 확인 (pairwise 균등화 = 보조변수 여유 없음)
+
+3) 경계 이력: 이력 H 를 준 모델에서 패턴 P 가 허용되는지 == 이력 없이 H+P 전체를 고정한 모델의 판정
+   (H 자체가 규칙을 만족하는 경우만, 무작위 표본, linear/automaton 모두)
+
+실행: python repro_bug.py   (불일치가 있으면 종료 코드 1)
+"""
+import itertools
+import random
+import sys
+
 from ortools.sat.python import cp_model
 
-def solve():
+from src.config import load_all
+from src.scheduler import CompiledSchedule, _min_work_run, build_and_solve
+from src.validators import evaluate_objective
+
+
+def brute_force_ok(rest, min_len):
+    """rest: 0/1 튜플 (1=휴무). 양옆이 휴무인 근무 구간 길이가 모두 min_len 이상이면 True"""
+    horizon = len(rest)
+    d = 0
+    while d < horizon:
+        if rest[d]:
+            d += 1
+            continue
+        start = d
+        while d < horizon and not rest[d]:
+            d += 1
+        closed = start > 0 and d < horizon  # 앞뒤 모두 기간 안의 휴무로 막힘
+        if closed and d - start < min_len:
+            return False
+    return True
+
+
+class _Collector(cp_model.CpSolverSolutionCallback):
+    def __init__(self, rest):
+        super().__init__()
+        self._rest = rest
+        self.found = set()
+
+    def on_solution_callback(self):
+        self.found.add(tuple(self.Value(v) for v in self._rest))
+
+
+def solver_patterns(horizon, min_len):
+    """_min_work_run 만 건 모델에서 허용되는 모든 rest 패턴"""
     model = cp_model.CpModel()
-    horizon = 10
-    min_cons = 4
-    
-    # Simple setup: 1 employee, pattern: OFF, OFF, B, N, OFF
-    # Indices: 0, 1, 2, 3, 4. B=Work, N=Work.
-    # We want to force this pattern and see if model is INFEASIBLE.
-    
-    # 0: OFF
-    # 1: OFF
-    # 2: WORK
-    # 3: WORK
-    # 4: OFF
-    # 5..9: OFF
-    
-    # Variables: is_work[d]
-    is_work = []
-    for d in range(horizon):
-        is_work.append(model.NewBoolVar(f"w_{d}"))
-        
-    # Force the "bad" pattern
-    model.Add(is_work[0] == 0)
-    model.Add(is_work[1] == 0)
-    model.Add(is_work[2] == 1)
-    model.Add(is_work[3] == 1)
-    model.Add(is_work[4] == 0)
-    model.Add(is_work[5] == 0) # Just clean up remainder
-    
-    # Apply the constraint logic from scheduler.py
-    if min_cons > 1:
-        for k in range(1, min_cons):
-            # k working days not allowed unless extended
-            # range(1, horizon - k)
-            for d in range(1, horizon - k):
-                w_block = model.NewBoolVar(f"w_blk_{d}_{k}")
-                # is_work[d]...is_work[d+k-1] are ALL true
-                model.AddBoolAnd([is_work[t] for t in range(d, d + k)]).OnlyEnforceIf(w_block)
-                # If block matches, then d-1 OR d+k must be work
-                model.Add(is_work[d - 1] + is_work[d + k] >= 1).OnlyEnforceIf(w_block)
-                
-                # IMPORTANT: Also need to link w_block to is_work.
-                # In scheduler logic:
-                # model.AddBoolAnd(...).OnlyEnforceIf(w_block)
-                # This implies w_block => All(is_work).
-                # But it does NOT imply All(is_work) => w_block.
-                # So the solver can just set w_block = False even if pattern exists!
-                # THIS IS THE BUG!
-                
-                # Correct logic logic for "forbidden pattern":
-                # We want: IF (All is_work are true) THEN (extension required).
-                # Implementation:
-                # model.AddImplication(w_block, requirement)  <-- This means w_block -> requirement
-                # But we need "Pattern -> Requirement".
-                # Current code:
-                # model.AddBoolAnd(...).OnlyEnforceIf(w_block)
-                # This means w_block -> Pattern.
-                # If Pattern exists, solver can set w_block=False and satisfy "False -> Pattern" (always true).
-                # Then requirement is not enforced.
-                
-                # FIX:
-                # We need "Pattern => w_block" OR enforce directly "Pattern => Requirement".
-                # model.Add(requirement).OnlyEnforceIf([is_work[t] for t in range(d, d+k)])
-                pass
+    rest = [model.NewBoolVar(f"rest_{d}") for d in range(horizon)]
+    _min_work_run(model, rest, min_len)
+    solver = cp_model.CpSolver()
+    solver.parameters.enumerate_all_solutions = True
+    solver.parameters.num_search_workers = 1
+    cb = _Collector(rest)
+    solver.Solve(model, cb)
+    return cb.found
 
+
+def check_encoding(max_horizon=10, min_lens=(2, 3, 4)):
+    failures = 0
+    for min_len in min_lens:
+        for horizon in range(1, max_horizon + 1):
+            expected = {p for p in itertools.product((0, 1), repeat=horizon) if brute_force_ok(p, min_len)}
+            got = solver_patterns(horizon, min_len)
+            if got != expected:
+                failures += 1
+                print(f"[불일치] min_len={min_len} horizon={horizon}: "
+                      f"누락 {sorted(expected - got)[:3]} / 잘못 허용 {sorted(got - expected)[:3]}")
+    print(f"패턴 전수 비교: min_len {list(min_lens)}, 길이 1~{max_horizon} → 불일치 {failures}건")
+    return failures
+
+
+def _fixed_status(pattern, constraints, history=None):
+    """1인 전체 모델에 패턴을 고정해 풀이 상태 반환 (N 횟수/인원 매개변수는 미사용 범위)"""
+    rules, _, _, _ = load_all()
+    compiled = CompiledSchedule(["e"], len(pattern), rules.hours, constraints, rules.weights,
+                                vac_cells=frozenset(), history={"e": history} if history else None)
+    compiled._apply_inputs(None, None, None, None, True, None, None, 0, 0)
+    for d, s in enumerate(pattern):
+        compiled.model.Add(compiled.x[("e", d, s)] == 1)
     solver = cp_model.CpSolver()
-    status = solver.Solve(model)
-    print(f"Status: {solver.StatusName(status)}")
+    solver.parameters.num_search_workers = 1
+    return solver.StatusName(solver.Solve(compiled.model))
+
+
+def _solve_pattern(pattern, min_cons):
+    """규칙을 min_consecutive_work_days 만 남긴 1인 전체 모델에 패턴을 고정해 풀이 상태 반환"""
+    constraints = {
+        "min_consecutive_work_days": min_cons,
+        "max_weekly_hours": 0,
+        "forbid_B_then_A": False,
+        "forbid_A_after_N_rest": False,
+        "forbid_three_A_in_row": False,
+        "forbid_N_OFF_N": False,
+        "forbid_off_after_day_shift": False,
+        "max_consecutive_off_days": 0,
+    }
+    return _fixed_status(pattern, constraints)
+
+
+def check_original_case():
+    """원래 재현 사례: OFF, OFF, B, N, OFF ... (min_cons=4) 는 전체 모델에서도 INFEASIBLE, 4일 근무는 허용"""
+    failures = 0
+    cases = [
+        (["OFF", "OFF", "B", "N", "OFF"] + ["OFF"] * 5, "INFEASIBLE"),
+        (["OFF", "C", "A", "B", "N", "OFF"] + ["OFF"] * 4, "OPTIMAL"),
+        (["B", "N", "OFF"] + ["OFF"] * 7, "OPTIMAL"),  # 첫날에 붙은 짧은 구간은 허용
+    ]
+    for pattern, expected in cases:
+        status = _solve_pattern(pattern, 4)
+        ok = status == expected
+        failures += 0 if ok else 1
+        print(f"{','.join(pattern[:6])}.. (min_cons=4): {status} (기대 {expected}) → {'OK' if ok else '실패'}")
+    return failures
+
+
+def check_objective(time_limit=5.0):
+    """6명 10일 인스턴스: 중간 해를 포함한 모든 해에서 솔버 목적값 == 근무표 기준 재계산 값"""
+    rules, emps, _, _ = load_all()
+    names = [e.name for e in emps][:6]
+    constraints = dict(rules.constraints, min_night_shifts_per_employee=1, max_night_shifts_per_employee=3)
+    weights = dict(rules.weights, balance_mode="pairwise")
+    seen = []
+
+    def on_solution(schedule, objective):
+        seen.append((objective, evaluate_objective(schedule, constraints, weights)["total"]))
+
+    schedule, status = build_and_solve(
+        names, 10, rules.hours, constraints, weights,
+        min_workers_per_day=3, max_workers_per_day=6,
+        reuse_model=False, on_solution=on_solution,
+        solver_options={"max_time_in_seconds": time_limit, "num_search_workers": 1},
+    )
+    bad = [(o, ev) for o, ev in seen if o != ev]
+    print(f"목적함수 검산: {status}, 해 {len(seen)}개 중 불일치 {len(bad)}개 {bad[:3]}")
+    return 1 if bad or not seen else 0
+
+
+def check_history(samples=150, seed=0):
+    """경계 이력 H 와 패턴 P: 이력 모델의 판정 == 이력 없이 H+P 를 고정한 모델의 판정"""
+    rules, _, _, _ = load_all()
+    rng = random.Random(seed)
+    shifts = ["A", "A2", "B", "C", "N", "OFF"]
+    failures = checked = 0
+    for enc in ("linear", "automaton"):
+        constraints = dict(rules.constraints, sequence_encoding=enc, min_night_shifts_per_employee=0,
+                           max_night_shifts_per_employee=0)
+        for _ in range(samples):
+            hist = [rng.choice(shifts) for _ in range(rng.randint(1, 4))]
+            pattern = [rng.choice(shifts) for _ in range(rng.randint(1, 4))]
+            if _fixed_status(hist, constraints) == "INFEASIBLE":
+                continue  # 이력 자체가 규칙 위반
+            checked += 1
+            got = _fixed_status(pattern, constraints, history=hist) == "INFEASIBLE"
+            expected = _fixed_status(hist + pattern, constraints) == "INFEASIBLE"
+            if got != expected:
+                failures += 1
+                print(f"[불일치] {enc} 이력 {hist} | {pattern}: 이력 모델 {'불가' if got else '허용'}, 전체 {'불가' if expected else '허용'}")
+    print(f"경계 이력: 표본 {checked}개 → 불일치 {failures}건")
+    return failures
+
 
 if __name__ == "__main__":
-    solve()
+    sys.exit(1 if check_encoding() + check_original_case() + check_objective() + check_history() else 0)
@@ -0,0 +1,187 @@
+# src/aggregate.py
+"""
+근무표 집계: 근무표를 한 번 정수 코드 행렬(직원 × 일, int8)로 바꾼 뒤
+직원별 시프트 횟수/총근로/연장, 일자별 시프트 인원을 np.bincount 와 행렬 연산으로 계산한다.
+엑셀 보고서, 앱 표, CLI 요약이 같은 결과를 쓰고, summarize_many 는 여러 근무표를 한 번에 집계한다.
+"""
+import hashlib
+import json
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Dict, List, Sequence, Tuple, Union
+
+import numpy as np
+
+if TYPE_CHECKING:  # pandas 는 표(DataFrame)를 만들 때만 불러옴 (검사/집계 경로는 numpy 만 사용)
+    import pandas as pd
+
+from .data_models import SHIFT_CODES, ScheduleMatrix
+
+# 코드 순서 = 행렬 값 (SHIFT_CODES). 목록에 없는 표기는 OTHER (횟수/시간 집계에서 제외)
+WORK_CODES = SHIFT_CODES[:5]
+OTHER = len(SHIFT_CODES)
+_NUM_CODES = OTHER + 1
+_CODE = {s: i for i, s in enumerate(SHIFT_CODES)}
+# 하루 근무자 수에 포함되는 시프트 (A2 제외, scheduler 의 workers_per_day / precheck.COUNTED_SHIFTS 와 동일)
+COUNTED_CODES = ("A", "B", "C", "N")
+
+# 보고서 요약 열 이름 (OFF/VAC 는 보고서 표기)
+SUMMARY_LABELS = {"OFF": "주휴", "VAC": "휴가"}
+
+
+@dataclass
+class ScheduleSummary:
+    """
+    근무표 하나의 집계 결과
+    - counts: (직원, 코드) 시프트 횟수, 열 순서는 SHIFT_CODES (+ 마지막 열 OTHER)
+    - total_hours / overtime: (직원,) 총근로시간, 기준 시간 초과분
+    - per_day: (코드, 일) 일자별 시프트 인원
+    """
+    employees: List[str]
+    counts: np.ndarray
+    total_hours: np.ndarray
+    overtime: np.ndarray
+    per_day: np.ndarray
+
+    def count(self, shift: str) -> np.ndarray:
+        """직원별 shift 횟수"""
+        return self.counts[:, _CODE[shift]]
+
+    @property
+    def per_day_total(self) -> np.ndarray:
+        """일자별 근무 인원 (OFF/VAC 제외, A2 포함)"""
+        return self.per_day[: len(WORK_CODES)].sum(axis=0)
+
+    @property
+    def per_day_counted(self) -> np.ndarray:
+        """일자별 근무자 수 (A/B/C/N). 최소/최대 근무 인원(workers_per_day) 제약과 같은 기준"""
+        return self.per_day[[_CODE[s] for s in COUNTED_CODES]].sum(axis=0)
+
+    def employee_frame(self, name_col: str = "직원") -> "pd.DataFrame":
+        """직원별 요약 표: 이름 + A, A2, B, C, N, 주휴, 휴가, 총근로, 연장"""
+        import pandas as pd
+
+        df = pd.DataFrame(self.counts[:, :OTHER], columns=[SUMMARY_LABELS.get(s, s) for s in SHIFT_CODES])
+        df.insert(0, name_col, self.employees)
+        df["총근로"] = self.total_hours
+        df["연장"] = self.overtime
+        return df
+
+    def day_frame(self) -> "pd.DataFrame":
+        """일자별 인원 표: 행 = 총 근무 인원(A2 포함) + 근무자 수(A2 제외) + 시프트별, 열 = D1..Dn"""
+        import pandas as pd
+
+        data = np.vstack([self.per_day_total, self.per_day_counted, self.per_day[: len(WORK_CODES)]])
+        index = ["총 근무 인원 (A2 포함)", "근무자 수 (최소/최대 인원 기준)"] + [f"{s} 인원" for s in WORK_CODES]
+        return pd.DataFrame(data, index=index, columns=[f"D{j + 1}" for j in range(data.shape[1])])
+
+
+def hours_vector(hours_map: Dict[str, int]) -> np.ndarray:
+    """코드별 근무시간 (누락/OTHER 는 0)"""
+    vec = np.zeros(_NUM_CODES, dtype=np.int64)
+    for s, i in _CODE.items():
+        vec[i] = int(hours_map.get(s, 0))
+    return vec
+
+
+def encode_schedule(schedule: Union[Dict[str, List[str]], ScheduleMatrix]) -> Tuple[List[str], np.ndarray]:
+    """
+    근무표 → (직원 목록, (직원, 일) int8 코드 행렬). 직원마다 일수가 같아야 함.
+    ScheduleMatrix 는 변환 없이 코드를 그대로 사용 (SHIFT_CODES 밖 표기만 OTHER 로)
+    """
+    if isinstance(schedule, ScheduleMatrix):
+        codes = schedule.codes
+        if len(schedule.labels) > _NUM_CODES:
+            codes = np.minimum(codes, OTHER)
+        return schedule.employees, codes
+    employees = list(schedule)
+    horizon = len(schedule[employees[0]]) if employees else 0
+    if any(len(schedule[e]) != horizon for e in employees):
+        raise ValueError("직원마다 근무표 일수가 다릅니다.")
+    codes = np.fromiter(
+        (_CODE.get(s, OTHER) for e in employees for s in schedule[e]),
+        dtype=np.int8,
+        count=len(employees) * horizon,
+    )
+    return employees, codes.reshape(len(employees), horizon)
+
+
+def schedule_digest(schedule: Union[Dict[str, List[str]], ScheduleMatrix]) -> str:
+    """
+    근무표 내용 해시 (직원 순서 + 표기). dict 와 ScheduleMatrix 가 같은 근무표면 같은 값.
+    근무표에서 만든 표/보고서를 캐시할 때 키로 사용
+    """
+    rows = schedule.as_dict() if isinstance(schedule, ScheduleMatrix) else schedule
+    data = json.dumps([[e, list(row)] for e, row in rows.items()], ensure_ascii=False)
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
+def _summaries(
+    names: List[List[str]], codes: List[np.ndarray], hours_map: Dict[str, int], base_month_hours: int
+) -> List[ScheduleSummary]:
+    """코드 행렬 여러 개를 이어 붙여 bincount 두 번으로 집계한 뒤 근무표별로 나눔"""
+    if not codes:
+        return []
+    hours = hours_vector(hours_map)
+    rows = np.array([c.shape[0] for c in codes], dtype=np.int64)
+    days = np.array([c.shape[1] for c in codes], dtype=np.int64)
+    flat = np.concatenate([c.ravel() for c in codes]).astype(np.int64)
+
+    # 직원(전체 근무표를 이은 행 번호)별 코드 횟수
+    row_id = np.repeat(np.arange(rows.sum()), np.repeat(days, rows))
+    counts = np.bincount(row_id * _NUM_CODES + flat, minlength=int(rows.sum()) * _NUM_CODES)
+    counts = counts.reshape(-1, _NUM_CODES)
+    total = counts @ hours
+    overtime = np.maximum(total - int(base_month_hours), 0)
+
+    # 일자(전체 근무표를 이은 일 번호)별 코드 인원
+    day_start = np.concatenate([[0], np.cumsum(days)[:-1]])
+    day_id = np.concatenate([np.tile(np.arange(d) + s, r) for r, d, s in zip(rows, days, day_start)])
+    per_day = np.bincount(day_id * _NUM_CODES + flat, minlength=int(days.sum()) * _NUM_CODES)
+    per_day = per_day.reshape(-1, _NUM_CODES).T
+
+    out = []
+    r0 = 0
+    for n, r, d, s in zip(names, rows, days, day_start):
+        out.append(ScheduleSummary(
+            employees=n,
+            counts=counts[r0:r0 + r],
+            total_hours=total[r0:r0 + r],
+            overtime=overtime[r0:r0 + r],
+            per_day=per_day[:, s:s + d],
+        ))
+        r0 += r
+    return out
+
+
+def summarize(
+    schedule: Union[Dict[str, List[str]], ScheduleMatrix], hours_map: Dict[str, int], base_month_hours: int = 209
+) -> ScheduleSummary:
+    """근무표 하나 집계 (base_month_hours: 연장근로 계산 기준 월 소정근로시간)"""
+    names, codes = encode_schedule(schedule)
+    return _summaries([names], [codes], hours_map, base_month_hours)[0]
+
+
+def summarize_many(
+    schedules: Sequence[Union[Dict[str, List[str]], ScheduleMatrix]], hours_map: Dict[str, int], base_month_hours: int = 209
+) -> List[ScheduleSummary]:
+    """
+    여러 근무표(병동/월/배치 결과)를 한 번에 집계. 근무표마다 직원 수/일수가 달라도 됨.
+    코드 행렬을 이어 붙여 bincount 를 근무표 수와 무관하게 두 번만 호출
+    """
+    encoded = [encode_schedule(s) for s in schedules]
+    return _summaries([n for n, _ in encoded], [c for _, c in encoded], hours_map, base_month_hours)
+
+
+def schedule_frame(schedule: Union[Dict[str, List[str]], ScheduleMatrix], name_col: str = "직원") -> "pd.DataFrame":
+    """근무표 원시 표: 이름 + D1..Dn (행 dict 없이 한 번에 생성)"""
+    import pandas as pd
+
+    if isinstance(schedule, ScheduleMatrix):
+        df = schedule.to_frame(decode=True).astype(str)
+        df.columns = [f"D{j + 1}" for j in range(schedule.horizon)]
+        return df.reset_index(names=name_col)
+    employees = list(schedule)
+    horizon = len(schedule[employees[0]]) if employees else 0
+    df = pd.DataFrame([schedule[e] for e in employees], columns=[f"D{j + 1}" for j in range(horizon)])
+    df.insert(0, name_col, employees)
+    return df
@@ -0,0 +1,160 @@
+# src/batch.py
+"""
+여러 병동 일괄 풀이: 루트 폴더 아래 병동별 폴더(rules.yaml + employees.csv, 선택: demand.csv / vacations.csv)를
+ProcessPoolExecutor 로 동시에 풀고 병동마다 보고서를, 루트 출력 폴더에 요약 CSV 를 남긴다.
+CPU 코어는 동시에 도는 병동끼리 나눠 num_search_workers 로 사용.
+한 병동의 예외/해 없음은 그 병동 결과에만 기록되고 나머지 병동은 계속 진행한다.
+"""
+import csv
+import math
+import os
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from .config import load_all, shift_masks_from
+from .data_models import WardResult
+from .precheck import run_prechecks
+
+BASE_DIR = os.path.dirname(os.path.dirname(__file__))
+OUTPUT_DIR = os.path.join(BASE_DIR, "outputs")
+BATCH_DIR = os.path.join(OUTPUT_DIR, "batch")
+
+
+def find_ward_configs(root: str) -> List[Tuple[str, str]]:
+    """root 아래 rules.yaml 과 employees.csv 가 있는 폴더 → [(병동 이름, 폴더 경로)] (이름순)"""
+    wards = []
+    for name in sorted(os.listdir(root)):
+        path = os.path.join(root, name)
+        if os.path.isfile(os.path.join(path, "rules.yaml")) and os.path.isfile(os.path.join(path, "employees.csv")):
+            wards.append((name, path))
+    return wards
+
+
+def _default_workers_range(n_employees: int) -> Tuple[int, int]:
+    """앱 권장 범위와 같은 기준: 주 5일 근무 평균(n × 5/7) ± 1.5명"""
+    center = n_employees * 5 / 7
+    return max(0, math.floor(center - 1.5)), math.ceil(center + 1.5)
+
+
+def _write_conflicts(path: str, violations) -> None:
+    with open(path, "w", newline="", encoding="utf-8-sig") as f:
+        writer = csv.DictWriter(f, fieldnames=["rule", "day", "employee", "message"])
+        writer.writeheader()
+        for v in violations:
+            writer.writerow(v.as_row())
+
+
+def _run_ward(ward: str, config_dir: str, out_dir: str, horizon: int,
+              workers_range: Optional[Tuple[int, int]], solver_options: Dict[str, object]) -> WardResult:
+    """프로세스 풀 작업: 병동 하나 풀이 + 보고서 저장"""
+    result = WardResult(ward=ward)
+    t0 = time.perf_counter()
+    try:
+        rules, employee_objs, demand, vacations = load_all(config_dir)
+        employees = [e.name for e in employee_objs]
+        result.num_employees = len(employees)
+        lo, hi = workers_range or _default_workers_range(len(employees))
+        model_kwargs = dict(
+            employees=employees,
+            horizon=horizon,
+            hours=rules.hours,
+            constraints=rules.constraints,
+            weights=rules.weights,
+            demand=demand,
+            vacations=vacations,
+            min_workers_per_day=lo,
+            max_workers_per_day=hi,
+            forbid_free_vac=True,
+            shift_masks=shift_masks_from(employee_objs),
+        )
+        ward_dir = os.path.join(out_dir, ward)
+        os.makedirs(ward_dir, exist_ok=True)
+
+        violations = run_prechecks(**model_kwargs)
+        if violations:
+            result.status = "INFEASIBLE"
+            result.report = os.path.join(ward_dir, f"{ward}_precheck.csv")
+            result.message = f"사전 점검 위반 {len(violations)}건"
+            _write_conflicts(result.report, violations)
+            return result
+
+        # 솔버/보고서 모듈은 사전 점검을 통과한 병동에서만 불러옴 (작업 프로세스 시작 비용 절감)
+        from .postprocess import build_formatted_workbook_bytes
+        from .scheduler import build_and_solve
+
+        schedule, status, stats = build_and_solve(
+            **model_kwargs,
+            solver_options={**rules.solver, **solver_options},
+            reuse_model=False,
+            collect_stats=True,
+        )
+        result.status = status
+        result.objective = stats.objective
+        result.message = stats.stop_reason
+        if schedule:
+            result.report = os.path.join(ward_dir, f"{ward}_근무표.xlsx")
+            with open(result.report, "wb") as f:
+                f.write(build_formatted_workbook_bytes(schedule, rules.hours, month_title=f"{ward} 근무명령서"))
+    except Exception as exc:
+        result.status = "ERROR"
+        result.error = traceback.format_exc()
+        result.message = f"{type(exc).__name__}: {' '.join(str(exc).split())[:200]}"
+    finally:
+        result.wall_time = time.perf_counter() - t0
+    return result
+
+
+def write_summary(results: List[WardResult], out_dir: str) -> str:
+    """병동별 결과 요약 CSV 저장 후 경로 반환"""
+    os.makedirs(out_dir, exist_ok=True)
+    path = os.path.join(out_dir, "summary.csv")
+    with open(path, "w", newline="", encoding="utf-8-sig") as f:
+        writer = csv.DictWriter(f, fieldnames=list(WardResult(ward="").as_row()))
+        writer.writeheader()
+        for r in results:
+            writer.writerow(r.as_row())
+    return path
+
+
+def run_batch(
+    root: str,
+    horizon: int = 28,
+    out_dir: Optional[str] = None,
+    total_workers: Optional[int] = None,
+    max_parallel: Optional[int] = None,
+    workers_range: Optional[Tuple[int, int]] = None,
+    solver_options: Optional[Dict[str, object]] = None,
+) -> Tuple[List[WardResult], str]:
+    """
+    root 아래 병동 폴더를 동시에 풀이.
+    - 동시에 도는 병동 수 = min(병동 수, max_parallel 또는 코어 수), 병동당 num_search_workers = 코어 수 // 동시 병동 수
+    - workers_range: 하루 근무 인원 (최소, 최대). None 이면 병동 인원으로 권장 범위 계산
+    - solver_options: 병동 rules.yaml 의 solver 섹션 위에 덮어쓸 설정
+    반환: (병동별 결과 목록, 출력 폴더). 출력 폴더에 summary.csv 와 병동별 하위 폴더가 생김
+    """
+    wards = find_ward_configs(root)
+    out_dir = out_dir or os.path.join(BATCH_DIR, datetime.now().strftime("%Y-%m-%d_%H%M%S"))
+    if not wards:
+        return [], out_dir
+    total_workers = int(total_workers or os.cpu_count() or 1)
+    parallel = max(1, min(len(wards), int(max_parallel or total_workers)))
+    opts = dict(solver_options or {})
+    opts["num_search_workers"] = max(1, total_workers // parallel)
+
+    results: List[WardResult] = []
+    with ProcessPoolExecutor(max_workers=parallel) as pool:
+        futures = [
+            (ward, pool.submit(_run_ward, ward, path, out_dir, horizon, workers_range, opts))
+            for ward, path in wards
+        ]
+        for ward, f in futures:
+            try:
+                results.append(f.result())
+            except Exception as exc:  # 작업 프로세스 자체가 죽은 경우 (BrokenProcessPool 등)
+                results.append(WardResult(ward=ward, status="ERROR", error=traceback.format_exc(),
+                                          message=f"{type(exc).__name__}: {exc}"))
+    write_summary(results, out_dir)
+    return results, out_dir
@@ -1,30 +1,280 @@
 import argparse
-from .config import load_all, load_employees_from_csv
-from .scheduler import build_and_solve
-from .postprocess import save_schedule_excel
+import os
+import sys
+# 무거운 모듈(ortools: scheduler/solve_cache/portfolio/rolling, pandas: postprocess)은 인자 해석 후
+# 필요한 경로에서만 불러온다. --help, 사전 점검에서 끝나는 실행, 근무표 검사는 솔버를 불러오지 않음
 
 def parse_employees_arg(arg: str):
     if not arg:
         return []
     return [name.strip() for name in arg.split(",") if name.strip()]
 
-def main():
-    parser = argparse.ArgumentParser(description="교대근무 스케줄 생성기")
+def print_stats(stats):
+    print("---- 모델/솔버 통계 ----")
+    for r in stats.summary_rows():
+        print(f"{r['item']:>18}: {r['value']}")
+    print(f"{'family':<36}{'vars':>8}{'cons':>8}{'build_ms':>10}")
+    for r in stats.family_rows():
+        print(f"{r['family']:<36}{r['variables']:>8}{r['constraints']:>8}{r['build_ms']:>10}")
+
+def print_portfolio(members):
+    print("---- 포트폴리오 멤버 ----")
+    print(f"{'#':>3} {'seed':>6} {'preset':<10}{'status':<12}{'objective':>12}{'bound':>12}{'sec':>8}  stop")
+    for m in members:
+        obj = "-" if m.objective is None else f"{m.objective:g}"
+        bound = "-" if m.best_bound is None else f"{m.best_bound:g}"
+        print(f"{m.index:>3} {m.seed:>6} {m.preset:<10}{m.status:<12}{obj:>12}{bound:>12}{m.wall_time:>8.1f}  {m.stop_reason}")
+        if m.error:
+            print(m.error)
+
+def print_conflicts(conflicts, title="해 없음 원인 (함께 만족할 수 없는 규칙/입력)"):
+    print(f"---- {title} ----")
+    for c in conflicts:
+        print(f" - {c.message}")
+
+def print_windows(windows):
+    print("---- 롤링 창 ----")
+    print(f"{'#':>3} {'start':>6}{'days':>6}{'commit':>8} {'status':<12}{'objective':>12}{'sec':>8}  stop")
+    for w in windows:
+        obj = "-" if w.objective is None else f"{w.objective:g}"
+        print(f"{w.index:>3} {w.start + 1:>6}{w.days:>6}{w.committed:>8} {w.status:<12}{obj:>12}{w.wall_time:>8.1f}  {w.stop_reason}")
+
+def print_summary(schedule, hours):
+    """직원별 시프트 횟수/총근로/연장 + 일자별 근무자 수 범위 (A2 제외, 최소/최대 인원 제약과 같은 기준)"""
+    from .aggregate import summarize
+
+    summary = summarize(schedule, hours)
+    print("---- 근무표 집계 ----")
+    print(summary.employee_frame().to_string(index=False))
+    per_day = summary.per_day_counted
+    print(f"일자별 근무자 수 (A2 제외): 최소 {per_day.min()} / 최대 {per_day.max()} / 평균 {per_day.mean():.1f}")
+
+def solve_remote(url, solve_kwargs, explain=False):
+    """
+    스케줄링 서비스에 작업을 보내고 끝날 때까지 진행 상황 출력 (Ctrl+C: 취소 후 현재 최선해 사용).
+    explain=True 면 해 없음 원인 진단도 서비스에서 실행 → (schedule, status, stats, conflicts)
+    """
+    from .service import RemoteSolveJob, ServiceError
+
+    last = [None]
+
+    def on_progress(snap):
+        # 대기 순번이나 최선 목적값이 바뀔 때만 출력
+        key = (snap.get("state"), snap.get("position"), snap.get("best_objective"))
+        if key == last[0] or snap["done"]:
+            return
+        last[0] = key
+        if snap.get("state") == "queued":
+            print(f"  [서비스] 대기열 {snap['position']}번째")
+        elif snap.get("diagnosing"):
+            print("  [서비스] 해 없음 원인 진단 중")
+        else:
+            print(f"  [서비스] {snap.get('elapsed', 0)}초, 목적값 {snap.get('best_objective')}")
+
+    try:
+        job = RemoteSolveJob(url, solve_kwargs, explain=explain).start()
+        print(f"서비스 작업 등록: {job.id}")
+        try:
+            job.wait(on_progress=on_progress)
+        except KeyboardInterrupt:
+            print("중단 요청: 현재 최선해로 종료합니다.")
+            job.cancel()
+            job.wait()
+    except ServiceError as exc:
+        print(f"[오류] {exc}")
+        sys.exit(1)
+    if job.error:
+        print(job.error)
+    return job.schedule, job.status, job.stats, job.conflicts
+
+def verify_schedule(schedule, rules, objective, history=None, inputs=None) -> bool:
+    """
+    근무표만으로 목적값을 다시 계산해 솔버 값과 비교 + 필수 규칙 전체 재검사. 문제가 없으면 True
+    inputs: 풀 때 쓴 입력 (validate_schedule 인자: vacations, min_workers_per_day, ...)
+    """
+    from .validators import evaluate_objective, validate_schedule
+
+    ev = evaluate_objective(schedule, rules.constraints, rules.weights, history=history)
+    print("---- 검산 (근무표 기준 목적값) ----")
+    for k, v in ev.items():
+        print(f"{k:>36}: {v}")
+    ok = True
+    if objective is not None:
+        diff = objective - ev["total"]
+        # spread/deviation 균등화 항은 최소화 방향 부등식이라 중간 해에서 솔버 값이 더 클 수 있음(여유분)
+        if diff == 0:
+            print(f"솔버 목적값 {objective:g} 과 일치")
+        elif diff > 0 and str(rules.weights.get("balance_mode", "pairwise")) != "pairwise":
+            print(f"솔버 목적값 {objective:g} > 검산 {ev['total']} (균등화 보조변수 여유분 {diff:g})")
+        else:
+            print(f"[불일치] 솔버 목적값 {objective:g} != 검산 {ev['total']}")
+            ok = False
+    for v in validate_schedule(schedule, rules.hours, rules.constraints, **{**(inputs or {}), "history": history}):
+        print(f"[규칙 위반] {v.message}")
+        ok = False
+    return ok
+
+def validate_main(argv):
+    """python -m src.cli validate <근무표>: 저장/수정한 근무표를 rules.yaml 필수 규칙 전체로 검사"""
+    parser = argparse.ArgumentParser(prog="python -m src.cli validate", description="근무표 규칙 검사")
+    parser.add_argument("schedule_file", help="검사할 근무표 (.xlsx/.csv, 원시표 또는 보고서형)")
+    parser.add_argument("--config-dir", type=str, default="", help="설정 폴더 (rules.yaml, employees.csv, vacations.csv ..., 기본 configs)")
+    parser.add_argument("--history-file", type=str, default="", help="전월 근무표 (첫날에 걸치는 규칙을 이어서 검사)")
+    parser.add_argument("--workers-per-day", type=int, default=None, help="하루 총 근무자 수(정확히 ==)")
+    parser.add_argument("--min-workers-per-day", type=int, default=None, help="하루 총 근무자 수 최소")
+    parser.add_argument("--max-workers-per-day", type=int, default=None, help="하루 총 근무자 수 최대")
+    parser.add_argument("--out", type=str, default="", help="위반 목록 CSV 저장 경로")
+    args = parser.parse_args(argv)
+    for path in (args.schedule_file, args.history_file):
+        if path and not os.path.isfile(path):
+            print(f"[오류] 파일이 없습니다: {path}")
+            sys.exit(1)
+
+    from .config import load_all, shift_masks_from
+    from .postprocess import load_schedule_table
+    from .rules import history_span, history_tail
+    from .validators import validate_schedule
+
+    rules, employee_objs, demand, vacations = load_all(args.config_dir) if args.config_dir else load_all()
+    schedule = load_schedule_table(args.schedule_file)
+    if not schedule:
+        print(f"[오류] 근무표를 읽지 못했습니다: {args.schedule_file}")
+        sys.exit(1)
+    history = None
+    if args.history_file:
+        history = history_tail(load_schedule_table(args.history_file), history_span(rules.constraints))
+    violations = validate_schedule(
+        schedule, rules.hours, rules.constraints,
+        demand=demand,
+        vacations=vacations,
+        workers_per_day=args.workers_per_day,
+        min_workers_per_day=args.min_workers_per_day,
+        max_workers_per_day=args.max_workers_per_day,
+        shift_masks=shift_masks_from(employee_objs),
+        history=history,
+    )
+    horizon = len(next(iter(schedule.values())))
+    print(f"근무표: {args.schedule_file} ({len(schedule)}명 × {horizon}일)")
+    if args.out:
+        import pandas as pd
+
+        table = pd.DataFrame([v.as_row() for v in violations], columns=["rule", "day", "employee", "message"])
+        table.astype({"day": "Int64"}).to_csv(args.out, index=False, encoding="utf-8-sig")
+        print(f"위반 목록 저장: {args.out}")
+    if not violations:
+        print("규칙 위반 없음")
+        return
+    print_conflicts(violations, f"규칙 위반 {len(violations)}건")
+    sys.exit(1)
+
+def batch_main(argv):
+    """python -m src.cli batch <폴더>: 병동별 설정 폴더를 동시에 풀이"""
+    parser = argparse.ArgumentParser(prog="python -m src.cli batch", description="여러 병동 일괄 스케줄 생성")
+    parser.add_argument("config_dir", help="병동별 설정 폴더(rules.yaml, employees.csv, ...)가 들어 있는 상위 폴더")
+    parser.add_argument("--horizon", type=int, default=28, help="계획 일수 (기본 28)")
+    parser.add_argument("--out", type=str, default="", help="출력 폴더 (기본 outputs/batch/<시각>)")
+    parser.add_argument("--workers", type=int, default=None, help="전체 CPU 코어 수 (병동끼리 나눠 사용, 기본 os.cpu_count())")
+    parser.add_argument("--parallel", type=int, default=None, help="동시에 풀 병동 수 (기본: 병동 수와 코어 수 중 작은 값)")
+    parser.add_argument("--time-limit", type=float, default=None, help="병동당 최대 풀이 시간(초, 미지정 시 병동 rules.yaml)")
+    parser.add_argument("--min-workers-per-day", type=int, default=None, help="하루 총 근무자 수 최소 (미지정 시 병동 인원 기준 권장값)")
+    parser.add_argument("--max-workers-per-day", type=int, default=None, help="하루 총 근무자 수 최대 (미지정 시 병동 인원 기준 권장값)")
+    args = parser.parse_args(argv)
+    if not os.path.isdir(args.config_dir):
+        print(f"[오류] 폴더가 없습니다: {args.config_dir}")
+        sys.exit(1)
+
+    workers_range = None
+    if args.min_workers_per_day is not None or args.max_workers_per_day is not None:
+        workers_range = (args.min_workers_per_day or 0, args.max_workers_per_day if args.max_workers_per_day is not None else 10_000)
+    solver_options = {}
+    if args.time_limit is not None:
+        solver_options["max_time_in_seconds"] = args.time_limit
+
+    from .batch import run_batch
+
+    results, out_dir = run_batch(
+        args.config_dir, horizon=args.horizon, out_dir=args.out or None,
+        total_workers=args.workers, max_parallel=args.parallel,
+        workers_range=workers_range, solver_options=solver_options,
+    )
+    if not results:
+        print(f"[주의] {args.config_dir} 아래에 rules.yaml 과 employees.csv 가 있는 병동 폴더가 없습니다.")
+        sys.exit(1)
+    print("---- 병동별 결과 ----")
+    print(f"{'ward':<20}{'status':<12}{'objective':>12}{'sec':>8}{'emps':>6}  report / message")
+    for r in results:
+        obj = "-" if r.objective is None else f"{r.objective:g}"
+        print(f"{r.ward:<20}{r.status:<12}{obj:>12}{r.wall_time:>8.1f}{r.num_employees:>6}  {r.report or r.message}")
+    print(f"요약 저장: {os.path.join(out_dir, 'summary.csv')}")
+    if any(r.status not in ("OPTIMAL", "FEASIBLE") for r in results):
+        sys.exit(1)
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else list(argv)
+    if argv and argv[0] == "batch":
+        batch_main(argv[1:])
+        return
+    if argv and argv[0] == "validate":
+        validate_main(argv[1:])
+        return
+    parser = argparse.ArgumentParser(description="교대근무 스케줄 생성기 (여러 병동 일괄: python -m src.cli batch <폴더>, 근무표 검사: python -m src.cli validate <파일>)")
     parser.add_argument("--horizon", type=int, default=28, help="계획 일수 (기본 28)")
-    parser.add_argument("--export", choices=["excel", "none"], default="excel", help="결과 저장 방식")
+    parser.add_argument("--export", type=str, default="excel",
+                        help="결과 저장 형식, 쉼표로 여러 개 (excel=원시표, report=보고서형, csv, json, parquet / none=저장 안 함)")
     parser.add_argument("--employees", type=str, default="", help="쉼표로 구분된 직원명 목록")
     parser.add_argument("--employees-file", type=str, default="", help="직원 CSV 경로")
     parser.add_argument("--workers-per-day", type=int, default=None, help="하루 총 근무자 수(정확히 ==)")
     parser.add_argument("--min-workers-per-day", type=int, default=None, help="하루 총 근무자 수 최소")
     parser.add_argument("--max-workers-per-day", type=int, default=None, help="하루 총 근무자 수 최대")
-    args = parser.parse_args()
+    parser.add_argument("--hint-file", type=str, default="", help="초기해 힌트로 쓸 근무표(.xlsx/.csv, 원시표 형식, 예: 전월 결과)")
+    parser.add_argument("--hint-last", action="store_true", help="outputs/schedules 의 가장 최근 결과를 초기해 힌트로 사용")
+    parser.add_argument("--no-cache", action="store_true", help="결과 캐시(outputs/cache)를 사용하지 않고 항상 새로 풀이")
+    # 솔버 예산 (미지정 시 rules.yaml 의 solver 섹션 값)
+    parser.add_argument("--time-limit", type=float, default=None, help="최대 풀이 시간(초)")
+    parser.add_argument("--workers", type=int, default=None, help="CP-SAT 탐색 워커 수")
+    parser.add_argument("--rel-gap", type=float, default=None, help="상대 gap 목표 (예: 0.05 = 5%%, 도달 시 종료)")
+    parser.add_argument("--abs-gap", type=float, default=None, help="절대 gap 목표 (목적값-하한 <= 값이면 종료)")
+    parser.add_argument("--stall-seconds", type=float, default=None, help="이 시간 동안 개선이 없으면 종료")
+    parser.add_argument("--portfolio", type=int, default=0, help="seed/설정이 다른 풀이 N개를 병렬 실행해 최선해 사용 (캐시 미사용)")
+    parser.add_argument("--no-precheck", action="store_true", help="솔버 실행 전 용량 사전 점검을 생략")
+    parser.add_argument("--no-explain", action="store_true", help="해 없음일 때 원인(충돌 규칙) 분석을 생략")
+    parser.add_argument("--summary", action="store_true", help="직원별 시프트 횟수/총근로/연장과 일자별 근무 인원 출력")
+    parser.add_argument("--verify", action="store_true", help="결과 근무표로 목적값을 독립 재계산해 솔버 값과 비교 (불일치 시 종료 코드 1)")
+    parser.add_argument("--seed", type=int, default=0, help="포트폴리오 첫 멤버의 random_seed (이후 +1씩)")
+    parser.add_argument("--history-file", type=str, default="", help="경계 이력으로 쓸 전월 근무표(.xlsx/.csv, 원시표 형식). 마지막 며칠을 D1 이전 근무로 반영")
+    parser.add_argument("--window", type=int, default=0, help="롤링 풀이 창 길이(일). 0 이면 기간 전체를 한 번에 풀이")
+    parser.add_argument("--overlap", type=int, default=7, help="롤링 창끼리 겹치는 일수 (창마다 window - overlap 일을 확정)")
+    parser.add_argument("--service-url", type=str, default=os.environ.get("SCHEDULER_SERVICE_URL", ""),
+                        help="이 프로세스에서 풀지 않고 스케줄링 서비스(python -m src.service)에 작업으로 보냄 "
+                             "(예: http://127.0.0.1:8765, 기본값: 환경 변수 SCHEDULER_SERVICE_URL)")
+    args = parser.parse_args(argv)
+    if args.service_url and (args.window > 0 or args.portfolio > 0):
+        parser.error("--service-url 은 --window / --portfolio 와 함께 쓸 수 없습니다.")
+    exports = list(dict.fromkeys(f.strip().lower() for f in args.export.split(",") if f.strip()))
+    exports = [f for f in exports if f != "none"]
+    if exports:
+        from .postprocess import EXPORTERS
+
+        unknown = [f for f in exports if f not in EXPORTERS]
+        if unknown:
+            parser.error(f"알 수 없는 저장 형식: {', '.join(unknown)} (가능: {', '.join(EXPORTERS)}, none)")
+
+    from .config import load_all, load_employees_from_csv, shift_masks_from
+    from .precheck import run_prechecks
+    from .rules import history_span, history_tail
 
     rules, default_employees_obj, demand, vacations = load_all()
-    employees = [e.name for e in default_employees_obj]
+    solver_options = dict(rules.solver)
+    for key, val in (("max_time_in_seconds", args.time_limit), ("num_search_workers", args.workers),
+                     ("relative_gap_limit", args.rel_gap), ("absolute_gap_limit", args.abs_gap),
+                     ("stall_seconds", args.stall_seconds)):
+        if val is not None:
+            solver_options[key] = val
+    employee_objs = default_employees_obj
 
     if args.employees_file:
-        alt = load_employees_from_csv(args.employees_file)
-        employees = [e.name for e in alt]
+        employee_objs = load_employees_from_csv(args.employees_file)
+    employees = [e.name for e in employee_objs]
 
     selected = parse_employees_arg(args.employees)
     if selected:
@@ -35,7 +285,28 @@ def main():
     if len(employees) < 2:
         print("[주의] 직원 수가 매우 적습니다. 해를 찾지 못할 수 있어요.")
 
-    schedule, status = build_and_solve(
+    hint = None
+    hint_path = args.hint_file
+    if args.hint_last and not hint_path:
+        from .postprocess import latest_saved_schedule
+
+        hint_path = latest_saved_schedule()
+    if hint_path:
+        from .postprocess import load_schedule_table
+
+        hint = load_schedule_table(hint_path)
+        print(f"초기해 힌트: {hint_path} ({len(hint)}명)")
+    elif args.hint_last:
+        print("[주의] 저장된 이전 결과가 없어 힌트 없이 실행합니다.")
+
+    history = None
+    if args.history_file:
+        from .postprocess import load_schedule_table
+
+        history = history_tail(load_schedule_table(args.history_file), history_span(rules.constraints))
+        print(f"경계 이력: {args.history_file} (마지막 {history_span(rules.constraints)}일, {len(history)}명)")
+
+    solve_kwargs = dict(
         employees=employees,
         horizon=args.horizon,
         hours=rules.hours,
@@ -47,12 +318,86 @@ def main():
         min_workers_per_day=args.min_workers_per_day,
         max_workers_per_day=args.max_workers_per_day,
         forbid_free_vac=True,
+        shift_masks=shift_masks_from(employee_objs),
+        history=history,
+        hint_schedule=hint,
+        solver_options=solver_options,
     )
+    model_kwargs = {k: v for k, v in solve_kwargs.items() if k not in ("hint_schedule", "solver_options")}
+
+    if not args.no_precheck:
+        violations = run_prechecks(**model_kwargs)
+        if violations:
+            print("해 상태: INFEASIBLE (사전 점검, 솔버 미실행)")
+            print_conflicts(violations, "사전 점검 위반 (모두 해소해야 해를 찾을 수 있음)")
+            return
+
+    from .scheduler import describe_status, explain_infeasibility
+
+    conflicts = None
+    if args.window > 0:
+        from .rolling import solve_rolling
+
+        schedule, status, windows = solve_rolling(window=args.window, overlap=args.overlap, **solve_kwargs)
+        print(f"해 상태: {describe_status(status)} (롤링 {args.window}일 창, {args.overlap}일 겹침)")
+        print_windows(windows)
+        objective = None  # 창별 목적값의 합은 전체 목적값과 다름
+        if schedule and status not in ("OPTIMAL", "FEASIBLE"):
+            print(f"[주의] {len(next(iter(schedule.values()), []))}일까지만 확정되어 결과를 저장하지 않습니다.")
+            schedule = {}
+    elif args.portfolio > 0:
+        from .portfolio import solve_portfolio
+
+        schedule, status, members = solve_portfolio(
+            members=args.portfolio, total_workers=args.workers, base_seed=args.seed, **solve_kwargs
+        )
+        print(f"해 상태: {describe_status(status)}")
+        print_portfolio(members)
+        objective = min((m.objective for m in members if m.objective is not None), default=None)
+    elif args.service_url:
+        schedule, status, stats, conflicts = solve_remote(
+            args.service_url, dict(solve_kwargs, use_cache=not args.no_cache), explain=not args.no_explain
+        )
+        print(f"해 상태: {describe_status(status, stats)} (서비스 {args.service_url})")
+        objective = None
+        if stats is not None:
+            print_stats(stats)
+            objective = stats.objective
+    else:
+        from .solve_cache import cached_build_and_solve
+
+        schedule, status, stats = cached_build_and_solve(
+            use_cache=not args.no_cache, collect_stats=True, **solve_kwargs
+        )
+        print(f"해 상태: {describe_status(status, stats)}")
+        print_stats(stats)
+        objective = stats.objective
+
+    # 롤링 풀이는 창 단위로 실패하므로 기간 전체 진단과 맞지 않음
+    if status == "INFEASIBLE" and not args.no_explain and args.window <= 0:
+        if conflicts is None:  # 서비스 모드는 서비스 작업자가 이미 진단함
+            conflicts = explain_infeasibility(**model_kwargs)
+        if conflicts:
+            print_conflicts(conflicts)
+            print("위 항목 중 하나 이상을 완화하면 해를 찾을 수 있습니다.")
+
+    if schedule and args.summary:
+        print_summary(schedule, rules.hours)
+    verified = True
+    if schedule and args.verify:
+        inputs = {k: v for k, v in model_kwargs.items() if k not in ("employees", "horizon", "hours", "constraints", "weights")}
+        verified = verify_schedule(schedule, rules, objective, history, inputs)
+    if schedule and exports:
+        from datetime import datetime
+
+        from .postprocess import EXPORTERS, save_schedule_export
 
-    print(f"해 상태: {status}")
-    if schedule and args.export == "excel":
-        path = save_schedule_excel(schedule)
-        print(f"엑셀 저장 완료: {path}")
+        ts = datetime.now().strftime("%Y-%m-%d_%H%M%S")  # 같은 실행의 파일은 같은 시각으로
+        for fmt in exports:
+            path = save_schedule_export(schedule, fmt, rules.hours, ts=ts)
+            print(f"{EXPORTERS[fmt].label} 저장 완료: {path}")
+    if not verified:
+        sys.exit(1)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
\ No newline at end of file
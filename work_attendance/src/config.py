@@ -1,29 +1,84 @@
+import copy
 import csv
+import hashlib
+import io
 import os
+import threading
 import yaml
-from typing import Dict, List, Optional
+from typing import Callable, Dict, List, Optional, Tuple
 from .data_models import Employee, Rules
 
 BASE_DIR = os.path.dirname(os.path.dirname(__file__))
 CONFIG_DIR = os.path.join(BASE_DIR, "configs")
 
+# 설정 파일 파싱 결과 캐시: (절대 경로, 파서) → ((mtime_ns, 크기), 내용 sha256, 파싱 결과)
+# 앱은 위젯을 건드릴 때마다 load_all() 을 다시 부르므로 바뀌지 않은 파일은 다시 읽지 않음
+_FILE_CACHE: Dict[Tuple[str, str], Tuple[Tuple[int, int], str, object]] = {}
+_FILE_CACHE_LOCK = threading.Lock()
+
+def _load_cached(path: str, parse: Callable[[bytes], object]):
+    """
+    path 를 parse(bytes) 로 읽되 결과를 재사용.
+    - mtime/크기가 같으면 파일을 열지 않고 캐시 사용
+    - mtime 만 바뀌고 내용 해시가 같으면(저장만 다시 함) 파싱 생략
+    호출자가 결과를 고쳐도(앱의 rules.constraints 수정 등) 캐시가 바뀌지 않게 사본을 반환
+    """
+    key = (os.path.abspath(path), parse.__name__)
+    st = os.stat(path)
+    sig = (st.st_mtime_ns, st.st_size)
+    with _FILE_CACHE_LOCK:
+        hit = _FILE_CACHE.get(key)
+    if hit is None or hit[0] != sig:
+        with open(path, "rb") as f:
+            data = f.read()
+        digest = hashlib.sha256(data).hexdigest()
+        value = hit[2] if hit is not None and hit[1] == digest else parse(data)
+        hit = (sig, digest, value)
+        with _FILE_CACHE_LOCK:
+            _FILE_CACHE[key] = hit
+    return copy.deepcopy(hit[2])
+
+def clear_config_cache() -> None:
+    with _FILE_CACHE_LOCK:
+        _FILE_CACHE.clear()
+
+def _csv_rows(data: bytes):
+    # Excel에서 저장한 CSV 인코딩(BOM)을 고려하여 utf-8-sig 사용
+    return csv.DictReader(io.StringIO(data.decode("utf-8-sig"), newline=""))
+
+def _parse_yaml(data: bytes) -> dict:
+    return yaml.safe_load(data.decode("utf-8"))
+
 def load_yaml(path: str) -> dict:
-    with open(path, "r", encoding="utf-8") as f:
-        return yaml.safe_load(f)
+    return _load_cached(path, _parse_yaml)
+
+def parse_shift_list(value) -> List[str]:
+    """ "N" / "N;A2" / "N|A2" / "N A2" → ["N", "A2"] (빈 값, NaN 은 빈 목록)"""
+    if value is None or not isinstance(value, str):
+        return []
+    for sep in (";", "|", "/"):
+        value = value.replace(sep, " ")
+    return [s.strip().upper() for s in value.split() if s.strip()]
+
+def shift_masks_from(employees: List[Employee]) -> Dict[str, List[str]]:
+    """직원 목록 → build_and_solve 의 shift_masks (금지 시프트가 있는 직원만)"""
+    return {e.name: list(e.forbidden_shifts) for e in employees if e.forbidden_shifts}
 
 def load_employees_from_csv(path: str) -> List[Employee]:
     if not os.path.exists(path):
         # 웹 배포 시 파일 누락으로 인한 크래시 방지
         return []
+    return _load_cached(path, _parse_employees)
+
+def _parse_employees(data: bytes) -> List[Employee]:
     emps: List[Employee] = []
-    # Excel에서 저장한 CSV 인코딩(BOM)을 고려하여 utf-8-sig 사용
-    with open(path, newline="", encoding="utf-8-sig") as f:
-        reader = csv.DictReader(f)
-        for r in reader:
-            name = (r.get("name") or "").strip()
-            if not name:
-                continue
-            emps.append(Employee(name=name, team=r.get("team"), role=r.get("role")))
+    for r in _csv_rows(data):
+        name = (r.get("name") or "").strip()
+        if not name:
+            continue
+        # (선택) forbidden_shifts 열: 배정 불가 시프트 (예: "N", "N;A2")
+        emps.append(Employee(name=name, team=r.get("team"), role=r.get("role"),
+                             forbidden_shifts=parse_shift_list(r.get("forbidden_shifts"))))
     return emps
 
 def load_employees(path: str) -> List[Employee]:
@@ -33,42 +88,49 @@ def load_employees(path: str) -> List[Employee]:
 def load_demand(path: str) -> Optional[Dict[int, Dict[str, int]]]:
     if not os.path.exists(path):
         return None
+    return _load_cached(path, _parse_demand)
+
+def _parse_demand(data: bytes) -> Dict[int, Dict[str, int]]:
     out: Dict[int, Dict[str, int]] = {}
-    with open(path, newline="", encoding="utf-8-sig") as f:
-        reader = csv.DictReader(f)
-        for r in reader:
-            day = int(r["day"])
-            out[day-1] = {
-                "A": int(r.get("A", 0) or 0),
-                "B": int(r.get("B", 0) or 0),
-                "C": int(r.get("C", 0) or 0),
-                "N": int(r.get("N", 0) or 0),
-            }
+    for r in _csv_rows(data):
+        day = int(r["day"])
+        out[day-1] = {
+            "A": int(r.get("A", 0) or 0),
+            "B": int(r.get("B", 0) or 0),
+            "C": int(r.get("C", 0) or 0),
+            "N": int(r.get("N", 0) or 0),
+        }
     return out
 
 def load_vacations(path: str) -> Dict[str, List[int]]:
-    out: Dict[str, List[int]] = {}
     if not os.path.exists(path):
-        return out
-    with open(path, newline="", encoding="utf-8-sig") as f:
-        reader = csv.DictReader(f)
-        for r in reader:
-            name = (r.get("name") or "").strip()
-            if not name:
-                continue
-            day = int(r["day"]) - 1
-            out.setdefault(name, []).append(day)
+        return {}
+    return _load_cached(path, _parse_vacations)
+
+def _parse_vacations(data: bytes) -> Dict[str, List[int]]:
+    out: Dict[str, List[int]] = {}
+    for r in _csv_rows(data):
+        name = (r.get("name") or "").strip()
+        if not name:
+            continue
+        day = int(r["day"]) - 1
+        out.setdefault(name, []).append(day)
     return out
 
-def load_all():
-    rules_dict = load_yaml(os.path.join(CONFIG_DIR, "rules.yaml"))
+def load_all(config_dir: str = CONFIG_DIR):
+    """
+    config_dir 의 rules.yaml / employees.csv / demand.csv / vacations.csv (병동별 폴더도 같은 구성).
+    파일별로 mtime/내용 해시 기준 캐시를 쓰므로 바뀌지 않은 파일은 다시 파싱하지 않음 (반환값은 매번 새 사본)
+    """
+    rules_dict = load_yaml(os.path.join(config_dir, "rules.yaml")) or {}
     rules = Rules(
         hours=rules_dict.get("hours", {}),
         constraints=rules_dict.get("constraints", {}),
         weights=rules_dict.get("weights", {}),
         calendar=rules_dict.get("calendar", {}),
+        solver=rules_dict.get("solver", {}) or {},
     )
-    employees = load_employees(os.path.join(CONFIG_DIR, "employees.csv"))
-    demand = load_demand(os.path.join(CONFIG_DIR, "demand.csv"))
-    vacations = load_vacations(os.path.join(CONFIG_DIR, "vacations.csv"))
+    employees = load_employees(os.path.join(config_dir, "employees.csv"))
+    demand = load_demand(os.path.join(config_dir, "demand.csv"))
+    vacations = load_vacations(os.path.join(config_dir, "vacations.csv"))
     return rules, employees, demand, vacations
\ No newline at end of file
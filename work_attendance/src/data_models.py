@@ -1,15 +1,298 @@
-from dataclasses import dataclass
-from typing import Dict, Optional
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+from datetime import date
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional, Sequence
+
+if TYPE_CHECKING:  # numpy 는 ScheduleMatrix 를 쓸 때, pandas 는 표 변환(to_frame)에서만 불러옴
+    import numpy as np
+    import pandas as pd
+
+# 근무표 코드 순서 (ScheduleMatrix.codes 값 = 이 목록의 인덱스, 그 밖의 표기는 뒤에 이어 붙임)
+SHIFT_CODES = ("A", "A2", "B", "C", "N", "OFF", "VAC")
 
 @dataclass
 class Employee:
     name: str
     team: Optional[str] = None
     role: Optional[str] = None
+    # 배정 불가 시프트 (예: ["N"] = 야간 불가)
+    forbidden_shifts: List[str] = field(default_factory=list)
 
 @dataclass
 class Rules:
     hours: Dict[str, int]
     constraints: Dict[str, object]
     weights: Dict[str, int]
-    calendar: Dict[str, str]
\ No newline at end of file
+    calendar: Dict[str, str]
+    # 솔버 예산/조기 종료 설정 (scheduler.DEFAULT_SOLVER_OPTIONS 키)
+    solver: Dict[str, object] = field(default_factory=dict)
+
+@dataclass
+class FamilyStats:
+    """제약 묶음(family) 하나가 모델에 추가한 변수/제약 수와 생성 시간"""
+    name: str
+    num_variables: int = 0
+    num_constraints: int = 0
+    build_seconds: float = 0.0
+
+
+@dataclass
+class SolveStats:
+    """build_and_solve 실행 통계 (모델 크기 + 솔버 결과)"""
+    families: List[FamilyStats] = field(default_factory=list)
+    build_seconds: float = 0.0
+    cache_hit: bool = False
+    model_reused: bool = False
+    patch_seconds: float = 0.0
+    num_variables: int = 0
+    num_constraints: int = 0
+    wall_time: float = 0.0
+    objective: Optional[float] = None
+    best_bound: Optional[float] = None
+    num_branches: int = 0
+    num_conflicts: int = 0
+    first_solution_seconds: Optional[float] = None
+    num_solutions: int = 0
+    # 탐색 종료 사유 ("user": 사용자가 중단)
+    stop_reason: str = ""
+
+    def family_rows(self) -> List[Dict[str, object]]:
+        """표 출력용: family별 dict 목록 (변수 수 내림차순)"""
+        rows = [
+            {
+                "family": f.name,
+                "variables": f.num_variables,
+                "constraints": f.num_constraints,
+                "build_ms": round(f.build_seconds * 1000, 1),
+            }
+            for f in self.families
+        ]
+        rows.sort(key=lambda r: (r["variables"] + r["constraints"]), reverse=True)
+        return rows
+
+    def summary_rows(self) -> List[Dict[str, object]]:
+        """표 출력용: 전체 요약 (항목, 값)"""
+        return [
+            {"item": "cache_hit", "value": self.cache_hit},
+            {"item": "model_build_s", "value": round(self.build_seconds, 3)},
+            {"item": "model_reused", "value": self.model_reused},
+            {"item": "patch_s", "value": round(self.patch_seconds, 3)},
+            {"item": "variables", "value": self.num_variables},
+            {"item": "constraints", "value": self.num_constraints},
+            {"item": "solver_wall_s", "value": round(self.wall_time, 3)},
+            {"item": "first_solution_s", "value": None if self.first_solution_seconds is None else round(self.first_solution_seconds, 3)},
+            {"item": "solutions", "value": self.num_solutions},
+            {"item": "stop_reason", "value": self.stop_reason},
+            {"item": "objective", "value": self.objective},
+            {"item": "best_bound", "value": self.best_bound},
+            {"item": "branches", "value": self.num_branches},
+            {"item": "conflicts", "value": self.num_conflicts},
+        ]
+
+
+@dataclass
+class PortfolioMember:
+    """포트폴리오 풀이의 개별 멤버 결과"""
+    index: int
+    seed: int
+    preset: str
+    status: str = "UNKNOWN"
+    objective: Optional[float] = None
+    best_bound: Optional[float] = None
+    wall_time: float = 0.0
+    stop_reason: str = ""
+    error: Optional[str] = None
+
+
+@dataclass
+class RollingWindow:
+    """롤링 풀이의 창 하나 (start: 0부터 시작하는 첫 일자, committed: 이 창에서 확정한 일수)"""
+    index: int
+    start: int
+    days: int
+    committed: int
+    status: str = "UNKNOWN"
+    objective: Optional[float] = None
+    wall_time: float = 0.0
+    build_seconds: float = 0.0
+    stop_reason: str = ""
+
+
+@dataclass
+class WardResult:
+    """배치 풀이의 병동 하나 결과 (report: 저장한 보고서 경로, error: 예외 traceback)"""
+    ward: str
+    status: str = "UNKNOWN"
+    objective: Optional[float] = None
+    wall_time: float = 0.0
+    num_employees: int = 0
+    report: Optional[str] = None
+    message: str = ""
+    error: Optional[str] = None
+
+    def as_row(self) -> Dict[str, object]:
+        """요약 표/CSV 한 줄"""
+        return {
+            "ward": self.ward,
+            "status": self.status,
+            "objective": self.objective,
+            "seconds": round(self.wall_time, 2),
+            "employees": self.num_employees,
+            "report": self.report or "",
+            "message": self.message,
+        }
+
+
+@dataclass
+class Violation:
+    """충돌/위반 규칙 하나 (day: 0부터 시작하는 일자 인덱스, 해당 없으면 None)"""
+    rule: str
+    message: str
+    day: Optional[int] = None
+    employee: Optional[str] = None
+
+    def as_row(self) -> Dict[str, object]:
+        """표 출력용 (일자는 1부터)"""
+        return {
+            "rule": self.rule,
+            "day": None if self.day is None else self.day + 1,
+            "employee": self.employee,
+            "message": self.message,
+        }
+
+
+class _ScheduleView(Mapping):
+    """ScheduleMatrix 의 dict 형태 보기 (직원 → 시프트 문자열 목록, 읽을 때마다 그 행만 변환)"""
+    __slots__ = ("_m",)
+
+    def __init__(self, matrix: "ScheduleMatrix"):
+        self._m = matrix
+
+    def __getitem__(self, employee: str) -> List[str]:
+        return self._m.row(employee)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._m.employees)
+
+    def __len__(self) -> int:
+        return len(self._m.employees)
+
+
+class ScheduleMatrix:
+    """
+    배열 기반 근무표: codes[i, d] = labels 인덱스 (int8, 직원 i × 일자 d).
+    - employees: 행 순서 직원명, dates: 열 날짜 (없으면 D1..Dn)
+    - labels: 코드 → 시프트 표기. 앞부분은 항상 SHIFT_CODES, 그 밖의 표기는 뒤에 추가
+    to_numpy()/to_frame() 은 codes 를 복사 없이 공유하고, as_dict() 는 기존 Dict[str, List[str]] 형태의 보기.
+    save()/load() 는 압축 npz 한 파일 (문자열 대신 코드 1바이트/칸).
+    """
+    __slots__ = ("codes", "employees", "dates", "labels", "_rows")
+
+    def __init__(self, codes, employees: Sequence[str], dates: Optional[Sequence[date]] = None,
+                 labels: Sequence[str] = SHIFT_CODES):
+        import numpy as np
+
+        codes = np.asarray(codes, dtype=np.int8)
+        if codes.ndim != 2 or codes.shape[0] != len(employees):
+            raise ValueError(f"코드 행렬 크기 {codes.shape} 가 직원 {len(employees)}명과 맞지 않습니다.")
+        if dates is not None and len(dates) != codes.shape[1]:
+            raise ValueError(f"날짜 {len(dates)}개가 일수 {codes.shape[1]}와 맞지 않습니다.")
+        if tuple(labels[:len(SHIFT_CODES)]) != SHIFT_CODES:
+            raise ValueError("labels 는 SHIFT_CODES 로 시작해야 합니다.")
+        self.codes = codes
+        self.employees = list(employees)
+        self.dates = None if dates is None else list(dates)
+        self.labels = tuple(labels)
+        self._rows = {e: i for i, e in enumerate(self.employees)}
+
+    @classmethod
+    def from_dict(cls, schedule: Dict[str, List[str]], dates: Optional[Sequence[date]] = None) -> "ScheduleMatrix":
+        """Dict[str, List[str]] → ScheduleMatrix (직원마다 일수가 같아야 함)"""
+        import numpy as np
+
+        employees = list(schedule)
+        horizon = len(schedule[employees[0]]) if employees else 0
+        if any(len(schedule[e]) != horizon for e in employees):
+            raise ValueError("직원마다 근무표 일수가 다릅니다.")
+        lut = {s: i for i, s in enumerate(SHIFT_CODES)}
+        codes = np.fromiter(
+            (lut[s] if s in lut else lut.setdefault(s, len(lut)) for e in employees for s in schedule[e]),
+            dtype=np.int16,
+            count=len(employees) * horizon,
+        )
+        if len(lut) > np.iinfo(np.int8).max:
+            raise ValueError(f"시프트 표기가 너무 많습니다 ({len(lut)}개).")
+        return cls(codes.reshape(len(employees), horizon), employees, dates, tuple(lut))
+
+    @property
+    def shape(self):
+        return self.codes.shape
+
+    @property
+    def horizon(self) -> int:
+        return self.codes.shape[1]
+
+    def __len__(self) -> int:
+        return len(self.employees)
+
+    def __repr__(self) -> str:
+        return f"ScheduleMatrix({len(self.employees)}명 × {self.horizon}일)"
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, ScheduleMatrix):
+            return NotImplemented
+        return (self.employees == other.employees and self.dates == other.dates
+                and self.to_dict() == other.to_dict())
+
+    def row(self, employee: str) -> List[str]:
+        """직원 한 명의 시프트 문자열 목록"""
+        labels = self.labels
+        return [labels[c] for c in self.codes[self._rows[employee]].tolist()]
+
+    def as_dict(self) -> Mapping:
+        """Dict[str, List[str]] 처럼 읽는 보기 (복사 없음, 행을 읽을 때 변환)"""
+        return _ScheduleView(self)
+
+    def to_dict(self) -> Dict[str, List[str]]:
+        """Dict[str, List[str]] 로 변환 (JSON 저장/기존 함수 전달용)"""
+        labels = self.labels
+        return {e: [labels[c] for c in row] for e, row in zip(self.employees, self.codes.tolist())}
+
+    def to_numpy(self) -> "np.ndarray":
+        """코드 행렬 (복사 없음)"""
+        return self.codes
+
+    def column_labels(self) -> List[str]:
+        return [f"D{j + 1}" for j in range(self.horizon)] if self.dates is None else list(self.dates)
+
+    def to_frame(self, decode: bool = False) -> "pd.DataFrame":
+        """
+        행 = 직원, 열 = 날짜(또는 D1..Dn).
+        decode=False: 코드 행렬을 복사 없이 감싼 int8 표, True: 시프트 표기 범주형(category) 표
+        """
+        import pandas as pd
+
+        if not decode:
+            return pd.DataFrame(self.codes, index=self.employees, columns=self.column_labels(), copy=False)
+        data = {
+            col: pd.Categorical.from_codes(self.codes[:, j], categories=list(self.labels))
+            for j, col in enumerate(self.column_labels())
+        }
+        return pd.DataFrame(data, index=self.employees)
+
+    def save(self, path: str) -> None:
+        """압축 npz 로 저장 (코드 행렬 + 직원/날짜/표기)"""
+        import numpy as np
+
+        dates = [] if self.dates is None else [d.isoformat() for d in self.dates]
+        with open(path, "wb") as f:
+            np.savez_compressed(f, codes=self.codes, employees=np.array(self.employees, dtype=str),
+                                dates=np.array(dates, dtype=str), labels=np.array(self.labels, dtype=str))
+
+    @classmethod
+    def load(cls, path: str) -> "ScheduleMatrix":
+        import numpy as np
+
+        with np.load(path, allow_pickle=False) as z:
+            dates = [date.fromisoformat(d) for d in z["dates"].tolist()] or None
+            return cls(z["codes"], z["employees"].tolist(), dates, z["labels"].tolist())
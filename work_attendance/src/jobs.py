@@ -0,0 +1,117 @@
+# src/jobs.py
+import threading
+import time
+import traceback
+from typing import Callable, Dict, List, Optional
+
+
+class SolveJob:
+    """
+    스케줄 풀이를 백그라운드 스레드에서 실행하고 진행 상황을 보관.
+    solve_fn은 build_and_solve와 같은 인자를 받아야 하며(on_solution, stop_event, collect_stats 포함),
+    UI(Streamlit 등)는 snapshot()으로 현재 최선해/목적값 이력을 읽고 cancel()로 조기 종료할 수 있음.
+    diagnose: 결과가 INFEASIBLE 이면 같은 스레드에서 이어 부를 인자 없는 함수 (예: explain_infeasibility 부분 적용).
+    반환값은 conflicts 에 담기며, 진단이 끝나야 done 이 됨 (진단 중에는 snapshot()["diagnosing"])
+    """
+
+    def __init__(self, solve_fn: Callable, solve_kwargs: Dict[str, object],
+                 diagnose: Optional[Callable[[], list]] = None):
+        self._solve_fn = solve_fn
+        self._kwargs = dict(solve_kwargs)
+        self._diagnose = diagnose
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        # 진행 상황
+        self.best_schedule: Dict[str, List[str]] = {}
+        self.best_objective: Optional[float] = None
+        self.history: List[Dict[str, float]] = []  # [{"t": 경과초, "objective": 값}]
+        # 최종 결과
+        self.schedule: Dict[str, List[str]] = {}
+        self.status: Optional[str] = None
+        self.stats = None
+        self.error: Optional[str] = None
+        self.conflicts: list = []
+        self.diagnosing = False
+
+    def _on_solution(self, schedule: Dict[str, List[str]], objective: float) -> None:
+        with self._lock:
+            self.best_schedule = schedule
+            self.best_objective = objective
+            self.history.append({"t": round(time.time() - self.started_at, 2), "objective": objective})
+
+    def _run(self) -> None:
+        try:
+            result = self._solve_fn(
+                **self._kwargs,
+                on_solution=self._on_solution,
+                stop_event=self._stop,
+                collect_stats=True,
+            )
+            with self._lock:
+                self.schedule, self.status, self.stats = result
+                self.diagnosing = self.status == "INFEASIBLE" and self._diagnose is not None
+            if self.diagnosing:
+                self._run_diagnose()
+        except Exception:
+            with self._lock:
+                self.status = "ERROR"
+                self.error = traceback.format_exc()
+        finally:
+            self.diagnosing = False
+            self.finished_at = time.time()
+
+    def _run_diagnose(self) -> None:
+        """진단 실패는 풀이 결과(INFEASIBLE)를 바꾸지 않고 error 에만 남김"""
+        try:
+            conflicts = self._diagnose()
+        except Exception:
+            with self._lock:
+                self.error = traceback.format_exc()
+            return
+        with self._lock:
+            self.conflicts = conflicts
+
+    def start(self) -> "SolveJob":
+        self.started_at = time.time()
+        self._thread = threading.Thread(target=self._run, name="solve-job", daemon=True)
+        self._thread.start()
+        return self
+
+    def cancel(self) -> None:
+        """탐색 중단 요청: 솔버가 멈추면 현재 최선해가 최종 결과가 됨"""
+        self._stop.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._stop.is_set()
+
+    @property
+    def done(self) -> bool:
+        return self.finished_at is not None
+
+    def elapsed(self) -> float:
+        if self.started_at is None:
+            return 0.0
+        return (self.finished_at or time.time()) - self.started_at
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        if self._thread is not None:
+            self._thread.join(timeout)
+        return self.done
+
+    def snapshot(self) -> Dict[str, object]:
+        """현재 상태 복사본 (다른 스레드에서 읽기용)"""
+        with self._lock:
+            return {
+                "done": self.done,
+                "elapsed": round(self.elapsed(), 1),
+                "best_schedule": self.best_schedule,
+                "best_objective": self.best_objective,
+                "history": list(self.history),
+                "status": self.status,
+                "cancelled": self.cancelled,
+                "diagnosing": self.diagnosing,
+            }
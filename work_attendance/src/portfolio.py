@@ -0,0 +1,140 @@
+# src/portfolio.py
+import os
+import threading
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import Manager
+from typing import Dict, List, Optional, Tuple
+
+from .data_models import PortfolioMember
+from .scheduler import DEFAULT_SOLVER_OPTIONS, build_and_solve
+
+# 멤버별 CP-SAT 매개변수 프리셋 (멤버 i → PORTFOLIO_PRESETS[i % len])
+PORTFOLIO_PRESETS: List[Tuple[str, Dict[str, object]]] = [
+    ("default", {}),
+    ("lp_heavy", {"linearization_level": 2}),
+    ("no_lp", {"linearization_level": 0}),
+    ("core", {"optimize_with_core": True}),
+]
+
+
+def _bridge_stop(shared: dict, local_stop: threading.Event, done: threading.Event, bound: List[float]) -> None:
+    """
+    다른 멤버가 최적/해없음을 증명하면(공유 이벤트) 이 멤버의 탐색도 중단.
+    이 멤버의 하한(bound[0])이 공유 최선값에 도달해도 최적이 증명된 것이므로 전체를 중단
+    """
+    while not done.is_set():
+        if shared["finished"].wait(0.2):
+            local_stop.set()
+            return
+        if bound[0] >= shared["best"].value:
+            shared["finished"].set()
+            local_stop.set()
+            return
+
+
+def _run_member(index: int, seed: int, preset: str, params: Dict[str, object],
+                solve_kwargs: Dict[str, object], shared: dict):
+    """프로세스 풀 작업: 멤버 하나 풀이. (schedule, PortfolioMember) 반환"""
+    member = PortfolioMember(index=index, seed=seed, preset=preset)
+    local_stop = threading.Event()
+    done = threading.Event()
+    bound = [float("-inf")]  # 탐색 중 이 멤버의 최선 하한 (bridge 스레드가 공유 최선값과 비교)
+    threading.Thread(target=_bridge_stop, args=(shared, local_stop, done, bound), daemon=True).start()
+
+    def publish(objective):
+        # 공유 incumbent 갱신 (모든 멤버의 최선 목적값, 근무표는 만들지 않음)
+        with shared["lock"]:
+            if objective < shared["best"].value:
+                shared["best"].value = objective
+
+    def track_bound(value):
+        bound[0] = max(bound[0], value)
+
+    kwargs = dict(solve_kwargs)
+    kwargs["solver_options"] = {**kwargs.get("solver_options", {}), **params, "random_seed": seed}
+    try:
+        schedule, status, stats = build_and_solve(
+            **kwargs,
+            on_objective=publish,
+            on_bound=track_bound,
+            stop_event=local_stop,
+            collect_stats=True,
+            reuse_model=False,
+        )
+    except Exception:
+        member.status = "ERROR"
+        member.error = traceback.format_exc()
+        return {}, member
+    finally:
+        done.set()
+
+    member.status = status
+    member.objective = stats.objective
+    member.best_bound = stats.best_bound
+    if member.best_bound is None and status != "INFEASIBLE" and bound[0] > float("-inf"):
+        member.best_bound = bound[0]  # 해를 못 찾고 중단된 멤버도 탐색 중 하한은 남김
+    member.wall_time = stats.wall_time
+    member.stop_reason = stats.stop_reason if not (stats.stop_reason == "user" and shared["finished"].is_set()) else "portfolio"
+
+    # 증명 완료(최적/해없음) 또는 이 멤버의 하한이 공유 최선값에 도달 → 나머지 멤버 중단
+    with shared["lock"]:
+        global_best = shared["best"].value
+    proven = status in ("OPTIMAL", "INFEASIBLE")
+    if stats.best_bound is not None and stats.best_bound >= global_best:
+        proven = True
+    if proven and member.stop_reason != "portfolio":
+        shared["finished"].set()
+    return schedule, member
+
+
+def solve_portfolio(
+    members: int = 4,
+    total_workers: Optional[int] = None,
+    base_seed: int = 0,
+    **solve_kwargs,
+) -> Tuple[Dict[str, List[str]], str, List[PortfolioMember]]:
+    """
+    seed/프리셋이 다른 독립 풀이 members개를 ProcessPoolExecutor로 동시에 실행하고 최선해를 반환.
+    - CPU 코어(total_workers, 기본 os.cpu_count())를 멤버끼리 나눠 num_search_workers로 사용
+    - 멤버들은 최선 목적값을 공유하고, 한 멤버가 최적/해없음을 증명하거나
+      탐색 중 하한이 공유 최선값에 도달하면 나머지는 즉시 중단
+    solve_kwargs: build_and_solve 인자 (on_solution/on_objective/on_bound/stop_event/collect_stats 제외)
+    반환: (best_schedule, status, 멤버별 결과 목록)
+    """
+    members = max(1, int(members))
+    total_workers = int(total_workers or os.cpu_count() or 1)
+    per_member = max(1, total_workers // members)
+    base_opts = {**DEFAULT_SOLVER_OPTIONS, **(solve_kwargs.pop("solver_options", None) or {})}
+    base_opts["num_search_workers"] = per_member
+    solve_kwargs["solver_options"] = base_opts
+
+    results: List[Tuple[Dict[str, List[str]], PortfolioMember]] = []
+    with Manager() as manager:
+        shared = {
+            "best": manager.Value("d", float("inf")),
+            "lock": manager.Lock(),
+            "finished": manager.Event(),
+        }
+        with ProcessPoolExecutor(max_workers=members) as pool:
+            futures = []
+            for i in range(members):
+                preset, params = PORTFOLIO_PRESETS[i % len(PORTFOLIO_PRESETS)]
+                futures.append(pool.submit(_run_member, i, base_seed + i, preset, params, solve_kwargs, shared))
+            for f in futures:
+                results.append(f.result())
+
+    member_results = [m for _, m in results]
+    solved = [(sch, m) for sch, m in results if sch and m.objective is not None]
+    if solved:
+        best_schedule, best = min(solved, key=lambda r: r[1].objective)
+        # 최선 목적값이 어느 멤버의 하한과 같으면 OPTIMAL.
+        # gap 목표가 있으면 멤버의 OPTIMAL 은 gap 도달일 수 있으므로 하한 비교로만 판정
+        gap_limited = float(base_opts.get("relative_gap_limit") or 0) > 0 or float(base_opts.get("absolute_gap_limit") or 0) > 0
+        proven = (not gap_limited and any(m.status == "OPTIMAL" for m in member_results)) or any(
+            m.best_bound is not None and m.best_bound >= best.objective for m in member_results
+        )
+        return best_schedule, "OPTIMAL" if proven else "FEASIBLE", member_results
+    if any(m.status == "INFEASIBLE" for m in member_results):
+        return {}, "INFEASIBLE", member_results
+    return {}, member_results[0].status if member_results else "UNKNOWN", member_results
@@ -1,38 +1,100 @@
 # src/postprocess.py
 import io
+import json
 import os
+from dataclasses import dataclass
 from datetime import date, timedelta, datetime
-from typing import Dict, List, Tuple
+from typing import Callable, Dict, List, Optional, Tuple, Union
 
+import numpy as np
 import pandas as pd
-from openpyxl import Workbook
-from openpyxl.styles import PatternFill, Font, Alignment, Border, Side
-from openpyxl.utils import get_column_letter
+
+from .aggregate import SHIFT_CODES, WORK_CODES, schedule_frame, summarize
+from .data_models import ScheduleMatrix
 
 BASE_DIR = os.path.dirname(os.path.dirname(__file__))
 OUTPUT_DIR = os.path.join(BASE_DIR, "outputs")
 SCHED_DIR = os.path.join(OUTPUT_DIR, "schedules")
 LOGS_DIR = os.path.join(OUTPUT_DIR, "logs")
-os.makedirs(SCHED_DIR, exist_ok=True)
-os.makedirs(LOGS_DIR, exist_ok=True)
+# 출력 폴더는 import 시점이 아니라 실제로 파일을 쓸 때 만든다
 
 # ---------- 기존 단순 저장(원시표) ----------
 def save_schedule_excel(schedule: Dict[str, List[str]], filename_prefix: str = "schedule"):
-    df = _to_df(schedule)
-    ts = datetime.now().strftime("%Y-%m-%d_%H%M%S")
-    path = os.path.join(SCHED_DIR, f"{filename_prefix}_{ts}.xlsx")
-    with pd.ExcelWriter(path, engine="openpyxl") as writer:
-        df.to_excel(writer, index=False, sheet_name="schedule")
-    return path
+    return save_schedule_export(schedule, "excel", filename_prefix=filename_prefix)
 
 def _to_df(schedule: Dict[str, List[str]]) -> pd.DataFrame:
-    rows = []
-    for e, days in schedule.items():
-        row = {"직원": e}
-        for i, s in enumerate(days):
-            row[f"D{i+1}"] = s
-        rows.append(row)
-    return pd.DataFrame(rows)
+    return schedule_frame(schedule, "직원")
+
+# 보고서 표기 → 내부 시프트 코드
+DISPLAY_TO_SHIFT = {"주휴": "OFF", "휴가": "VAC"}
+
+def _cell_text(v) -> str:
+    return "" if pd.isna(v) else str(v).strip()
+
+def _report_table(raw: pd.DataFrame) -> Optional[Dict[str, List[str]]]:
+    """
+    보고서형 시트(제목 / 날짜 / 요일 / 직원 행 / 빈 줄 / 일자별 집계)면 스케줄 dict, 아니면 None.
+    일자 열은 '날짜' 행에서 요약 열(A, A2, ... 연장) 앞까지, 직원 행은 첫 빈 이름 행 앞까지
+    """
+    names = [_cell_text(v) for v in raw.iloc[:, 0]]
+    if "날짜" not in names:
+        return None
+    head = names.index("날짜")
+    horizon = 0
+    for v in raw.iloc[head, 1:]:
+        if _cell_text(v) in ("", *SUMMARY_COLS):
+            break
+        horizon += 1
+    first = head + 2 if head + 1 < len(names) and names[head + 1] == "요일" else head + 1
+    schedule: Dict[str, List[str]] = {}
+    for r in range(first, len(names)):
+        if not names[r] or names[r] == "nan":
+            break
+        row = [_cell_text(v) for v in raw.iloc[r, 1:1 + horizon]]
+        schedule[names[r]] = [DISPLAY_TO_SHIFT.get(v, v) for v in row]
+    return schedule
+
+def load_schedule_table(src, name_columns: Tuple[str, ...] = ("직원", "name")) -> Dict[str, List[str]]:
+    """
+    원시표(직원/name 열 + D1..Dn 열) 또는 보고서형(근무명령서) 형식의 .xlsx/.csv를 스케줄 dict로 읽음.
+    save_schedule_excel / 앱의 원시·보고서형 엑셀 다운로드 결과(손으로 고친 파일 포함)를 그대로 읽을 수 있음.
+    src: 파일 경로 또는 업로드된 파일 객체(.name 속성 사용)
+    """
+    fname = str(getattr(src, "name", src)).lower()
+    if fname.endswith(".csv"):
+        raw = pd.read_csv(src, encoding="utf-8-sig", header=None)
+    else:
+        raw = pd.read_excel(src, header=None)
+    report = _report_table(raw)
+    if report is not None:
+        return report
+    df = raw.iloc[1:].reset_index(drop=True)
+    df.columns = [_cell_text(c) for c in raw.iloc[0]]
+    name_col = next((c for c in name_columns if c in df.columns), df.columns[0])
+    day_cols = [c for c in df.columns if str(c).startswith("D") and str(c)[1:].isdigit()]
+    day_cols.sort(key=lambda c: int(str(c)[1:]))
+    schedule: Dict[str, List[str]] = {}
+    for _, r in df.iterrows():
+        name = str(r[name_col]).strip()
+        if not name or name == "nan":
+            continue
+        row = []
+        for c in day_cols:
+            v = "" if pd.isna(r[c]) else str(r[c]).strip()
+            row.append(DISPLAY_TO_SHIFT.get(v, v))
+        schedule[name] = row
+    return schedule
+
+def latest_saved_schedule(filename_prefix: str = "schedule"):
+    """outputs/schedules 에 저장된 가장 최근 원시표 경로 (없으면 None)"""
+    if not os.path.isdir(SCHED_DIR):
+        return None
+    report = EXPORTERS["report"].suffix  # 같은 시각의 보고서형 파일보다 원시표를 우선
+    files = [f for f in os.listdir(SCHED_DIR)
+             if f.startswith(filename_prefix + "_") and f.endswith(".xlsx") and not f.endswith(report)]
+    if not files:
+        return None
+    return os.path.join(SCHED_DIR, max(files))
 
 # ---------- 보고서형 엑셀(색상/합계/하단 집계) ----------
 SHIFT_COLOR = {
@@ -41,194 +103,312 @@ SHIFT_COLOR = {
     "B": "F4B7C3",  # 연한 핑크
     "C": "FFF2CC",  # 연한 노랑
     "N": "C6E0B4",  # 연한 연두
-    "N": "C6E0B4",  # 연한 연두
     "OFF": "D9D9D9",  # 회색(휴무)
     "주휴": "D9D9D9", # Mapped
     "VAC": "F8CBAD",  # 살구(휴가)
     "휴가": "F8CBAD", # Mapped
 }
 
-THIN_BORDER = Border(
-    left=Side(style="thin", color="999999"),
-    right=Side(style="thin", color="999999"),
-    top=Side(style="thin", color="999999"),
-    bottom=Side(style="thin", color="999999"),
-)
+# 내부 시프트 코드 → 보고서 표기
+SHIFT_TO_DISPLAY = {v: k for k, v in DISPLAY_TO_SHIFT.items()}
 
-CENTER = Alignment(horizontal="center", vertical="center")
+# 셀 서식 (xlsxwriter format 속성). ReportWorkbook 이 통합 문서마다 한 번씩만 만들어 재사용
+THIN_BORDER = {"border": 1, "border_color": "#999999"}
+CENTER = {"align": "center", "valign": "vcenter"}
 
 KOR_DOW = ["월", "화", "수", "목", "금", "토", "일"]
 
-def _hours_local(hours_map: Dict[str, int]) -> Dict[str, int]:
-    # 누락 시 0으로 보정
-    keys = ["A", "A2", "B", "C", "N", "OFF", "VAC"]
-    return {k: int(hours_map.get(k, 0)) for k in keys}
+_PAD = 5 / 7  # xlsxwriter 열 폭 여백 (글자 폭 7px 기준 5px)
+
+SUMMARY_COLS = ["A", "A2", "B", "C", "N", "주휴", "휴가", "총근로", "연장"]
 
 def _weekday_ko(d: date) -> str:
     # Python: Monday=0 → "월"
     return KOR_DOW[d.weekday()]
 
+def _sheet_name(name: str, used: set) -> str:
+    """엑셀 시트 이름 규칙(31자, 금지 문자 []:*?/\\, 중복 불가)에 맞게 정리"""
+    for ch in "[]:*?/\\":
+        name = name.replace(ch, "_")
+    name = (name.strip() or "Sheet")[:31]
+    base, k = name, 2
+    while name.lower() in used:
+        suffix = f"({k})"
+        name = base[:31 - len(suffix)] + suffix
+        k += 1
+    used.add(name.lower())
+    return name
+
+class ReportWorkbook:
+    """
+    보고서형 근무표 통합 문서 (xlsxwriter).
+    서식은 생성 시 한 번만 만들고, add_schedule() 마다 시트 하나를 위에서 아래로 한 번에 기록한다.
+    병동/월별 여러 근무표를 시트로 나눠 한 파일에 담을 수 있음.
+
+        with ReportWorkbook() as book:
+            book.add_schedule(sched_a, hours, month_title="A병동 1월 근무명령서", sheet_name="A병동")
+            book.add_schedule(sched_b, hours, month_title="B병동 1월 근무명령서", sheet_name="B병동")
+        data = book.getvalue()
+
+    target: 파일 경로 또는 쓰기 가능한 파일 객체. None 이면 메모리(BytesIO)에 기록 → getvalue()
+    """
+
+    def __init__(self, target=None):
+        import xlsxwriter  # 보고서를 만들 때만 불러옴
+
+        self._buf = io.BytesIO() if target is None else None
+        out = self._buf if target is None else target
+        self._wb = xlsxwriter.Workbook(out, {"in_memory": True})
+        self._sheet_names: set = set()
+        self._closed = False
+        self._make_formats()
+
+    def _fmt(self, **props):
+        return self._wb.add_format(props)
+
+    def _make_formats(self) -> None:
+        cell = {**CENTER, **THIN_BORDER}
+        self.f_title = self._fmt(size=16, bold=True, **CENTER)
+        self.f_bold = self._fmt(bold=True)
+        self.f_label = self._fmt(bold=True, **THIN_BORDER)
+        self.f_name = self._fmt(bold=True, align="left", valign="vcenter", **THIN_BORDER)
+        self.f_border = self._fmt(**THIN_BORDER)
+        self.f_cell = self._fmt(**cell)
+        self.f_weekend_day = self._fmt(bg_color="#EDF2F7", **cell)
+        self.f_weekend_dow = self._fmt(font_color="#9C0006", bold=True, **cell)
+        self.f_summary_head = self._fmt(bold=True, bg_color="#E2EFDA", **cell)
+        self.f_total = self._fmt(bg_color="#E7E6E6", **cell)
+        self.f_shift = {k: self._fmt(bg_color=f"#{color}", **cell) for k, color in SHIFT_COLOR.items()}
+
+    def add_schedule(
+        self,
+        schedule: Union[Dict[str, List[str]], ScheduleMatrix],
+        hours_map: Dict[str, int],
+        month_title: str = None,            # 예: "만성요양과 1월 근무명령서"
+        start_date: date = None,            # 달력 시작일 (없으면 오늘 기준 1일)
+        base_month_hours: int = 209,        # 월 소정근로시간(연장근로 계산 기준)
+        sheet_name: str = "근무명령서",
+    ) -> str:
+        """근무표 하나를 새 시트로 기록. 실제 사용한 시트 이름 반환"""
+        if not schedule:
+            raise ValueError("빈 스케줄입니다.")
+        summary = summarize(schedule, hours_map, base_month_hours)
+        if isinstance(schedule, ScheduleMatrix):
+            schedule = schedule.as_dict()
+
+        employees = list(schedule.keys())
+        horizon = len(next(iter(schedule.values())))
+
+        if start_date is None:
+            today = date.today()
+            start_date = date(today.year, today.month, 1)
+
+        dates = [start_date + timedelta(days=i) for i in range(horizon)]
+        weekend = [d.weekday() >= 5 for d in dates]
+        n_cols = 1 + horizon + len(SUMMARY_COLS)
+        name = _sheet_name(sheet_name, self._sheet_names)
+        ws = self._wb.add_worksheet(name)
+
+        # 열 폭: 직원명 / 일자 / 요약 (xlsxwriter 는 글자 폭에 여백 5px 을 더해 저장하므로 빼서 기존 파일과 같은 폭)
+        ws.set_column(0, 0, 16 - _PAD)
+        ws.set_column(1, horizon, 4.0 - _PAD)
+        ws.set_column(1 + horizon, n_cols - 1, 9.0 - _PAD)
+
+        # 제목
+        title = month_title or f"{start_date.year}년 {start_date.month}월 근무명령서"
+        ws.merge_range(0, 0, 0, n_cols - 1, title, self.f_title)
+
+        # 날짜(숫자) + 요약 헤더
+        ws.write(1, 0, "날짜", self.f_label)
+        for j, d in enumerate(dates):
+            ws.write_number(1, 1 + j, d.day, self.f_weekend_day if weekend[j] else self.f_cell)
+        for i, h in enumerate(SUMMARY_COLS):
+            ws.write(1, 1 + horizon + i, h, self.f_summary_head)
+
+        # 요일 (요약 열 자리는 테두리만)
+        ws.write(2, 0, "요일", self.f_label)
+        for j, d in enumerate(dates):
+            ws.write(2, 1 + j, _weekday_ko(d), self.f_weekend_dow if weekend[j] else self.f_cell)
+        for i in range(len(SUMMARY_COLS)):
+            ws.write_blank(2, 1 + horizon + i, None, self.f_border)
+
+        # 직원별 행 (+ 우측 요약: 시프트 횟수/총근로/연장은 aggregate 로 한 번에 집계)
+        summary_vals = np.column_stack(
+            [summary.counts[:, :len(SHIFT_CODES)], summary.total_hours, summary.overtime]
+        ).tolist()
+        row = 3
+        for e, vals in zip(employees, summary_vals):
+            ws.write(row, 0, e, self.f_name)
+            for j, s in enumerate(schedule[e]):
+                disp_s = SHIFT_TO_DISPLAY.get(s, s)
+                ws.write(row, 1 + j, disp_s, self.f_shift.get(s) or self.f_shift.get(disp_s) or self.f_cell)
+            for i, v in enumerate(vals):
+                ws.write_number(row, 1 + horizon + i, v, self.f_cell)
+            row += 1
+
+        # 빈 한 줄 + 하단 집계 섹션
+        row += 1
+        ws.write(row, 0, "일자별 집계", self.f_bold)
+        row += 1
+
+        # 1) 총 근무 인원(OFF/VAC 제외)
+        ws.write(row, 0, "총 근무 인원", self.f_bold)
+        ws.write_row(row, 1, summary.per_day_total.tolist(), self.f_total)
+        row += 1
+
+        # 2) 시프트별 인원
+        for k, s in enumerate(WORK_CODES):
+            ws.write(row, 0, f"{s} 인원", self.f_bold)
+            ws.write_row(row, 1, summary.per_day[k].tolist(), self.f_shift.get(s, self.f_cell))
+            row += 1
+        return name
+
+    def close(self) -> None:
+        if not self._closed:
+            self._wb.close()
+            self._closed = True
+
+    def getvalue(self) -> bytes:
+        """메모리에 기록한 경우 완성된 xlsx 바이트 (필요하면 close)"""
+        self.close()
+        if self._buf is None:
+            raise ValueError("파일로 기록한 통합 문서입니다.")
+        return self._buf.getvalue()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
 def build_formatted_workbook_bytes(
-    schedule: Dict[str, List[str]],
+    schedule: Union[Dict[str, List[str]], ScheduleMatrix],
     hours_map: Dict[str, int],
     month_title: str = None,            # 예: "만성요양과 1월 근무명령서"
     start_date: date = None,            # 달력 시작일 (없으면 오늘 기준 1일)
     base_month_hours: int = 209,        # 월 소정근로시간(연장근로 계산 기준)
 ) -> bytes:
     """
-    보고서형 근무표를 openpyxl로 작성하여 bytes로 반환(다운로드용)
+    보고서형 근무표를 xlsx bytes로 반환(다운로드용). 시트 하나짜리 ReportWorkbook
     """
-    if not schedule:
-        raise ValueError("빈 스케줄입니다.")
-
-    employees = list(schedule.keys())
-    horizon = len(next(iter(schedule.values())))
-
-    if start_date is None:
-        today = date.today()
-        start_date = date(today.year, today.month, 1)
-
-    dates = [start_date + timedelta(days=i) for i in range(horizon)]
-    hours = _hours_local(hours_map)
-
-    # --- 집계 ---
-    # 직원별 시프트 카운트/총근로시간/연장근로
-    per_emp = {}
-    for e, days in schedule.items():
-        cnt = {s: 0 for s in ["A", "A2", "B", "C", "N", "OFF", "VAC"]}
-        total_hours = 0
-        for s in days:
-            cnt[s] = cnt.get(s, 0) + 1
-            total_hours += hours.get(s, 0)
-        overtime = max(total_hours - int(base_month_hours), 0)
-        per_emp[e] = (cnt, total_hours, overtime)
-
-    # 일자별 집계(OFF/VAC 제외 총 근무인원 + A/B/C/N 별)
-    per_day_total = [0] * horizon
-    per_day_by_shift = {s: [0] * horizon for s in ["A", "A2", "B", "C", "N"]}
-    for j in range(horizon):
-        for e in employees:
-            s = schedule[e][j]
-            if s in ["A", "A2", "B", "C", "N"]:
-                per_day_total[j] += 1
-                per_day_by_shift[s][j] += 1
-
-    # --- 워크북 생성 ---
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "근무명령서"
-
-    # 열 폭 설정
-    ws.column_dimensions["A"].width = 16  # 직원명
-    for col in range(2, 2 + horizon):
-        ws.column_dimensions[get_column_letter(col)].width = 4.0
-    # 요약 열 폭
-    summary_cols = ["A", "A2", "B", "C", "N", "주휴", "휴가", "총근로", "연장"]
-    for i in range(len(summary_cols)):
-        ws.column_dimensions[get_column_letter(2 + horizon + i)].width = 9.0
-
-    row = 1
-    # 제목
-    title = month_title or f"{start_date.year}년 {start_date.month}월 근무명령서"
-    end_col = get_column_letter(1 + horizon + len(summary_cols))
-    ws.merge_cells(start_row=row, start_column=1, end_row=row, end_column=1 + horizon + len(summary_cols))
-    c = ws.cell(row=row, column=1, value=title)
-    c.font = Font(size=16, bold=True)
-    c.alignment = CENTER
-    row += 1
-
-    # 날짜(숫자)
-    ws.cell(row=row, column=1, value="날짜").font = Font(bold=True)
-    for j, d in enumerate(dates):
-        cell = ws.cell(row=row, column=2 + j, value=d.day)
-        cell.alignment = CENTER
-        cell.border = THIN_BORDER
-        # 주말 음영
-        if d.weekday() >= 5:
-            cell.fill = PatternFill("solid", fgColor="EDF2F7")
-    # 요약 헤더 자리 확보(빈칸)
-    for i, h in enumerate(summary_cols):
-        cell = ws.cell(row=row, column=2 + horizon + i, value=h)
-        cell.font = Font(bold=True)
-        cell.alignment = CENTER
-        cell.border = THIN_BORDER
-        cell.fill = PatternFill("solid", fgColor="E2EFDA")
-    row += 1
-
-    # 요일
-    ws.cell(row=row, column=1, value="요일").font = Font(bold=True)
-    for j, d in enumerate(dates):
-        cell = ws.cell(row=row, column=2 + j, value=_weekday_ko(d))
-        cell.alignment = CENTER
-        cell.border = THIN_BORDER
-        if d.weekday() >= 5:
-            cell.font = Font(color="9C0006", bold=True)  # 토/일 강조
-    row += 1
-
-    # 직원별 행
-    for e in employees:
-        ws.cell(row=row, column=1, value=e).font = Font(bold=True)
-        ws.cell(row=row, column=1).alignment = Alignment(horizontal="left", vertical="center")
-        ws.cell(row=row, column=1).border = THIN_BORDER
-
-        days = schedule[e]
-        for j, s in enumerate(days):
-            # Display mapping
-            disp_s = s
-            if s == "OFF": disp_s = "주휴"
-            elif s == "VAC": disp_s = "휴가"
-            
-            cell = ws.cell(row=row, column=2 + j, value=disp_s)
-            cell.alignment = CENTER
-            cell.border = THIN_BORDER
-            fill_color = SHIFT_COLOR.get(s) or SHIFT_COLOR.get(disp_s)
-            if fill_color:
-                cell.fill = PatternFill("solid", fgColor=fill_color)
-        # 우측 요약
-        cnt, total_h, ot_h = per_emp[e]
-        vals = [cnt["A"], cnt["A2"], cnt["B"], cnt["C"], cnt["N"], cnt["OFF"], cnt["VAC"], total_h, ot_h]
-        for i, v in enumerate(vals):
-            c2 = ws.cell(row=row, column=2 + horizon + i, value=v)
-            c2.alignment = CENTER
-            c2.border = THIN_BORDER
-        row += 1
+    with ReportWorkbook() as book:
+        book.add_schedule(schedule, hours_map, month_title, start_date, base_month_hours)
+    return book.getvalue()
 
-    # 빈 한 줄
-    row += 1
-
-    # 하단 집계 섹션 제목
-    ws.cell(row=row, column=1, value="일자별 집계").font = Font(bold=True)
-    row += 1
-
-    # 1) 총 근무 인원(OFF/VAC 제외)
-    ws.cell(row=row, column=1, value="총 근무 인원").font = Font(bold=True)
-    for j, v in enumerate(per_day_total):
-        cell = ws.cell(row=row, column=2 + j, value=v)
-        cell.alignment = CENTER
-        cell.border = THIN_BORDER
-        cell.fill = PatternFill("solid", fgColor="E7E6E6")
-    row += 1
-
-    # 2) 시프트별(A/B/C/N) 인원
-    for s in ["A", "A2", "B", "C", "N"]:
-        ws.cell(row=row, column=1, value=f"{s} 인원").font = Font(bold=True)
-        for j, v in enumerate(per_day_by_shift[s]):
-            cell = ws.cell(row=row, column=2 + j, value=v)
-            cell.alignment = CENTER
-            cell.border = THIN_BORDER
-            fill_color = SHIFT_COLOR.get(s)
-            if fill_color:
-                cell.fill = PatternFill("solid", fgColor=fill_color)
-        row += 1
+def build_report_workbook_bytes(reports: List[Dict[str, object]]) -> bytes:
+    """
+    여러 근무표(병동/월)를 시트별로 담은 xlsx bytes.
+    reports: ReportWorkbook.add_schedule 인자 dict 목록 (schedule, hours_map, month_title, start_date, sheet_name ...)
+    """
+    with ReportWorkbook() as book:
+        for r in reports:
+            book.add_schedule(**r)
+    return book.getvalue()
+
+# ---------- 내보내기 형식 (원시/보고서형 엑셀 + 급여·인트라넷 연동용 CSV/JSON/Parquet) ----------
+@dataclass(frozen=True)
+class Exporter:
+    """
+    근무표 → 파일 bytes 변환기.
+    write(schedule, hours_map, month_title=None, start_date=None, base_month_hours=209) -> bytes
+    """
+    name: str
+    label: str
+    suffix: str   # 파일 이름 끝 (확장자 포함)
+    mime: str
+    write: Callable[..., bytes]
+
+# 형식 이름 → Exporter (register_exporter 로 추가/교체)
+EXPORTERS: Dict[str, Exporter] = {}
+
+def register_exporter(name: str, label: str, suffix: str, mime: str):
+    """내보내기 형식 등록 데코레이터. 같은 이름을 다시 등록하면 교체"""
+    def deco(fn):
+        EXPORTERS[name] = Exporter(name, label, suffix, mime, fn)
+        return fn
+    return deco
+
+def export_schedule(schedule: Union[Dict[str, List[str]], ScheduleMatrix], fmt: str,
+                    hours_map: Optional[Dict[str, int]] = None, **options) -> bytes:
+    """근무표를 fmt 형식 bytes 로 변환 (options: month_title, start_date, base_month_hours)"""
+    if fmt not in EXPORTERS:
+        raise ValueError(f"알 수 없는 내보내기 형식: {fmt} (가능: {', '.join(EXPORTERS)})")
+    return EXPORTERS[fmt].write(schedule, hours_map or {}, **options)
+
+def save_schedule_export(schedule: Union[Dict[str, List[str]], ScheduleMatrix], fmt: str,
+                         hours_map: Optional[Dict[str, int]] = None, filename_prefix: str = "schedule",
+                         ts: Optional[str] = None, **options) -> str:
+    """export_schedule 결과를 outputs/schedules/<prefix>_<시각><suffix> 로 저장하고 경로 반환"""
+    data = export_schedule(schedule, fmt, hours_map, **options)
+    ts = ts or datetime.now().strftime("%Y-%m-%d_%H%M%S")
+    os.makedirs(SCHED_DIR, exist_ok=True)
+    path = os.path.join(SCHED_DIR, f"{filename_prefix}_{ts}{EXPORTERS[fmt].suffix}")
+    with open(path, "wb") as f:
+        f.write(data)
+    return path
+
+def export_table(schedule: Union[Dict[str, List[str]], ScheduleMatrix], hours_map: Dict[str, int],
+                 start_date: date = None, base_month_hours: int = 209) -> pd.DataFrame:
+    """
+    연동용 직원별 표: employee, 일자 열(D1..Dn, start_date 가 있으면 YYYY-MM-DD), count_<시프트>,
+    total_hours, overtime_hours. 시프트는 내부 코드(OFF/VAC) 그대로
+    """
+    summary = summarize(schedule, hours_map, base_month_hours)
+    df = schedule_frame(schedule, "employee")
+    if start_date is not None:
+        df.columns = ["employee"] + [(start_date + timedelta(days=j)).isoformat() for j in range(df.shape[1] - 1)]
+    counts = pd.DataFrame(summary.counts[:, :len(SHIFT_CODES)], columns=[f"count_{s}" for s in SHIFT_CODES])
+    df = pd.concat([df, counts], axis=1)
+    df["total_hours"] = summary.total_hours
+    df["overtime_hours"] = summary.overtime
+    return df
+
+@register_exporter("excel", "원시 엑셀", ".xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
+def _export_excel(schedule, hours_map, **_) -> bytes:
+    """원시표 (직원, D1..Dn). load_schedule_table / --hint-file 로 다시 읽을 수 있음"""
+    buf = io.BytesIO()
+    with pd.ExcelWriter(buf, engine="openpyxl") as writer:
+        _to_df(schedule).to_excel(writer, index=False, sheet_name="schedule")
+    return buf.getvalue()
+
+@register_exporter("report", "보고서형 엑셀", "_report.xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
+def _export_report(schedule, hours_map, month_title=None, start_date=None, base_month_hours=209) -> bytes:
+    return build_formatted_workbook_bytes(schedule, hours_map, month_title, start_date, base_month_hours)
+
+@register_exporter("csv", "CSV", ".csv", "text/csv")
+def _export_csv(schedule, hours_map, start_date=None, base_month_hours=209, **_) -> bytes:
+    # Excel 에서 바로 열어도 한글이 깨지지 않게 BOM 포함
+    return export_table(schedule, hours_map, start_date, base_month_hours).to_csv(index=False).encode("utf-8-sig")
 
-    # 격자 테두리(헤더 포함 영역)
-    total_rows = 2 + 1 + len(employees)  # 날짜/요일 + 직원행
-    for r in range(2, total_rows + 1):
-        for c_idx in range(1, 1 + horizon + len(summary_cols) + 1):
-            ws.cell(row=r, column=c_idx).border = THIN_BORDER
+@register_exporter("json", "JSON", ".json", "application/json")
+def _export_json(schedule, hours_map, start_date=None, base_month_hours=209, **_) -> bytes:
+    """{start_date, dates, horizon, base_month_hours, hours, employees: [{name, shifts, counts, total_hours, overtime_hours}]}"""
+    summary = summarize(schedule, hours_map, base_month_hours)
+    rows = schedule.as_dict() if isinstance(schedule, ScheduleMatrix) else schedule
+    horizon = summary.per_day.shape[1]
+    doc = {
+        "start_date": start_date.isoformat() if start_date is not None else None,
+        "dates": [(start_date + timedelta(days=j)).isoformat() for j in range(horizon)] if start_date is not None else None,
+        "horizon": horizon,
+        "base_month_hours": int(base_month_hours),
+        "hours": {s: int(hours_map.get(s, 0)) for s in SHIFT_CODES},
+        "employees": [
+            {
+                "name": e,
+                "shifts": list(rows[e]),
+                "counts": {s: int(c) for s, c in zip(SHIFT_CODES, summary.counts[i])},
+                "total_hours": int(summary.total_hours[i]),
+                "overtime_hours": int(summary.overtime[i]),
+            }
+            for i, e in enumerate(summary.employees)
+        ],
+    }
+    return json.dumps(doc, ensure_ascii=False, indent=1).encode("utf-8")
 
-    # 반환: 메모리 바이트
+@register_exporter("parquet", "Parquet", ".parquet", "application/vnd.apache.parquet")
+def _export_parquet(schedule, hours_map, start_date=None, base_month_hours=209, **_) -> bytes:
+    # pyarrow 필요 (streamlit 의존성으로 함께 설치됨)
     buf = io.BytesIO()
-    wb.save(buf)
-    buf.seek(0)
-    return buf.getvalue()
\ No newline at end of file
+    export_table(schedule, hours_map, start_date, base_month_hours).to_parquet(buf, index=False)
+    return buf.getvalue()
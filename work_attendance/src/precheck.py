@@ -0,0 +1,188 @@
+# src/precheck.py
+"""
+모델을 만들기 전에 산술만으로 확인하는 용량 점검 (수 ms).
+여기서 위반이 나오면 CP-SAT 를 돌려도 INFEASIBLE 이므로 솔버를 건너뛴다.
+각 점검은 필요조건만 본다: 통과했다고 해가 있다는 보장은 없음.
+"""
+import math
+from typing import Dict, List, Optional, Tuple
+
+from .data_models import Violation
+from .rules import _night_range, _workers_range
+
+# 하루 근무자 수(workcount)에 포함되는 시프트 (scheduler 의 workers_per_day 와 동일)
+COUNTED_SHIFTS = ("A", "B", "C", "N")
+
+
+def _vacation_runs(days: List[int], horizon: int) -> List[List[int]]:
+    """휴가일(범위 내)을 연속 구간으로 묶음"""
+    runs: List[List[int]] = []
+    for d in sorted(set(d for d in days if 0 <= d < horizon)):
+        if runs and runs[-1][-1] == d - 1:
+            runs[-1].append(d)
+        else:
+            runs.append([d])
+    return runs
+
+
+def run_prechecks(
+    employees: List[str],
+    horizon: int,
+    hours: Dict[str, int],
+    constraints: Dict[str, object],
+    weights: Optional[Dict[str, int]] = None,
+    demand: Optional[Dict[int, Dict[str, int]]] = None,
+    vacations: Optional[Dict[str, List[int]]] = None,
+    workers_per_day: Optional[int] = None,
+    min_workers_per_day: Optional[int] = None,
+    max_workers_per_day: Optional[int] = None,
+    forbid_free_vac: bool = True,
+    prev_n_employees: Optional[List[str]] = None,
+    min_off_overrides: Optional[Dict[str, int]] = None,
+    incompatible_employees: Optional[List[str]] = None,
+    shift_masks: Optional[Dict[str, List[str]]] = None,
+    history: Optional[Dict[str, List[str]]] = None,
+    night_bounds: Optional[Dict[str, Tuple[int, int]]] = None,
+) -> List[Violation]:
+    """
+    build_and_solve 와 같은 입력으로 명백한 해 없음 사유를 찾아 Violation 목록으로 반환 (없으면 빈 목록).
+    weights, incompatible_employees 는 인자 호환용 (점검에 사용하지 않음)
+    forbid_free_vac 이 꺼져 있으면 아무 날이나 VAC 로 쉴 수 있으므로 4) 점검을 건너뜀
+    shift_masks 로 N 금지인 직원은 N 관련 점검에서 제외
+    history 는 전날이 N 인 직원만 전월 N 근무자처럼 D1 휴무로 보고, night_bounds 는 직원별 N 하한에 사용
+    """
+    out: List[Violation] = []
+    vacations = vacations or {}
+    prev_n = set(prev_n_employees or [])
+    prev_n |= {e for e, row in (history or {}).items() if row and str(row[-1]).strip().upper() == "N"}
+    night_bounds = night_bounds or {}
+    min_off_overrides = min_off_overrides or {}
+    n_emp = len(employees)
+    vac_sets = {e: set(d for d in vacations.get(e, []) if 0 <= d < horizon) for e in employees}
+    masks = {e: set((shift_masks or {}).get(e, [])) for e in employees}
+    # 하루 근무자 수에 들어가는 시프트를 하나라도 할 수 있는 직원 / N 가능 직원
+    counted_staff = [e for e in employees if not set(COUNTED_SHIFTS) <= masks[e]]
+    night_staff = [e for e in employees if "N" not in masks[e]]
+
+    if n_emp == 0 or horizon <= 0:
+        return [Violation(rule="structure", message="직원 또는 계획 일수가 없습니다.")]
+
+    # 1) 하루 근무 인원 범위
+    lo_w, hi_w = _workers_range(workers_per_day, min_workers_per_day, max_workers_per_day)
+    if demand is None:
+        if lo_w > hi_w:
+            out.append(Violation(rule="workers_per_day", message=f"하루 근무 인원 최소({lo_w}명)가 최대({hi_w}명)보다 큽니다."))
+        if lo_w > 0:
+            for d in range(horizon):
+                avail = sum(1 for e in counted_staff if d not in vac_sets[e] and not (d == 0 and e in prev_n))
+                if avail < lo_w:
+                    out.append(Violation(
+                        rule="min_workers_per_day", day=d,
+                        message=f"{d + 1}일 근무 가능 인원 {avail}명 < 최소 근무 인원 {lo_w}명 (휴가/전월 N 제외)",
+                    ))
+    else:
+        # 시프트별 수요 합계 vs 근무 가능 인원
+        for d, need_map in demand.items():
+            if not (0 <= d < horizon):
+                continue
+            need = sum(int(need_map.get(s, 0)) for s in COUNTED_SHIFTS)
+            avail = sum(1 for e in counted_staff if d not in vac_sets[e] and not (d == 0 and e in prev_n))
+            if need > avail:
+                out.append(Violation(rule="demand", day=d, message=f"{d + 1}일 수요 {need}명 > 근무 가능 인원 {avail}명"))
+
+    # 2) 직원별 N 횟수
+    lo_n, hi_n = _night_range(
+        int(constraints.get("min_night_shifts_per_employee", 0)),
+        int(constraints.get("max_night_shifts_per_employee", 0)),
+    )
+    if lo_n > hi_n:
+        out.append(Violation(rule="night_shifts_per_employee", message=f"직원별 N 최소({lo_n})가 최대({hi_n})보다 큽니다."))
+
+    max_n_day = int(constraints.get("max_night_workers_per_day", 0))
+    n_night = len(night_staff)
+    if lo_n > 0 and max_n_day > 0 and lo_n * n_night > max_n_day * horizon:
+        out.append(Violation(
+            rule="max_night_workers_per_day",
+            message=f"필요 N 합계 {lo_n}×{n_night}명 = {lo_n * n_night} > 가능 N 자리 {max_n_day}×{horizon}일 = {max_n_day * horizon}",
+        ))
+
+    default_off = max(1, int(constraints.get("min_off_after_N", 1)))
+    if lo_n > 0 or night_bounds:
+        for e in night_staff:  # N 금지 직원은 최소 횟수 대상 아님
+            lo_e = int(night_bounds.get(e, (lo_n, hi_n))[0])
+            if lo_e <= 0:
+                continue
+            # N 뒤에는 k일 휴무가 붙으므로 N 은 (k+1)일에 한 번 이하, 휴가/전월 N 의 D1 은 N 불가
+            k = max(1, int(min_off_overrides.get(e, default_off)))
+            blocked = vac_sets[e] | ({0} if e in prev_n else set())
+            cap = min(horizon - len(blocked), math.ceil(horizon / (k + 1)))
+            if cap < lo_e:
+                out.append(Violation(
+                    rule="min_night_shifts_per_employee", employee=e,
+                    message=f"{e}: 가능한 N 최대 {cap}회 < 최소 N {lo_e}회 (N 후 휴무 {k}일, 휴가 {len(vac_sets[e])}일)",
+                ))
+
+    # 3) 주간 근무시간
+    window = int(constraints.get("weekly_hours_window", 7) or 0)
+    max_h = int(constraints.get("max_weekly_hours", 52) or 0)
+    # 기간이 창 하나보다 짧으면 scheduler 가 주간 근무시간 제약을 걸지 않으므로 점검하지 않음
+    weekly = bool(window and max_h and horizon >= window)
+    if weekly:
+        n_hours = int(hours.get("N", 0))
+        # 기간을 겹치지 않는 창으로 나누면 총 근무시간 <= max_h × 창 개수
+        total_cap = max_h * math.ceil(horizon / window)
+        if lo_n > 0 and lo_n * n_hours > total_cap:
+            out.append(Violation(
+                rule="max_weekly_hours",
+                message=f"최소 N {lo_n}회 × {n_hours}시간 = {lo_n * n_hours}시간 > 기간 내 최대 {total_cap}시간",
+            ))
+        vac_hours = int(hours.get("VAC", 0))
+        if vac_hours > 0:
+            for e in employees:
+                for start in range(max(1, horizon - window + 1)):
+                    used = vac_hours * sum(1 for d in range(start, start + window) if d in vac_sets[e])
+                    if used > max_h:
+                        out.append(Violation(
+                            rule="max_weekly_hours", day=start, employee=e,
+                            message=f"{e}: {start + 1}일부터 {window}일간 휴가 시간 {used}시간 > {max_h}시간",
+                        ))
+                        break
+
+        # 하루 최소 인원을 채울 만큼의 총 근무일이 있는지 (가장 짧은 근무 시프트 기준)
+        counted_hours = [int(hours.get(s, 0)) for s in COUNTED_SHIFTS if int(hours.get(s, 0)) > 0]
+        if demand is None and lo_w > 0 and counted_hours:
+            per_window = max_h // min(counted_hours)
+            per_emp = min(horizon, per_window * math.ceil(horizon / window))
+            capacity = sum(min(per_emp, horizon - len(vac_sets[e])) for e in counted_staff)
+            if capacity < lo_w * horizon:
+                out.append(Violation(
+                    rule="max_weekly_hours",
+                    message=f"주간 근무시간 상한으로 가능한 근무 {capacity}인·일 < 필요 {lo_w}명×{horizon}일 = {lo_w * horizon}인·일",
+                ))
+
+    # 4) forbid_off_after_day_shift 에서는 OFF 가 N/휴가/OFF 뒤에만 올 수 있으므로,
+    #    N 금지 직원은 휴가가 없으면 D1 부근 외엔 쉴 수 없음 → 주간 근무시간 상한과 충돌
+    #    (forbid_free_vac=False 면 솔버가 임의의 날에 VAC 를 넣어 쉴 수 있으므로 해당 없음)
+    if forbid_free_vac and constraints.get("forbid_off_after_day_shift", False) and weekly and counted_hours:
+        run_cap = int(constraints.get("max_consecutive_off_days", 0)) or horizon
+        min_week_hours = min(counted_hours) * window
+        if min_week_hours > max_h and horizon - run_cap >= window:
+            for e in employees:
+                if "N" in masks[e] and not vac_sets[e]:
+                    out.append(Violation(
+                        rule="forbid_off_after_day_shift", employee=e,
+                        message=f"{e}: N 금지 + '주간 근무 후 휴무 금지' → 휴가 없이는 쉴 수 없어 주 {max_h}시간 초과",
+                    ))
+
+    # 5) 휴가가 최대 연속 휴무일보다 길게 이어지는 경우 (휴가도 휴무로 셈)
+    max_off = int(constraints.get("max_consecutive_off_days", 0))
+    if max_off > 0:
+        for e in employees:
+            for run in _vacation_runs(list(vac_sets[e]), horizon):
+                if len(run) > max_off:
+                    out.append(Violation(
+                        rule="max_consecutive_off_days", day=run[0], employee=e,
+                        message=f"{e}: {run[0] + 1}~{run[-1] + 1}일 연속 휴가 {len(run)}일 > 최대 연속 휴무 {max_off}일",
+                    ))
+
+    return out
@@ -0,0 +1,129 @@
+# src/rolling.py
+"""
+롤링 호라이즌 풀이: 긴 기간을 겹치는 창(예: 14일, 7일 겹침)으로 나눠 차례로 풀고
+창마다 앞부분(window - overlap 일)만 확정한다. 확정한 근무는 다음 창의 경계 이력(history)이 되어
+N 후 휴무, 주간 근무시간, 연속 근무/휴무 규칙이 창 경계에서 끊기지 않는다.
+모델 크기가 창 길이로 고정되므로 계획 기간이 길어져도 풀이 시간은 창 개수에 비례한다.
+"""
+import math
+from typing import Dict, List, Optional, Tuple
+
+from .data_models import RollingWindow, ScheduleMatrix
+from .rules import _PARAM_MAX, _night_range, history_span
+from .scheduler import build_and_solve
+
+# 창마다 rolling 이 직접 정하는 build_and_solve 인자
+_MANAGED_ARGS = ("history", "night_bounds", "hint_schedule", "hint_offset", "collect_stats")
+
+
+def _night_bounds(done: Dict[str, int], lo_n: int, hi_n: int, commit: int, left: int,
+                  last: bool) -> Dict[str, Tuple[int, int]]:
+    """
+    직원별 이번 창 N 횟수 (하한, 상한): done(이미 확정한 N 횟수)을 뺀 남은 횟수를
+    남은 일수 대비 이번 창 확정 일수 비율로 나눔 (하한은 내림, 상한은 올림).
+    겹침 구간은 다음 창에서 다시 풀므로 비율에 넣지 않음 (창마다 확정 일수의 합 = 남은 일수).
+    마지막 창은 남은 횟수 그대로.
+    """
+    out: Dict[str, Tuple[int, int]] = {}
+    for e, n in done.items():
+        need = max(0, lo_n - n)
+        room = _PARAM_MAX if hi_n >= _PARAM_MAX else max(0, hi_n - n)
+        if not last:
+            need = need * commit // left
+            if room < _PARAM_MAX:
+                room = math.ceil(room * commit / left)
+        out[e] = (min(need, room), room)
+    return out
+
+
+def solve_rolling(
+    employees: List[str],
+    horizon: int,
+    hours: Dict[str, int],
+    constraints: Dict[str, object],
+    weights: Dict[str, int],
+    demand: Optional[Dict[int, Dict[str, int]]] = None,
+    vacations: Optional[Dict[str, List[int]]] = None,
+    window: int = 14,
+    overlap: int = 7,
+    history: Optional[Dict[str, List[str]]] = None,
+    hint_schedule: Optional[Dict[str, List[str]]] = None,
+    prev_n_employees: Optional[List[str]] = None,
+    **solve_kwargs,
+) -> Tuple[Dict[str, List[str]], str, List[RollingWindow]]:
+    """
+    horizon 일을 window 일 창으로 나눠 풀이. 창 시작은 (window - overlap) 일씩 이동하고 마지막 창은 끝까지 확정.
+    - history: 첫 창의 경계 이력 (전월 근무), 이후 창은 확정한 근무에서 이어받음
+    - 직원별 N 최소/최대는 창마다 남은 횟수를 비율로 나눠 night_bounds 로 전달
+    - 휴가/수요 일자는 창 기준으로 옮기고, prev_n_employees / hint_schedule 은 첫 창에만 사용
+    - 다음 창은 직전 창 해의 겹친 부분을 초기해 힌트로 사용
+    solve_kwargs: 그 밖의 build_and_solve 인자 (solver_options 는 창마다 그대로 적용)
+    반환: (schedule, status, 창별 결과). 모든 창이 풀리면 "FEASIBLE"(창 단위 최적일 뿐 전체 최적 보장 없음),
+    중간 창이 실패하면 그 창의 상태와 그때까지 확정한 근무표. as_matrix=True 이면 근무표는 ScheduleMatrix.
+    """
+    window = max(1, int(window))
+    overlap = min(max(0, int(overlap)), window - 1)
+    for k in _MANAGED_ARGS:
+        solve_kwargs.pop(k, None)
+    as_matrix = bool(solve_kwargs.pop("as_matrix", False))  # 창 결과는 dict 로 이어 붙이고 마지막에 변환
+    solve_kwargs.setdefault("reuse_model", False)  # 창마다 이력이 달라 캐시 모델을 밀어내기만 함
+    stop_event = solve_kwargs.get("stop_event")
+
+    lo_n, hi_n = _night_range(
+        int(constraints.get("min_night_shifts_per_employee", 0)),
+        int(constraints.get("max_night_shifts_per_employee", 0)),
+    )
+    span = history_span(constraints, solve_kwargs.get("min_off_overrides"))
+    carry = {e: list(row)[-span:] for e, row in (history or {}).items() if e in employees and row}
+    done = {e: 0 for e in employees}
+    schedule: Dict[str, List[str]] = {e: [] for e in employees}
+    windows: List[RollingWindow] = []
+    hint, hint_offset = hint_schedule, 0
+    status = "FEASIBLE"
+
+    start = 0
+    while start < horizon:
+        days = min(window, horizon - start)
+        last = start + days >= horizon
+        commit = days if last else days - overlap
+        win_vac = {
+            e: [d - start for d in ds if start <= d < start + days]
+            for e, ds in (vacations or {}).items()
+        }
+        win_demand = None
+        if demand is not None:
+            win_demand = {d - start: m for d, m in demand.items() if start <= d < start + days}
+        sol, win_status, stats = build_and_solve(
+            employees, days, hours, constraints, weights,
+            demand=win_demand,
+            vacations=win_vac,
+            prev_n_employees=prev_n_employees if start == 0 else None,
+            history=carry,
+            night_bounds=_night_bounds(done, lo_n, hi_n, commit, horizon - start, last),
+            hint_schedule=hint,
+            hint_offset=hint_offset,
+            collect_stats=True,
+            **solve_kwargs,
+        )
+        windows.append(RollingWindow(
+            index=len(windows), start=start, days=days, committed=commit if sol else 0,
+            status=win_status, objective=stats.objective, wall_time=stats.wall_time,
+            build_seconds=stats.build_seconds, stop_reason=stats.stop_reason,
+        ))
+        if not sol:
+            status = win_status
+            break
+        for e in employees:
+            fixed = sol[e][:commit]
+            schedule[e].extend(fixed)
+            done[e] += fixed.count("N")
+            carry[e] = (carry.get(e, []) + fixed)[-span:]
+        hint, hint_offset = sol, commit
+        start += commit
+        if stop_event is not None and stop_event.is_set() and start < horizon:
+            status = "UNKNOWN"
+            break
+
+    if as_matrix:
+        return (ScheduleMatrix.from_dict(schedule) if any(schedule.values()) else None), status, windows
+    return schedule, status, windows
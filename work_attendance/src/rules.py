@@ -0,0 +1,100 @@
+# src/rules.py
+"""
+솔버 없이 쓰는 규칙 매개변수/경계 이력 도우미와 규칙 표시 이름.
+scheduler(모델 생성)와 precheck / validators(근무표 검사)가 함께 사용한다.
+ortools 를 가져오지 않으므로 사전 점검과 근무표 검사만 하는 경로는 솔버 로딩 비용이 없다.
+"""
+from typing import Dict, List, Optional, Tuple
+
+# 매개변수 변수(하루 인원 범위, N 횟수 상/하한)의 도메인 상한
+_PARAM_MAX = 10_000
+
+
+# 진단 결과 표시용 규칙 이름
+RULE_LABELS = {
+    "max_weekly_hours": "주간 최대 근무시간",
+    "forbid_B_then_A": "B 다음날 A 금지",
+    "min_off_after_N": "N 후 최소 휴무",
+    "forbid_A_after_N_rest": "N-휴무 직후 A 금지",
+    "forbid_three_A_in_row": "A 3연속 금지",
+    "forbid_N_OFF_N": "N-휴무-N 금지",
+    "forbid_off_after_day_shift": "주간 근무 후 휴무 금지",
+    "min_night_shifts_per_employee": "직원별 최소 N 횟수",
+    "max_night_shifts_per_employee": "직원별 최대 N 횟수",
+    "min_consecutive_work_days": "최소 연속 근무일",
+    "max_night_workers_per_day": "하루 최대 N 근무자",
+    "max_consecutive_off_days": "최대 연속 휴무일",
+    "incompatible_employees": "동반 N 근무 금지",
+    "demand": "시프트별 수요",
+    "min_workers_per_day": "하루 최소 근무 인원",
+    "max_workers_per_day": "하루 최대 근무 인원",
+    "vacation": "휴가 요청",
+    "prev_n_employees": "전월 말일 N 근무자 D1 휴무",
+}
+
+
+def _night_range(min_night_shifts: int, max_night_shifts: int) -> Tuple[int, int]:
+    """직원별 N 횟수 (하한, 상한). 0/None = 미사용 → 0 / _PARAM_MAX"""
+    lo = int(min_night_shifts) if min_night_shifts and min_night_shifts > 0 else 0
+    hi = int(max_night_shifts) if max_night_shifts and max_night_shifts > 0 else _PARAM_MAX
+    return lo, hi
+
+
+def _workers_range(workers_per_day: Optional[int], min_workers_per_day: Optional[int],
+                   max_workers_per_day: Optional[int]) -> Tuple[int, int]:
+    """하루 총 근무자 수 (하한, 상한). workers_per_day 는 최소/최대가 모두 없을 때만 정확히 == 로 사용"""
+    if workers_per_day is not None and min_workers_per_day is None and max_workers_per_day is None:
+        return int(workers_per_day), int(workers_per_day)
+    lo = int(min_workers_per_day) if min_workers_per_day is not None else 0
+    hi = int(max_workers_per_day) if max_workers_per_day is not None else _PARAM_MAX
+    return lo, hi
+
+
+def _rest_cap(constraints: Dict[str, object], min_off_overrides: Optional[Dict[str, int]]) -> int:
+    """모델이 지원해야 하는 N 후 휴무일수 최댓값"""
+    return max([2, int(constraints.get("min_off_after_N", 1))] + [int(v) for v in (min_off_overrides or {}).values()])
+
+
+def _history_span(constraints: Dict[str, object], rest_cap: int) -> int:
+    """
+    경계 이력으로 반영하는 일수: 기간 첫날에 걸칠 수 있는 가장 긴 규칙 창 - 1
+    (N 후 휴무, 주간 근무시간 창, 최대 연속 휴무, 최소 연속 근무, N 후 3일 휴무 벌점)
+    """
+    window = int(constraints.get("weekly_hours_window", 7) or 0) if constraints.get("max_weekly_hours", 52) else 0
+    return max(
+        3, int(rest_cap), window - 1,
+        int(constraints.get("max_consecutive_off_days", 0)),
+        int(constraints.get("min_consecutive_work_days", 0)),
+    )
+
+
+def history_span(constraints: Dict[str, object], min_off_overrides: Optional[Dict[str, int]] = None) -> int:
+    """이 규칙으로 풀 때 필요한 경계 이력 일수 (이보다 앞선 날은 모델에서 잘라냄)"""
+    return _history_span(constraints, _rest_cap(constraints, min_off_overrides))
+
+
+def history_tail(schedule: Dict[str, List[str]], days: int, end: Optional[int] = None) -> Dict[str, List[str]]:
+    """근무표 각 행의 end 일(미지정 시 끝) 직전 days 일 → 다음 기간의 경계 이력 (history 인자 형식)"""
+    out: Dict[str, List[str]] = {}
+    for e, row in (schedule or {}).items():
+        stop = len(row) if end is None else min(int(end), len(row))
+        tail = list(row[max(0, stop - int(days)):stop])
+        if tail:
+            out[e] = tail
+    return out
+
+
+def _trim_history(history: Optional[Dict[str, List[str]]], employees: List[str], span: int,
+                  shifts: List[str]) -> Dict[str, Tuple[str, ...]]:
+    """명단 직원의 이력을 마지막 span 일로 자르고 시프트 이름 확인"""
+    out: Dict[str, Tuple[str, ...]] = {}
+    names = set(employees)
+    for e, row in (history or {}).items():
+        if e not in names or not row or span <= 0:
+            continue
+        row = [str(s).strip().upper() for s in row][-span:]
+        bad = sorted(set(row) - set(shifts))
+        if bad:
+            raise ValueError(f"{e}: 경계 이력에 알 수 없는 시프트 {bad}")
+        out[e] = tuple(row)
+    return out
@@ -1,5 +1,1088 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
 from ortools.sat.python import cp_model
-from typing import Dict, List, Tuple, Optional
+from typing import Callable, Dict, FrozenSet, List, Tuple, Optional, Union
+
+from .data_models import SHIFT_CODES, FamilyStats, ScheduleMatrix, SolveStats, Violation
+from .rules import (  # noqa: F401  (history_span / history_tail / RULE_LABELS 는 이 모듈 이름으로도 사용)
+    RULE_LABELS, _PARAM_MAX, _history_span, _night_range, _rest_cap, _trim_history, _workers_range,
+    history_span, history_tail,
+)
+
+
+class _FamilyTracker:
+    """
+    제약 묶음(family)별 변수/제약 수와 생성 시간을 기록.
+    start(name)을 호출하면 직전 family를 닫고 새 family를 시작함.
+    """
+
+    def __init__(self, model: cp_model.CpModel):
+        self.model = model
+        self.families: List[FamilyStats] = []
+        self._current: Optional[str] = None
+        self._t0 = 0.0
+        self._nv0 = 0
+        self._nc0 = 0
+        self._started = time.perf_counter()
+
+    def _sizes(self) -> Tuple[int, int]:
+        proto = self.model.Proto()
+        return len(proto.variables), len(proto.constraints)
+
+    def start(self, name: str) -> None:
+        self.finish()
+        self._current = name
+        self._t0 = time.perf_counter()
+        self._nv0, self._nc0 = self._sizes()
+
+    def finish(self) -> None:
+        if self._current is None:
+            return
+        nv, nc = self._sizes()
+        self.families.append(FamilyStats(
+            name=self._current,
+            num_variables=nv - self._nv0,
+            num_constraints=nc - self._nc0,
+            build_seconds=time.perf_counter() - self._t0,
+        ))
+        self._current = None
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self._started
+
+
+# 개선된 해가 나올 때마다 호출되는 콜백: (schedule, objective)
+SolutionCallback = Callable[[Dict[str, List[str]], float], None]
+# 목적값만 필요한 콜백: (objective) — 근무표를 만들지 않아 해마다 드는 비용이 없음
+ObjectiveCallback = Callable[[float], None]
+
+
+class _SolutionObserver(cp_model.CpSolverSolutionCallback):
+    """
+    해가 발견될 때마다 호출: 첫 해 발견 시각과 해 개수 기록.
+    on_solution이 있으면 현재 해를 스케줄 dict로 만들어 전달(진행 상황 표시용),
+    on_objective는 목적값만 전달(근무표 변환 없음).
+    """
+
+    def __init__(self, extract: Optional[Callable[["_SolutionObserver"], Dict[str, List[str]]]] = None,
+                 on_solution: Optional[SolutionCallback] = None,
+                 on_objective: Optional[ObjectiveCallback] = None):
+        super().__init__()
+        self.first_solution_seconds: Optional[float] = None
+        self.last_improvement: Optional[float] = None  # time.monotonic() 기준
+        self.num_solutions = 0
+        self._extract = extract
+        self._on_solution = on_solution
+        self._on_objective = on_objective
+
+    def on_solution_callback(self):
+        if self.first_solution_seconds is None:
+            self.first_solution_seconds = self.WallTime()
+        self.last_improvement = time.monotonic()
+        self.num_solutions += 1
+        if self._on_solution is not None and self._extract is not None:
+            self._on_solution(self._extract(self), self.ObjectiveValue())
+        if self._on_objective is not None:
+            self._on_objective(self.ObjectiveValue())
+
+
+class _StopWatcher:
+    """
+    풀이 중 0.1초마다 조기 종료 조건을 확인하는 보조 스레드.
+    - stop_event가 켜짐 → "user"
+    - 마지막 개선 후 stall_seconds 동안 개선 없음 → "stall" (첫 해를 찾은 뒤부터 적용)
+    조건이 맞으면 StopSearch() 호출 (현재 최선해는 FEASIBLE로 반환됨)
+    """
+
+    def __init__(self, solver: cp_model.CpSolver, observer: Optional[_SolutionObserver],
+                 stop_event: Optional[threading.Event], stall_seconds: float):
+        self.solver = solver
+        self.observer = observer
+        self.stop_event = stop_event
+        self.stall_seconds = stall_seconds
+        self.reason = ""
+        self._done = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def __enter__(self) -> "_StopWatcher":
+        if self.stop_event is not None or self.stall_seconds > 0:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._done.set()
+
+    def _run(self) -> None:
+        while not self._done.wait(0.1):
+            if self.stop_event is not None and self.stop_event.is_set():
+                self.reason = "user"
+            elif self.stall_seconds > 0 and self.observer is not None and self.observer.last_improvement is not None \
+                    and time.monotonic() - self.observer.last_improvement >= self.stall_seconds:
+                self.reason = "stall"
+            if self.reason:
+                self.solver.StopSearch()
+                return
+
+
+def _configure_solver(solver: cp_model.CpSolver, opts: Dict[str, object]) -> None:
+    """
+    solver_options → CP-SAT 매개변수.
+    gap 목표(relative/absolute_gap_limit)에 도달하면 CP-SAT이 OPTIMAL로 종료함.
+    그 밖의 키는 같은 이름의 CP-SAT 매개변수로 그대로 전달 (예: random_seed)
+    """
+    params = solver.parameters
+    params.max_time_in_seconds = float(opts["max_time_in_seconds"])
+    params.num_search_workers = int(opts["num_search_workers"])
+    if float(opts.get("relative_gap_limit") or 0) > 0:
+        params.relative_gap_limit = float(opts["relative_gap_limit"])
+    if float(opts.get("absolute_gap_limit") or 0) > 0:
+        params.absolute_gap_limit = float(opts["absolute_gap_limit"])
+    for k, v in opts.items():
+        if k in DEFAULT_SOLVER_OPTIONS:
+            continue
+        if not hasattr(params, k):
+            raise ValueError(f"알 수 없는 솔버 설정: {k}")
+        setattr(params, k, v)
+
+
+def _stop_reason(status: int, solver: cp_model.CpSolver, watcher_reason: str) -> str:
+    """탐색 종료 사유: optimal / gap / infeasible / user / stall / time_limit / invalid"""
+    if watcher_reason:
+        return watcher_reason
+    if status == cp_model.OPTIMAL:
+        # gap 목표로 끝난 경우 목적값과 하한이 다름
+        return "gap" if solver.ObjectiveValue() != solver.BestObjectiveBound() else "optimal"
+    if status == cp_model.INFEASIBLE:
+        return "infeasible"
+    if status == cp_model.MODEL_INVALID:
+        return "invalid"
+    return "time_limit"
+
+
+# stop_reason 표시 문구
+STOP_REASON_LABELS = {
+    "optimal": "최적해 증명",
+    "gap": "목표 gap 도달",
+    "infeasible": "해 없음 증명",
+    "user": "사용자 중단",
+    "stall": "개선 정체로 조기 종료",
+    "time_limit": "제한 시간 도달",
+    "invalid": "모델 오류",
+    "portfolio": "다른 포트폴리오 멤버가 증명",
+}
+
+
+def describe_status(status: str, stats: Optional[SolveStats] = None) -> str:
+    """표시용 상태 문자열: 예) "FEASIBLE (개선 정체로 조기 종료)" """
+    if stats is None or not stats.stop_reason:
+        return status
+    return f"{status} ({STOP_REASON_LABELS.get(stats.stop_reason, stats.stop_reason)})"
+
+
+def _balance_terms(model: cp_model.CpModel, values: List[cp_model.IntVar], ub: int, mode: str, tag: str) -> List[cp_model.IntVar]:
+    """
+    values(각 0..ub)의 불균형을 나타내는 변수 목록을 반환 (선형 크기)
+    - spread   : [max - min]
+    - deviation: [|n*v_i - sum(v)| for i]  (평균과의 편차에 n을 곱해 정수화)
+    최소화 대상이므로 상/하한 부등식만으로 충분함(AddMaxEquality 불필요).
+    """
+    n = len(values)
+    if n < 2:
+        return []
+    if mode == "spread":
+        hi = model.NewIntVar(0, ub, f"bal_max_{tag}")
+        lo = model.NewIntVar(0, ub, f"bal_min_{tag}")
+        for v in values:
+            model.Add(hi >= v)
+            model.Add(lo <= v)
+        spread = model.NewIntVar(0, ub, f"bal_spread_{tag}")
+        model.Add(spread == hi - lo)
+        return [spread]
+
+    total = model.NewIntVar(0, ub * n, f"bal_total_{tag}")
+    model.Add(total == sum(values))
+    devs = []
+    for i, v in enumerate(values):
+        dev = model.NewIntVar(0, ub * n, f"bal_dev_{tag}_{i}")
+        model.Add(dev >= n * v - total)
+        model.Add(dev >= total - n * v)
+        devs.append(dev)
+    return devs
+
+
+# 모델 버전: 같은 입력에 대해 제약/목적함수/변수 인코딩이 달라지는 변경을 하면 올림.
+# 결과 캐시(solve_cache) 키에 들어가므로 이전 모델로 구한 OPTIMAL/INFEASIBLE 이 재사용되지 않음
+MODEL_VERSION = 1
+
+# 솔버 기본 설정 (solver_options로 개별 항목 덮어쓰기)
+# - relative_gap_limit / absolute_gap_limit: 목적값과 하한의 차이가 이 이하이면 종료 (0 = 사용 안 함)
+# - stall_seconds: 마지막 개선 후 이 시간 동안 개선이 없으면 종료 (0 = 사용 안 함)
+DEFAULT_SOLVER_OPTIONS: Dict[str, object] = {
+    "max_time_in_seconds": 60.0,
+    "num_search_workers": 8,
+    "relative_gap_limit": 0.0,
+    "absolute_gap_limit": 0.0,
+    "stall_seconds": 0.0,
+}
+
+# 직원별 금지 시프트(shift_masks)로 지정할 수 있는 근무 시프트
+MASKABLE_SHIFTS = ("A", "A2", "B", "C", "N")
+
+# solve() 때 값만 바꿔 끼우는 제약 키 (모델 재사용 키에서 제외)
+PATCHABLE_CONSTRAINT_KEYS = ("min_night_shifts_per_employee", "max_night_shifts_per_employee")
+
+
+# 순서 규칙 인코딩 (constraints.sequence_encoding)
+# - "linear"   : 규칙마다 슬라이딩 2~3일 부등식 (기본)
+# - "automaton": 켜진 순서 규칙을 직원별 전이 오토마톤 하나로 묶어 AddAutomaton
+SEQUENCE_ENCODINGS = ("linear", "automaton")
+_REST = ("OFF", "VAC")
+_DAY_SHIFTS = ("A", "A2", "B", "C")
+
+
+def _sequence_automaton(
+    shifts: List[str], constraints: Dict[str, object]
+) -> Tuple[int, List[int], List[Tuple[int, int, int]]]:
+    """
+    켜진 순서 규칙(B→A, N→휴무 1일, N-휴무-A, A 3연속, N-휴무-N, 주간→OFF, 최대 연속 휴무)을
+    하나의 오토마톤으로 만듦. 상태 = (직전 시프트, 그 전날이 N 인지, A 연속 수, 휴무 연속 수).
+    모든 상태가 종료 상태 → 기간 끝에서 잘린 패턴은 선형 인코딩처럼 허용.
+    반환: (시작 상태, 종료 상태 목록, (상태, 시프트 인덱스, 다음 상태) 전이 목록)
+    """
+    b_then_a = bool(constraints.get("forbid_B_then_A", True))
+    a_after_n_rest = bool(constraints.get("forbid_A_after_N_rest", True))
+    three_a = bool(constraints.get("forbid_three_A_in_row", True))
+    n_off_n = bool(constraints.get("forbid_N_OFF_N", False))
+    off_after_day = bool(constraints.get("forbid_off_after_day_shift", False))
+    max_off = int(constraints.get("max_consecutive_off_days", 0))
+
+    def allowed(state, s: str) -> bool:
+        last, n_before, a_run, rest_run = state
+        if b_then_a and last == "B" and s == "A":
+            return False
+        if last == "N" and s not in _REST:                       # N 다음날 휴무 (k=1, 항상)
+            return False
+        if a_after_n_rest and n_before and s == "A":
+            return False
+        if three_a and s == "A" and a_run >= 2:
+            return False
+        if n_off_n and n_before and last in _REST and s == "N":
+            return False
+        if off_after_day and last in _DAY_SHIFTS and s == "OFF":
+            return False
+        if max_off > 0 and s in _REST and rest_run >= max_off:
+            return False
+        return True
+
+    def step(state, s: str):
+        last, _, a_run, rest_run = state
+        return (
+            s,
+            last == "N",
+            min(a_run + 1, 2) if s == "A" else 0,
+            min(rest_run + 1, max_off) if s in _REST and max_off > 0 else 0,
+        )
+
+    start = (None, False, 0, 0)
+    ids = {start: 0}
+    queue = [start]
+    transitions: List[Tuple[int, int, int]] = []
+    while queue:
+        state = queue.pop()
+        for i, s in enumerate(shifts):
+            if not allowed(state, s):
+                continue
+            nxt = step(state, s)
+            if nxt not in ids:
+                ids[nxt] = len(ids)
+                queue.append(nxt)
+            transitions.append((ids[state], i, ids[nxt]))
+    return 0, list(ids.values()), transitions
+
+
+def _min_work_run(model: cp_model.CpModel, rest: List, min_len: int, fixed: int = 0) -> List[cp_model.Constraint]:
+    """
+    rest[d] (0/1 식: 휴무면 1) 열에서 '휴무 - 근무 k일 - 휴무' (1 <= k < min_len) 금지.
+    구간 [d, d+k) 가 모두 근무이면 양옆 휴무 합 <= 1 이어야 하므로
+        rest[d-1] + rest[d+k] - sum(rest[d..d+k-1]) <= 1
+    (구간 안에 휴무가 하나라도 있으면 자동으로 성립). 양 끝이 기간 안에 있는 구간만 검사하므로
+    기간 첫날/마지막 날에 붙은 짧은 근무 구간은 허용된다.
+    fixed: 앞쪽 경계 이력 칸 수 (상수). 이력 안에서 끝나는 구간은 검사하지 않음
+    """
+    horizon = len(rest)
+    cts = []
+    for k in range(1, min_len):
+        for d in range(max(1, fixed - k), horizon - k):
+            cts.append(model.Add(rest[d - 1] + rest[d + k] - sum(rest[t] for t in range(d, d + k)) <= 1))
+    return cts
+
+
+def _and_term(model: cp_model.CpModel, terms: List, name: str) -> cp_model.IntVar:
+    """
+    목적함수용 b = AND(terms) (terms: 0/1 변수 또는 0/1 선형식). 리파이 없이 선형 부등식만 사용:
+        b <= t_i (모든 i),  b >= sum(t) - (n - 1)
+    양방향이 모두 있어 해마다 b 가 패턴 유무와 정확히 일치 → 목적값을 근무표만으로 재계산 가능
+    """
+    b = model.NewBoolVar(name)
+    for t in terms:
+        model.Add(b <= t)
+    model.Add(b >= sum(terms) - (len(terms) - 1))
+    return b
+
+
+def _is_var(v) -> bool:
+    """x 칸 값이 변수인지 (구조적으로 불가능한 칸-시프트는 상수 0, 경계 이력 칸은 상수 0/1)"""
+    return not isinstance(v, int)
+
+
+def _is_zero(v) -> bool:
+    """x 칸 값이 상수 0 인지 (목적함수 항을 만들 필요 없음)"""
+    return not _is_var(v) and v == 0
+
+
+def vacation_cells(employees: List[str], horizon: int,
+                   vacations: Optional[Dict[str, List[int]]]) -> FrozenSet[Tuple[str, int]]:
+    """휴가 요청 (직원, 일자) 칸 집합 (명단/기간 밖은 제외)"""
+    names = set(employees)
+    return frozenset(
+        (e, d) for e, days in (vacations or {}).items() if e in names
+        for d in days if 0 <= d < horizon
+    )
+
+
+def _set_domain(model: cp_model.CpModel, var: cp_model.IntVar, lo: int, hi: int) -> None:
+    """이미 만든 변수의 도메인을 [lo, hi]로 교체 (모델 재사용 시 입력 반영용)"""
+    dom = model.Proto().variables[var.Index()].domain
+    dom.clear()
+    dom.extend([int(lo), int(hi)])
+
+
+class CompiledSchedule:
+    """
+    한 번 만들어 두고 재사용하는 CP-SAT 모델.
+    (직원 목록, 계획 일수, 시간/제약/가중치 설정) 이 같으면 모델 구조는 동일하므로,
+    휴가, 전월 말일 N 근무자, 하루 인원 범위, N 횟수 상/하한, 직원별 N 후 휴무일수는
+    solve() 호출 시 변수 도메인(상/하한) 변경으로만 반영한다.
+    구조적으로 불가능한 칸-시프트(직원별 금지 시프트, 휴가 후보 칸 밖의 VAC)는 변수 없이 상수 0으로 둔다.
+    휴가일, 전월 N 근무자의 D1 처럼 입력으로 정해지는 칸은 일부러 변수로 남겨 도메인만 고정한다:
+    상수로 바꾸면 휴가/전월 N 을 고칠 때마다 모델을 다시 만들어야 하고, 고정된 변수는 CP-SAT presolve 가 지운다.
+    경계 이력(history)은 음수 일자의 상수 칸이라 구조에 포함된다 (이력이 바뀌면 새 모델).
+    """
+
+    def __init__(
+        self,
+        employees: List[str],
+        horizon: int,
+        hours: Dict[str, int],
+        constraints: Dict[str, object],
+        weights: Dict[str, int],
+        demand: Optional[Dict[int, Dict[str, int]]] = None,
+        incompatible_employees: Optional[List[str]] = None,
+        # 직원별 N 후 휴무일수로 허용할 최댓값 (이보다 긴 휴무는 새 모델 필요)
+        rest_cap: int = 2,
+        # 진단 모드: 규칙/입력마다 가정 리터럴을 두고 해 없음 원인 추출에 사용 (explain_infeasibility)
+        diagnose: bool = False,
+        # 직원별 금지 시프트 (이름 -> ["N", ...]), 해당 칸-시프트는 상수 0
+        shift_masks: Optional[Dict[str, List[str]]] = None,
+        # VAC 변수를 만들 (직원, 일자) 후보 칸. None 이면 모든 칸 (forbid_free_vac=False 용)
+        vac_cells: Optional[FrozenSet[Tuple[str, int]]] = None,
+        # 경계 이력: 직원별 D1 직전 근무 (오래된 날 → 전날 순). 음수 일자의 상수 칸으로 들어가
+        # 기간 첫날에 걸치는 순서/주간 시간/연속 규칙이 전월(이전 창)과 이어서 적용됨
+        history: Optional[Dict[str, List[str]]] = None,
+    ):
+        self.employees = list(employees)
+        self.horizon = horizon
+        self.default_min_off = max(1, int(constraints.get("min_off_after_N", 1)))
+        self.rest_cap = max(rest_cap, self.default_min_off)
+        self.demand = demand
+        self.solve_count = 0
+        self.shift_masks = {e: frozenset(v) for e, v in (shift_masks or {}).items() if e in employees and v}
+        for e, masked in self.shift_masks.items():
+            bad = sorted(masked - set(MASKABLE_SHIFTS))
+            if bad:
+                raise ValueError(f"{e}: 금지 시프트로 지정할 수 없는 값 {bad} (가능: {', '.join(MASKABLE_SHIFTS)})")
+        self.vac_cells = None if vac_cells is None else frozenset(vac_cells)
+        rest_cap = self.rest_cap
+
+        shifts = ["A", "A2", "B", "C", "N", "OFF", "VAC"]
+        self.history = _trim_history(history, employees, _history_span(constraints, rest_cap), shifts)
+        first = self._first_day
+        model = cp_model.CpModel()
+        track = _FamilyTracker(model)
+        self.model = model
+        self.diagnose = diagnose
+        self.assumptions: Dict[Tuple, cp_model.IntVar] = {}
+        guard = self._guard
+
+        # 방탄: 설정에 누락된 키가 있어도 0으로 처리
+        hours_local = {s: int(hours.get(s, 0)) for s in shifts}
+
+        track.start("shift_variables")
+        # 변수 x[e, d, s] ∈ {0,1}. 칸별로 가능한 시프트에만 변수를 만들고 나머지는 상수 0
+        # (상수는 합/부등식에 그대로 쓰이고, 리터럴이 필요한 곳은 _is_var 로 걸러냄)
+        x = {}
+        for e in employees:
+            masked = self.shift_masks.get(e, frozenset())
+            for d in range(horizon):
+                for s in shifts:
+                    if s in masked or (s == "VAC" and self.vac_cells is not None and (e, d) not in self.vac_cells):
+                        x[(e, d, s)] = 0
+                    else:
+                        x[(e, d, s)] = model.NewBoolVar(f"x_{e}_{d}_{s}")
+        # 경계 이력 칸: 일자 -1(전날), -2, ... 에 상수 0/1
+        for e, row in self.history.items():
+            for j, h in enumerate(row):
+                for s in shifts:
+                    x[(e, j - len(row), s)] = int(s == h)
+
+        # 하루 1개 시프트
+        for e in employees:
+            for d in range(horizon):
+                model.Add(sum(x[(e, d, s)] for s in shifts) == 1)
+
+        # 휴가 고정/제약, 전월 말일 N 근무자(D1 휴무)는 solve() 시 x 도메인 고정으로 반영
+        # 아래 슬라이딩 규칙은 first(e, 창 길이)부터 시작: 기간 첫날에 걸치면서 이력이 있는 창까지 포함
+
+        sequence_encoding = "linear" if diagnose else str(constraints.get("sequence_encoding", "linear"))
+        if sequence_encoding not in SEQUENCE_ENCODINGS:
+            raise ValueError(f"알 수 없는 sequence_encoding: {sequence_encoding}")
+        # 진단 모드는 규칙별 가정 리터럴이 필요하므로 항상 선형 인코딩
+        linear_seq = sequence_encoding == "linear"
+        self.sequence_encoding = sequence_encoding
+
+        track.start("sequence_automaton")
+        # (automaton) 직원별 일자 시프트 인덱스 변수 + 전이 오토마톤 하나로 순서 규칙 전체를 표현
+        # k>=2 인 N 후 휴무(rest_need)와 최소 연속 근무일은 아래 선형 제약 그대로 사용
+        if not linear_seq:
+            start, finals, transitions = _sequence_automaton(shifts, constraints)
+            table = {(q, i): nxt for q, i, nxt in transitions}
+            for e in employees:
+                # 이력을 따라가 D1 시작 상태 결정 (이력 자체가 규칙에 어긋나는 지점에서는 처음 상태에서 다시 시작)
+                state = start
+                for h in self.history.get(e, ()):
+                    i = shifts.index(h)
+                    state = table.get((state, i), table[(start, i)])
+                seq = []
+                for d in range(horizon):
+                    idx = model.NewIntVar(0, len(shifts) - 1, f"sidx_{e}_{d}")
+                    model.Add(idx == sum(i * x[(e, d, s)] for i, s in enumerate(shifts)))
+                    seq.append(idx)
+                model.AddAutomaton(seq, state, finals, transitions)
+
+        track.start("weekly_hours")
+        # 주 52시간: 슬라이딩 7일
+        if constraints.get("weekly_hours_window", 7) and constraints.get("max_weekly_hours", 52):
+            W = int(constraints.get("weekly_hours_window", 7))
+            MAXH = int(constraints.get("max_weekly_hours", 52))
+            for e in employees:
+                for start in range(first(e, W), horizon - W + 1):
+                    wnd = range(start, start + W)
+                    guard(model.Add(
+                        sum(hours_local[s] * x[(e, d, s)]
+                            for d in wnd for s in shifts) <= MAXH
+                    ), "max_weekly_hours")
+
+        track.start("forbid_B_then_A")
+        # B 다음날 A 금지
+        if linear_seq and constraints.get("forbid_B_then_A", True):
+            for e in employees:
+                for d in range(first(e, 2), horizon - 1):
+                    guard(model.Add(x[(e, d, "B")] + x[(e, d + 1, "A")] <= 1), "forbid_B_then_A")
+
+        track.start("min_off_after_N")
+        # N 다음날 최소 1일 휴무(OFF 또는 VAC)
+        # Generic Logic: N(t) -> OFF(t+1)...OFF(t+k)
+        # k=1은 항상 적용. k=2..rest_cap 은 직원별 스위치 rest_need[e][k]가 켜졌을 때만 적용
+        # (직원별 휴무일수 = min_off_overrides.get(e, min_off_after_N), solve() 시 스위치 고정)
+        self.rest_need: Dict[str, Dict[int, cp_model.IntVar]] = {}
+        for e in employees:
+            self.rest_need[e] = {
+                k: model.NewBoolVar(f"rest_need_{e}_{k}") for k in range(2, rest_cap + 1)
+            }
+            for d in range(first(e, rest_cap + 1), horizon):
+                if _is_zero(x[(e, d, "N")]):
+                    continue
+                for k in range(1, rest_cap + 1):
+                    # 말일 근처는 범위 안에 들어오는 날까지만 확인, 이력 안에서 끝나는 쌍은 건너뜀
+                    if d + k >= horizon:
+                        break
+                    if d + k < 0 or (k == 1 and not linear_seq):
+                        continue  # k=1 은 오토마톤에 포함
+                    ct = guard(model.Add(x[(e, d, "N")] <= x[(e, d + k, "OFF")] + x[(e, d + k, "VAC")]), "min_off_after_N")
+                    if k >= 2:
+                        ct.OnlyEnforceIf(self.rest_need[e][k])
+
+        track.start("forbid_A_after_N_rest")
+        # N-휴무 직후 A 금지 (수정: d+2의 A만 금지, d+3(N->OFF->OFF->A)은 허용)
+        if linear_seq and constraints.get("forbid_A_after_N_rest", True):
+            for e in employees:
+                for d in range(first(e, 3), horizon - 2):
+                    guard(model.Add(x[(e, d, "N")] + x[(e, d + 2, "A")] <= 1), "forbid_A_after_N_rest")
+
+        track.start("forbid_three_A_in_row")
+        # A 3연속 금지
+        if linear_seq and constraints.get("forbid_three_A_in_row", True):
+            for e in employees:
+                for t in range(first(e, 3), horizon - 2):
+                    guard(model.Add(x[(e, t, "A")] + x[(e, t + 1, "A")] + x[(e, t + 2, "A")] <= 2), "forbid_three_A_in_row")
+
+        track.start("forbid_N_OFF_N")
+        # (NEW) N -> OFF -> N 금지
+        # 즉, N(t) == 1 이고 N(t+2) == 1 이면, 중간 t+1은 OFF/VAC이면 안 됨(근무여야 함).
+        # 반대로 말하면: N(t) + OFF(t+1) + N(t+2) <= 2  (VAC 포함 시 OFF+VAC)
+        if linear_seq and constraints.get("forbid_N_OFF_N", False):
+            for e in employees:
+                for d in range(first(e, 3), horizon - 2):
+                    # N - (OFF|VAC) - N 금지
+                    # x[N,d] + (x[OFF,d+1] + x[VAC,d+1]) + x[N,d+2] <= 2
+                    guard(model.Add(x[(e, d, "N")] + x[(e, d + 1, "OFF")] + x[(e, d + 1, "VAC")] + x[(e, d + 2, "N")] <= 2), "forbid_N_OFF_N")
+
+        track.start("forbid_off_after_day_shift")
+        # (NEW) 주간 근무(A/A2/B/C) 후 OFF 금지 -> 즉 OFF는 N 뒤에만 올 수 있음 (Forward Rotation Force)
+        if linear_seq and constraints.get("forbid_off_after_day_shift", False):
+            day_shifts = ["A", "A2", "B", "C"]
+            for e in employees:
+                for d in range(first(e, 2), horizon - 1):
+                    for s in day_shifts:
+                        # s(d) -> OFF(d+1) 금지 (VAC는 허용)
+                        guard(model.Add(x[(e, d, s)] + x[(e, d + 1, "OFF")] <= 1), "forbid_off_after_day_shift")
+
+        track.start("night_shifts_per_employee")
+        # (NEW) 직원별 최소/최대 N 근무 횟수 보장
+        # 상/하한은 직원별 매개변수 변수로 두고 solve() 시 값 고정 (미사용 시 0 ~ _PARAM_MAX)
+        # (보통은 모두 같은 값, 롤링 풀이에서는 직원별 남은 횟수)
+        self.p_min_n: Dict[str, cp_model.IntVar] = {}
+        self.p_max_n: Dict[str, cp_model.IntVar] = {}
+        # N 금지 직원(shift_masks)은 최소 횟수 대상에서 제외
+        for e in employees:
+            self.p_min_n[e] = model.NewIntVar(0, _PARAM_MAX, f"p_min_night_shifts_{e}")
+            self.p_max_n[e] = model.NewIntVar(0, _PARAM_MAX, f"p_max_night_shifts_{e}")
+            n_count = sum(x[(e, d, "N")] for d in range(horizon))
+            if "N" not in self.shift_masks.get(e, ()):
+                guard(model.Add(n_count >= self.p_min_n[e]), "min_night_shifts_per_employee")
+            guard(model.Add(n_count <= self.p_max_n[e]), "max_night_shifts_per_employee")
+
+        track.start("min_consecutive_work_days")
+        # 최소 연속 근무일수 (예: 2 → 휴무 사이에 끼인 1일 근무 금지). 보조 변수 없이 x 로 직접 표현
+        # 경계: 기간 첫날/마지막 날에 걸친 근무 구간은 앞/뒤(전월/다음 달)로 이어질 수 있으므로 허용
+        min_cons = int(constraints.get("min_consecutive_work_days", 0))
+        if min_cons > 1:
+            for e in employees:
+                lead = len(self.history.get(e, ()))
+                rest = [x[(e, d, "OFF")] + x[(e, d, "VAC")] for d in range(-lead, horizon)]
+                for ct in _min_work_run(model, rest, min_cons, fixed=lead):
+                    guard(ct, "min_consecutive_work_days")
+
+        track.start("max_night_workers_per_day")
+        # (NEW) 하루 N 근무자 최대 3명 제한
+        max_n_day = int(constraints.get("max_night_workers_per_day", 0))
+        if max_n_day > 0:
+            for d in range(horizon):
+                guard(model.Add(sum(x[(e, d, "N")] for e in employees) <= max_n_day), "max_night_workers_per_day")
+
+        track.start("max_consecutive_off_days")
+        # (NEW) 연속 휴무일 최대값 제한
+        max_off = int(constraints.get("max_consecutive_off_days", 0))
+        if linear_seq and max_off > 0:
+            # 연속된 (max_off + 1)일 동안 적어도 하루는 근무해야 함
+            # window size = k = max_off + 1
+            k = max_off + 1
+            work_shifts = ["A", "A2", "B", "C", "N"]
+            for e in employees:
+                for start in range(first(e, k), horizon - k + 1):
+                    # sum(is_work[t] for t in start..start+k) >= 1
+                    # is_work[t] = sum(x[e, t, s] for s in work_shifts)
+                    # => sum(x[e, t, s] for t in range... for s in work_shifts) >= 1
+                    guard(model.Add(sum(x[(e, t, s)] for t in range(start, start + k) for s in work_shifts) >= 1), "max_consecutive_off_days")
+
+        track.start("incompatible_employees")
+        # (NEW) 동반 근무 금지 (같은 날 같은 시프트 불가 -> 요청: N 근무만 금지)
+        if incompatible_employees and len(incompatible_employees) >= 2:
+            group = [e for e in incompatible_employees if e in employees]
+            if len(group) >= 2:
+                # User specifically asked for N shift conflict prevention
+                target_shifts = ["N"] 
+                for d in range(horizon):
+                    for s in target_shifts:
+                        # 그룹 내에서 시프트 s(N)는 최대 1명만 가능
+                        guard(model.Add(sum(x[(e, d, s)] for e in group) <= 1), "incompatible_employees")
+
+        track.start("demand")
+        # (옵션) 시프트별 수요 충족 (Removed by request, keeping arg for compatibility but verify logic)
+        if demand:
+            # User requested removal, but code supports it. 
+            # If passed None, it's skipped.
+            for d, need_map in demand.items():
+                if 0 <= d < horizon:
+                    for s in ["A", "B", "C", "N"]:
+                        need = int(need_map.get(s, 0))
+                        guard(model.Add(sum(x[(e, d, s)] for e in employees) == need), "demand", d)
+
+        track.start("workers_per_day")
+        # 일자별 총 근무자 수(OFF/VAC 제외) - 근무자 수 제약과 (2) 균등화에서 공용
+        workcount = []
+        for d in range(horizon):
+            wc = model.NewIntVar(0, len(employees), f"wc_{d}")
+            model.Add(wc == sum(x[(e, d, s)] for e in employees for s in ["A", "B", "C", "N"]))
+            workcount.append(wc)
+
+        # (옵션) 하루 총 근무자 수 제약(OFF/VAC 제외)
+        # 범위는 매개변수 변수로 두고 solve() 시 값 고정. demand가 있을 땐 충돌 위험이 있어 사용 안 함
+        self.p_min_workers = model.NewIntVar(0, _PARAM_MAX, "p_min_workers_per_day")
+        self.p_max_workers = model.NewIntVar(0, _PARAM_MAX, "p_max_workers_per_day")
+        if demand is None:
+            for d, wc in enumerate(workcount):
+                guard(model.Add(wc >= self.p_min_workers), "min_workers_per_day", d)
+                guard(model.Add(wc <= self.p_max_workers), "max_workers_per_day", d)
+
+        # ---------- 목적함수(균등화 & 페널티) ----------
+        penalties = []
+
+        # 균등화 방식 (weights.balance_mode)
+        # - "pairwise" : 기존 방식. 모든 직원쌍/일자쌍의 |차이| 합 (O(E²), O(H²))
+        # - "spread"   : 최대-최소 차이 (직원/일자 수에 선형)
+        # - "deviation": 평균 대비 편차 합 (직원/일자 수에 선형)
+        balance_mode = str(weights.get("balance_mode", "pairwise"))
+        if balance_mode not in ("pairwise", "spread", "deviation"):
+            raise ValueError(f"알 수 없는 balance_mode: {balance_mode}")
+
+        track.start("balance_shift_counts_per_employee")
+        # (1) 종사자별 A/B/C 근무일수 균등화
+        w_balance_emp = int(weights.get("balance_shift_counts_per_employee", 10))
+        n_emp = len(employees)
+        for s in ["A", "B", "C"]:
+            if balance_mode == "pairwise":
+                for i in range(len(employees)):
+                    for j in range(i + 1, len(employees)):
+                        e1, e2 = employees[i], employees[j]
+                        diff = model.NewIntVar(-1000, 1000, f"diff_{s}_{e1}_{e2}")
+                        model.Add(diff == sum(x[(e1, d, s)] - x[(e2, d, s)] for d in range(horizon)))
+                        absdiff = model.NewIntVar(0, 1000, f"absdiff_{s}_{e1}_{e2}")
+                        model.AddAbsEquality(absdiff, diff)
+                        penalties.append(w_balance_emp * absdiff)
+                continue
+
+            counts = []
+            for e in employees:
+                cnt = model.NewIntVar(0, horizon, f"cnt_{s}_{e}")
+                model.Add(cnt == sum(x[(e, d, s)] for d in range(horizon)))
+                counts.append(cnt)
+            penalties.extend(w_balance_emp * t for t in _balance_terms(model, counts, horizon, balance_mode, f"emp_{s}"))
+
+        track.start("balance_total_workers_per_day")
+        # (2) 일자별 총 근무자 수 균등화(OFF/VAC 제외)
+        w_balance_day = int(weights.get("balance_total_workers_per_day", 1))
+
+        if balance_mode == "pairwise":
+            for d1 in range(horizon):
+                for d2 in range(d1 + 1, horizon):
+                    diffd = model.NewIntVar(-len(employees), len(employees), f"daydiff_{d1}_{d2}")
+                    model.Add(diffd == workcount[d1] - workcount[d2])
+                    absdiffd = model.NewIntVar(0, len(employees), f"absdaydiff_{d1}_{d2}")
+                    model.AddAbsEquality(absdiffd, diffd)
+                    penalties.append(w_balance_day * absdiffd)
+        else:
+            penalties.extend(w_balance_day * t for t in _balance_terms(model, workcount, n_emp, balance_mode, "day"))
+
+        track.start("penalty_too_long_rest_after_N")
+        # (3) N 이후 휴무가 2일 초과하면 벌점: N(d) ∧ 휴무(d+1..d+3)
+        w_long_rest = int(weights.get("penalty_too_long_rest_after_N", 5))
+        for e in employees:
+            for d in range(first(e, 4), horizon - 3):
+                if _is_zero(x[(e, d, "N")]):
+                    continue
+                rests = [x[(e, t, "OFF")] + x[(e, t, "VAC")] for t in range(d + 1, d + 4)]
+                if any(_is_zero(r) for r in rests):
+                    continue
+                p = _and_term(model, [x[(e, d, "N")]] + rests, f"long_rest3_{e}_{d}")
+                penalties.append(w_long_rest * p)
+
+        track.start("penalty_extra_rest_after_N")
+        # (NEW) N 후 불필요한 연속 휴무 억제 (Soft Penalty)
+        # 기본 휴무가 1일인데 2일 이상 쉬는 것을 '비선호'하게 만듦.
+        # N(d) -> OFF(d+1) -> OFF(d+2) : Penalty
+        default_min_off = int(constraints.get("min_off_after_N", 1))
+        if default_min_off == 1:
+            w_extra_rest = 10 # Penalty weight increased to discourage 2-day rests
+            for e in employees:
+                for d in range(first(e, 3), horizon - 2):
+                    if any(_is_zero(x[(e, t, s)]) for t, s in ((d, "N"), (d + 1, "OFF"), (d + 2, "OFF"))):
+                        continue
+                    long_rest = _and_term(model, [x[(e, d, "N")], x[(e, d + 1, "OFF")], x[(e, d + 2, "OFF")]],
+                                          f"long_rest_{e}_{d}")
+                    penalties.append(w_extra_rest * long_rest)
+
+        track.start("prefer_ideal_pattern")
+        # (4) 이상적인 패턴 보상 (Soft Constraint)
+        # C -> A -> A2 -> B -> N 순서를 선호: 해당 전이가 있으면 -w (음수 페널티 = 보상)
+        if constraints.get("prefer_ideal_pattern", False):
+            w_pattern = int(weights.get("reward_ideal_pattern", 3))
+            pairs = [("C", "A"), ("A", "A2"), ("A2", "B"), ("B", "N")]
+            for e in employees:
+                for d in range(first(e, 2), horizon - 1):
+                    for s1, s2 in pairs:
+                        if _is_zero(x[(e, d, s1)]) or _is_zero(x[(e, d + 1, s2)]):
+                            continue
+                        t_var = _and_term(model, [x[(e, d, s1)], x[(e, d + 1, s2)]], f"trans_{e}_{d}_{s1}_{s2}")
+                        penalties.append(-w_pattern * t_var)
+
+        track.start("objective")
+        if not diagnose:  # 진단은 실행 가능성만 확인
+            model.Minimize(sum(penalties))
+        track.finish()
+
+        self.x = x
+        self.shifts = shifts
+        self.families = track.families
+        self.build_seconds = track.elapsed()
+        self._lock = threading.Lock()
+        self._cells: Optional[List[Tuple[int, np.ndarray, np.ndarray]]] = None
+
+    def _first_day(self, e: str, span: int) -> int:
+        """span 일 창의 첫 시작일: 마지막 날이 기간 안(>= 0)이고 이력이 있는 범위까지 음수로 내려감"""
+        return max(1 - span, -len(self.history.get(e, ())))
+
+    def _guard(self, ct: cp_model.Constraint, rule: str, day: Optional[int] = None,
+               employee: Optional[str] = None) -> cp_model.Constraint:
+        """진단 모드일 때만 제약을 가정 리터럴 (rule, day, employee) 에 묶음. 일반 모드에선 그대로 반환"""
+        if self.diagnose:
+            key = (rule, day, employee)
+            lit = self.assumptions.get(key)
+            if lit is None:
+                lit = self.model.NewBoolVar(f"assume_{rule}_{day}_{employee}")
+                self.assumptions[key] = lit
+            ct.OnlyEnforceIf(lit)
+        return ct
+
+    def _apply_inputs(
+        self,
+        vacations: Optional[Dict[str, List[int]]],
+        workers_per_day: Optional[int],
+        min_workers_per_day: Optional[int],
+        max_workers_per_day: Optional[int],
+        forbid_free_vac: bool,
+        prev_n_employees: Optional[List[str]],
+        min_off_overrides: Optional[Dict[str, int]],
+        min_night_shifts: int,
+        max_night_shifts: int,
+        night_bounds: Optional[Dict[str, Tuple[int, int]]] = None,
+    ) -> None:
+        model, x = self.model, self.x
+        vacations = vacations or {}
+        prev_n = set(prev_n_employees or [])
+        min_off_overrides = min_off_overrides or {}
+
+        # 칸(직원, 일자)별 허용 시프트 → x 도메인 고정
+        # (진단 모드: 휴가/전월 N 은 도메인 대신 가정 리터럴에 묶인 제약으로 추가)
+        for e in self.employees:
+            vac_days = set(vacations.get(e, []))
+            for d in range(self.horizon):
+                if d in vac_days:
+                    if self.diagnose:
+                        allowed = set(self.shifts)
+                        self._guard(model.Add(x[(e, d, "VAC")] == 1), "vacation", d, e)
+                    else:
+                        allowed = {"VAC"}                    # 요청일은 VAC
+                else:
+                    allowed = set(self.shifts)
+                    if forbid_free_vac:
+                        allowed.discard("VAC")               # 그 외 VAC 금지
+                if d == 0 and e in prev_n:
+                    if self.diagnose:
+                        self._guard(model.Add(x[(e, 0, "OFF")] + x[(e, 0, "VAC")] == 1), "prev_n_employees", 0, e)
+                    else:
+                        allowed &= {"OFF", "VAC"}            # 전월 말일 N 근무자 → D1 OFF/VAC
+                if d in vac_days and not _is_var(x[(e, d, "VAC")]):
+                    raise ValueError(f"{e}: {d + 1}일 휴가는 이 모델의 휴가 후보 칸 밖입니다 (모델 재생성 필요).")
+                fixed = 1 if len(allowed) == 1 else 0
+                for s in self.shifts:
+                    if not _is_var(x[(e, d, s)]):
+                        continue
+                    if s in allowed:
+                        _set_domain(model, x[(e, d, s)], fixed, 1)
+                    else:
+                        _set_domain(model, x[(e, d, s)], 0, 0)
+
+        # 직원별 N 후 휴무일수
+        for e in self.employees:
+            limit = max(1, int(min_off_overrides.get(e, self.default_min_off)))
+            if limit > self.rest_cap:
+                raise ValueError(f"{e}: N 후 휴무 {limit}일은 이 모델(rest_cap={self.rest_cap})에서 지원하지 않습니다.")
+            for k, lit in self.rest_need[e].items():
+                v = 1 if limit >= k else 0
+                _set_domain(model, lit, v, v)
+
+        # 직원별 N 횟수 상/하한 (0 = 미사용). night_bounds 의 (하한, 상한)은 그 직원에 그대로 적용
+        lo_n, hi_n = _night_range(min_night_shifts, max_night_shifts)
+        night_bounds = night_bounds or {}
+        for e in self.employees:
+            lo, hi = night_bounds.get(e, (lo_n, hi_n))
+            _set_domain(model, self.p_min_n[e], max(0, int(lo)), max(0, int(lo)))
+            _set_domain(model, self.p_max_n[e], max(0, int(hi)), max(0, int(hi)))
+
+        # 하루 총 근무자 수 범위
+        lo_w, hi_w = _workers_range(workers_per_day, min_workers_per_day, max_workers_per_day)
+        _set_domain(model, self.p_min_workers, lo_w, lo_w)
+        _set_domain(model, self.p_max_workers, hi_w, hi_w)
+
+    def _apply_hint(self, hint_schedule: Optional[Dict[str, List[str]]], hint_offset: int) -> None:
+        """
+        힌트 교체. 일자 d에는 hint_schedule[e][d + hint_offset]을 사용
+        (예: 직전 결과는 offset 0, 기간이 겹치는 이전 계획은 시작일 차이만큼).
+        명단에 없는 직원, 범위를 벗어난 날, 알 수 없는 시프트는 무시.
+        """
+        self.model.ClearHints()
+        if not hint_schedule:
+            return
+        for e in self.employees:
+            row = hint_schedule.get(e)
+            if not row:
+                continue
+            for d in range(self.horizon):
+                i = d + hint_offset
+                if not (0 <= i < len(row)) or row[i] not in self.shifts:
+                    continue
+                for s in self.shifts:
+                    if _is_var(self.x[(e, d, s)]):
+                        self.model.AddHint(self.x[(e, d, s)], s == row[i])
+
+    def _read_schedule(self, value: Callable) -> Dict[str, List[str]]:
+        """value(변수) -> 0/1 함수(solver.Value 또는 콜백의 Value)로 스케줄 dict 구성"""
+        schedule: Dict[str, List[str]] = {}
+        for e in self.employees:
+            row = []
+            for d in range(self.horizon):
+                assigned = None
+                for s in self.shifts:
+                    v = self.x[(e, d, s)]
+                    if _is_var(v) and value(v) == 1:
+                        assigned = s
+                        break
+                row.append(assigned or "OFF")
+            schedule[e] = row
+        return schedule
+
+    def _cell_index(self) -> List[Tuple[int, np.ndarray, np.ndarray]]:
+        """시프트별 (SHIFT_CODES 코드, 칸 번호 배열, 변수 인덱스 배열). 해 읽기용으로 처음 한 번만 구성"""
+        if self._cells is None:
+            cells = []
+            for s in self.shifts:
+                pos, idx = [], []
+                for i, e in enumerate(self.employees):
+                    for d in range(self.horizon):
+                        v = self.x[(e, d, s)]
+                        if _is_var(v):
+                            pos.append(i * self.horizon + d)
+                            idx.append(v.Index())
+                cells.append((SHIFT_CODES.index(s), np.array(pos, dtype=np.int64), np.array(idx, dtype=np.int64)))
+            self._cells = cells
+        return self._cells
+
+    def _read_matrix(self, solution) -> ScheduleMatrix:
+        """응답의 변수 값 배열(solution)에서 칸별 문자열 없이 코드 행렬을 바로 구성"""
+        values = np.asarray(solution)
+        codes = np.full(len(self.employees) * self.horizon, SHIFT_CODES.index("OFF"), dtype=np.int8)
+        for code, pos, idx in self._cell_index():
+            codes[pos[values[idx] == 1]] = code
+        return ScheduleMatrix(codes.reshape(len(self.employees), self.horizon), self.employees)
+
+    def solve(
+        self,
+        vacations: Optional[Dict[str, List[int]]] = None,
+        workers_per_day: Optional[int] = None,
+        min_workers_per_day: Optional[int] = None,
+        max_workers_per_day: Optional[int] = None,
+        forbid_free_vac: bool = True,
+        prev_n_employees: Optional[List[str]] = None,
+        min_off_overrides: Optional[Dict[str, int]] = None,
+        min_night_shifts: int = 0,
+        max_night_shifts: int = 0,
+        night_bounds: Optional[Dict[str, Tuple[int, int]]] = None,
+        hint_schedule: Optional[Dict[str, List[str]]] = None,
+        hint_offset: int = 0,
+        solver_options: Optional[Dict[str, object]] = None,
+        on_solution: Optional[SolutionCallback] = None,
+        on_objective: Optional[ObjectiveCallback] = None,
+        on_bound: Optional[ObjectiveCallback] = None,
+        stop_event: Optional[threading.Event] = None,
+        collect_stats: bool = False,
+        as_matrix: bool = False,
+    ):
+        """
+        입력을 도메인 변경으로 반영한 뒤 풀이.
+        hint_schedule이 있으면 해당 배정을 초기해 힌트(AddHint)로 사용.
+        night_bounds: 직원별 N 횟수 (하한, 상한) — min/max_night_shifts 대신 적용 (롤링 풀이의 남은 횟수)
+        on_solution(schedule, objective): 개선된 해가 나올 때마다 호출 (솔버 스레드에서 호출됨)
+        on_objective(objective): 위와 같지만 목적값만 전달 (근무표를 만들지 않음)
+        on_bound(bound): 목적값 하한이 좋아질 때마다 호출 (솔버 스레드에서 호출됨)
+        stop_event: 다른 스레드에서 set() 하면 탐색을 멈추고 현재 최선해를 반환
+        반환: (schedule, status_str) / collect_stats=True 이면 (schedule, status_str, SolveStats)
+        as_matrix=True 이면 schedule 은 ScheduleMatrix (해 없음이면 None)
+        """
+        with self._lock:
+            reused = self.solve_count > 0
+            self.solve_count += 1
+            t0 = time.perf_counter()
+            self._apply_inputs(
+                vacations, workers_per_day, min_workers_per_day, max_workers_per_day,
+                forbid_free_vac, prev_n_employees, min_off_overrides,
+                min_night_shifts, max_night_shifts, night_bounds,
+            )
+            self._apply_hint(hint_schedule, hint_offset)
+            patch_seconds = time.perf_counter() - t0
+
+            model = self.model
+
+            opts = {**DEFAULT_SOLVER_OPTIONS, **(solver_options or {})}
+            stall_seconds = float(opts.get("stall_seconds") or 0)
+            solver = cp_model.CpSolver()
+            _configure_solver(solver, opts)
+            if on_bound is not None:
+                solver.best_bound_callback = on_bound
+
+            observer = None
+            if collect_stats or on_solution is not None or on_objective is not None or stall_seconds > 0:
+                observer = _SolutionObserver(
+                    extract=lambda cb: self._read_schedule(cb.Value),
+                    on_solution=on_solution,
+                    on_objective=on_objective,
+                )
+            with _StopWatcher(solver, observer, stop_event, stall_seconds) as watcher:
+                status = solver.Solve(model, observer)
+            status_name = solver.StatusName(status)
+
+            schedule: Union[Dict[str, List[str]], ScheduleMatrix, None] = None if as_matrix else {}
+            if status in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+                if as_matrix:
+                    schedule = self._read_matrix(solver.ResponseProto().solution)
+                else:
+                    schedule = self._read_schedule(solver.Value)
+
+            if not collect_stats:
+                return schedule, status_name
+
+            proto = model.Proto()
+            found = status in (cp_model.OPTIMAL, cp_model.FEASIBLE)
+            stats = SolveStats(
+                families=list(self.families),
+                build_seconds=0.0 if reused else self.build_seconds,
+                model_reused=reused,
+                patch_seconds=patch_seconds,
+                num_variables=len(proto.variables),
+                num_constraints=len(proto.constraints),
+                wall_time=solver.WallTime(),
+                objective=solver.ObjectiveValue() if found else None,
+                best_bound=solver.BestObjectiveBound() if found else None,
+                num_branches=solver.NumBranches(),
+                num_conflicts=solver.NumConflicts(),
+                first_solution_seconds=observer.first_solution_seconds,
+                num_solutions=observer.num_solutions,
+                stop_reason=_stop_reason(status, solver, watcher.reason),
+            )
+            return schedule, status_name, stats
+
+
+def _freeze(obj) -> str:
+    """dict/list를 비교 가능한 문자열로 (YAML에서 OFF 키가 bool로 읽히는 경우 등 대비해 키를 문자열화)"""
+    def norm(o):
+        if isinstance(o, dict):
+            return {str(k): norm(v) for k, v in o.items()}
+        if isinstance(o, (list, tuple, set)):
+            return [norm(v) for v in o]
+        return o
+    return json.dumps(norm(obj), sort_keys=True, ensure_ascii=False, default=str)
+
+
+def compile_key(
+    employees: List[str],
+    horizon: int,
+    hours: Dict[str, int],
+    constraints: Dict[str, object],
+    weights: Dict[str, int],
+    demand: Optional[Dict[int, Dict[str, int]]] = None,
+    incompatible_employees: Optional[List[str]] = None,
+    rest_cap: int = 2,
+    shift_masks: Optional[Dict[str, List[str]]] = None,
+    history: Optional[Dict[str, List[str]]] = None,
+) -> Tuple:
+    """모델 구조를 결정하는 입력만으로 만든 재사용 키 (휴가 후보 칸은 get_compiled_model 에서 포함 여부로 판단)"""
+    structural = {k: v for k, v in constraints.items() if k not in PATCHABLE_CONSTRAINT_KEYS}
+    group = sorted(e for e in (incompatible_employees or []) if e in employees)
+    masks = {e: sorted(v) for e, v in (shift_masks or {}).items() if e in employees and v}
+    span = _history_span(constraints, rest_cap)
+    hist = {e: list(row)[-span:] for e, row in (history or {}).items() if e in employees and row}
+    return (
+        tuple(employees),
+        int(horizon),
+        _freeze(hours),
+        _freeze(structural),
+        _freeze(weights),
+        _freeze(demand),
+        tuple(group),
+        int(rest_cap),
+        _freeze(masks),
+        _freeze(hist),
+    )
+
+
+# 프로세스 메모리 내 컴파일 모델 캐시 (Streamlit 재실행 간에도 유지)
+_COMPILED_CACHE: "OrderedDict[Tuple, CompiledSchedule]" = OrderedDict()
+_COMPILED_CACHE_SIZE = 4
+_COMPILED_CACHE_LOCK = threading.Lock()
+
+
+def get_compiled_model(
+    employees: List[str],
+    horizon: int,
+    hours: Dict[str, int],
+    constraints: Dict[str, object],
+    weights: Dict[str, int],
+    demand: Optional[Dict[int, Dict[str, int]]] = None,
+    incompatible_employees: Optional[List[str]] = None,
+    min_off_overrides: Optional[Dict[str, int]] = None,
+    shift_masks: Optional[Dict[str, List[str]]] = None,
+    vacations: Optional[Dict[str, List[int]]] = None,
+    forbid_free_vac: bool = True,
+    history: Optional[Dict[str, List[str]]] = None,
+) -> CompiledSchedule:
+    """
+    같은 구조의 모델이 캐시에 있으면 재사용, 없으면 새로 만들어 캐시에 넣음(LRU).
+    forbid_free_vac 이면 VAC 변수는 휴가 후보 칸에만 있으므로, 요청 휴가가 캐시 모델의 후보 칸을
+    벗어나면 (기존 후보 ∪ 이번 요청)으로 다시 만든다 → 휴가를 여러 번 고쳐도 곧 재사용됨.
+    """
+    rest_cap = _rest_cap(constraints, min_off_overrides)
+    key = compile_key(employees, horizon, hours, constraints, weights, demand, incompatible_employees, rest_cap,
+                      shift_masks, history)
+    need = vacation_cells(employees, horizon, vacations) if forbid_free_vac else None
+    with _COMPILED_CACHE_LOCK:
+        compiled = _COMPILED_CACHE.get(key)
+        if compiled is not None:
+            if compiled.vac_cells is None or (need is not None and need <= compiled.vac_cells):
+                _COMPILED_CACHE.move_to_end(key)
+                return compiled
+            if need is not None:
+                need = need | compiled.vac_cells
+    compiled = CompiledSchedule(
+        employees, horizon, hours, constraints, weights,
+        demand=demand, incompatible_employees=incompatible_employees, rest_cap=rest_cap,
+        shift_masks=shift_masks, vac_cells=need, history=history,
+    )
+    with _COMPILED_CACHE_LOCK:
+        _COMPILED_CACHE[key] = compiled
+        while len(_COMPILED_CACHE) > _COMPILED_CACHE_SIZE:
+            _COMPILED_CACHE.popitem(last=False)
+    return compiled
+
+
+def clear_compiled_cache() -> None:
+    with _COMPILED_CACHE_LOCK:
+        _COMPILED_CACHE.clear()
+
 
 def build_and_solve(
     employees: List[str],
@@ -22,368 +1105,197 @@ def build_and_solve(
     min_off_overrides: Optional[Dict[str, int]] = None,
     # (NEW) 동반 근무 금지 그룹 (이 그룹 내 인원은 같은 시프트 근무 불가)
     incompatible_employees: Optional[List[str]] = None,
-) -> Tuple[Dict[str, List[str]], str]:
+    # 옵션: 직원별 금지 시프트 (이름 -> ["N", ...], employees.csv 의 forbidden_shifts)
+    shift_masks: Optional[Dict[str, List[str]]] = None,
+    # 옵션: 경계 이력 (이름 -> D1 직전 근무 목록, 예: 전월 마지막 주). 첫날에 걸치는 규칙에 반영
+    history: Optional[Dict[str, List[str]]] = None,
+    # 옵션: 직원별 N 횟수 (하한, 상한). 지정한 직원은 constraints 의 min/max_night_shifts 대신 사용
+    night_bounds: Optional[Dict[str, Tuple[int, int]]] = None,
+    # 옵션: 모델 크기/시간 통계(SolveStats)를 함께 반환
+    collect_stats: bool = False,
+    # 옵션: 같은 구조의 컴파일 모델을 프로세스 메모리에서 재사용
+    reuse_model: bool = True,
+    # 옵션: 초기해 힌트 (직전 결과/전월 근무표, build_and_solve 반환 형식과 동일)
+    hint_schedule: Optional[Dict[str, List[str]]] = None,
+    # 힌트 정렬: 일자 d ↔ hint_schedule[e][d + hint_offset]
+    hint_offset: int = 0,
+    # 옵션: 솔버 설정 (DEFAULT_SOLVER_OPTIONS 참고)
+    solver_options: Optional[Dict[str, object]] = None,
+    # 옵션: 진행 상황 콜백(개선된 해마다, 목적값만 필요하면 on_objective) / 외부 중단 신호
+    on_solution: Optional[SolutionCallback] = None,
+    on_objective: Optional[ObjectiveCallback] = None,
+    # 옵션: 목적값 하한이 좋아질 때마다 호출 (bound)
+    on_bound: Optional[ObjectiveCallback] = None,
+    stop_event: Optional[threading.Event] = None,
+    # 옵션: 근무표를 ScheduleMatrix(코드 행렬)로 반환 (dict 는 .as_dict() 보기로)
+    as_matrix: bool = False,
+) -> Union[Tuple[Dict[str, List[str]], str], Tuple[Dict[str, List[str]], str, SolveStats]]:
     """
     반환: (schedule, status_str)
+    collect_stats=True 이면 (schedule, status_str, SolveStats)
+    as_matrix=True 이면 schedule 이 ScheduleMatrix (해 없음이면 None)
     """
-    shifts = ["A", "A2", "B", "C", "N", "OFF", "VAC"]
-    model = cp_model.CpModel()
+    if reuse_model:
+        compiled = get_compiled_model(
+            employees, horizon, hours, constraints, weights,
+            demand=demand,
+            incompatible_employees=incompatible_employees,
+            min_off_overrides=min_off_overrides,
+            shift_masks=shift_masks,
+            vacations=vacations,
+            forbid_free_vac=forbid_free_vac,
+            history=history,
+        )
+    else:
+        compiled = CompiledSchedule(
+            employees, horizon, hours, constraints, weights,
+            demand=demand,
+            incompatible_employees=incompatible_employees,
+            rest_cap=_rest_cap(constraints, min_off_overrides),
+            shift_masks=shift_masks,
+            vac_cells=vacation_cells(employees, horizon, vacations) if forbid_free_vac else None,
+            history=history,
+        )
+    return compiled.solve(
+        vacations=vacations,
+        workers_per_day=workers_per_day,
+        min_workers_per_day=min_workers_per_day,
+        max_workers_per_day=max_workers_per_day,
+        forbid_free_vac=forbid_free_vac,
+        prev_n_employees=prev_n_employees,
+        min_off_overrides=min_off_overrides,
+        min_night_shifts=int(constraints.get("min_night_shifts_per_employee", 0)),
+        max_night_shifts=int(constraints.get("max_night_shifts_per_employee", 0)),
+        night_bounds=night_bounds,
+        hint_schedule=hint_schedule,
+        hint_offset=hint_offset,
+        solver_options=solver_options,
+        on_solution=on_solution,
+        on_objective=on_objective,
+        on_bound=on_bound,
+        stop_event=stop_event,
+        collect_stats=collect_stats,
+        as_matrix=as_matrix,
+    )
 
-    # 방탄: 설정에 누락된 키가 있어도 0으로 처리
-    hours_local = {s: int(hours.get(s, 0)) for s in shifts}
 
-    # 변수 x[e, d, s] ∈ {0,1}
-    x = {}
-    for e in employees:
-        for d in range(horizon):
-            for s in shifts:
-                x[(e, d, s)] = model.NewBoolVar(f"x_{e}_{d}_{s}")
+def _describe_assumption(key: Tuple, constraints: Dict[str, object], lo_w: int, hi_w: int,
+                         min_off_overrides: Optional[Dict[str, int]]) -> Violation:
+    rule, day, employee = key
+    label = RULE_LABELS.get(rule, rule)
+    if rule == "vacation":
+        msg = f"{employee}의 {day + 1}일 휴가"
+    elif rule == "prev_n_employees":
+        msg = f"{employee}: 전월 말일 N 근무 → 1일 휴무"
+    elif rule == "min_workers_per_day":
+        msg = f"{day + 1}일 근무 인원 최소 {lo_w}명"
+    elif rule == "max_workers_per_day":
+        msg = f"{day + 1}일 근무 인원 최대 {hi_w}명"
+    elif rule == "demand":
+        msg = f"{day + 1}일 {label}"
+    elif rule == "min_off_after_N" and min_off_overrides:
+        msg = f"{label} (기본 {constraints.get('min_off_after_N', 1)}일, 직원별 설정 포함)"
+    elif rule == "max_weekly_hours":
+        msg = f"{label} ({constraints.get('weekly_hours_window', 7)}일 {constraints.get(rule)}시간)"
+    elif isinstance(constraints.get(rule), bool) or rule not in constraints:
+        msg = label
+    else:
+        msg = f"{label} ({rule} = {constraints.get(rule)})"
+    return Violation(rule=rule, message=msg, day=day, employee=employee)
 
-    # 하루 1개 시프트
-    for e in employees:
-        for d in range(horizon):
-            model.Add(sum(x[(e, d, s)] for s in shifts) == 1)
 
-    # 휴가 고정/제약
-    vacations = vacations or {}
-    for e in employees:
-        vac_days = set(vacations.get(e, []))
-        for d in range(horizon):
-            if d in vac_days:
-                model.Add(x[(e, d, "VAC")] == 1)          # 요청일은 VAC
-            elif forbid_free_vac:
-                model.Add(x[(e, d, "VAC")] == 0)          # 그 외 VAC 금지
-
-    # 주 52시간: 슬라이딩 7일
-    if constraints.get("weekly_hours_window", 7) and constraints.get("max_weekly_hours", 52):
-        W = int(constraints.get("weekly_hours_window", 7))
-        MAXH = int(constraints.get("max_weekly_hours", 52))
-        for e in employees:
-            for start in range(horizon - W + 1):
-                wnd = range(start, start + W)
-                model.Add(
-                    sum(hours_local[s] * x[(e, d, s)]
-                        for d in wnd for s in shifts) <= MAXH
-                )
+def explain_infeasibility(
+    employees: List[str],
+    horizon: int,
+    hours: Dict[str, int],
+    constraints: Dict[str, object],
+    weights: Dict[str, int],
+    demand: Optional[Dict[int, Dict[str, int]]] = None,
+    vacations: Optional[Dict[str, List[int]]] = None,
+    workers_per_day: Optional[int] = None,
+    min_workers_per_day: Optional[int] = None,
+    max_workers_per_day: Optional[int] = None,
+    forbid_free_vac: bool = True,
+    prev_n_employees: Optional[List[str]] = None,
+    min_off_overrides: Optional[Dict[str, int]] = None,
+    incompatible_employees: Optional[List[str]] = None,
+    shift_masks: Optional[Dict[str, List[str]]] = None,
+    history: Optional[Dict[str, List[str]]] = None,
+    night_bounds: Optional[Dict[str, Tuple[int, int]]] = None,
+    time_limit: float = 30.0,
+    minimize: bool = True,
+) -> List[Violation]:
+    """
+    해 없음(INFEASIBLE)의 원인이 되는 규칙/입력의 최소 충돌 집합을 반환.
+    규칙 토글(rules.yaml), 일자별 인원 범위, 전월 N 근무자, 동반 근무 금지, 휴가 하나하나를
+    가정 리터럴에 묶은 진단 모델을 풀어 SufficientAssumptionsForInfeasibility 로 충돌 집합을 얻고,
+    minimize=True 이면 하나씩 빼 보며 더 줄일 수 없을 때까지 축소한다 (제한 시간 내).
+    실제로 해가 있거나 제한 시간 안에 증명하지 못하면 빈 목록.
+    """
+    deadline = time.perf_counter() + float(time_limit)
+    compiled = CompiledSchedule(
+        employees, horizon, hours, constraints, weights,
+        demand=demand, incompatible_employees=incompatible_employees,
+        rest_cap=_rest_cap(constraints, min_off_overrides), diagnose=True,
+        shift_masks=shift_masks,
+        vac_cells=vacation_cells(employees, horizon, vacations) if forbid_free_vac else None,
+        history=history,
+    )
+    lo_n, hi_n = _night_range(
+        int(constraints.get("min_night_shifts_per_employee", 0)),
+        int(constraints.get("max_night_shifts_per_employee", 0)),
+    )
+    lo_w, hi_w = _workers_range(workers_per_day, min_workers_per_day, max_workers_per_day)
+    compiled._apply_inputs(
+        vacations, workers_per_day, min_workers_per_day, max_workers_per_day,
+        forbid_free_vac, prev_n_employees, min_off_overrides, lo_n, hi_n, night_bounds,
+    )
+    # 값이 없어 항상 만족되는 범위 제약은 가정에서 제외
+    inactive = set()
+    bounds = list((night_bounds or {}).values())
+    if lo_n == 0 and not any(lo > 0 for lo, _ in bounds):
+        inactive.add("min_night_shifts_per_employee")
+    if hi_n == _PARAM_MAX and not any(hi < _PARAM_MAX for _, hi in bounds):
+        inactive.add("max_night_shifts_per_employee")
+    if lo_w == 0:
+        inactive.add("min_workers_per_day")
+    if hi_w == _PARAM_MAX:
+        inactive.add("max_workers_per_day")
+    keys = [k for k in compiled.assumptions if k[0] not in inactive]
+    by_index = {compiled.assumptions[k].Index(): k for k in keys}
+    model = compiled.model
 
-    # B 다음날 A 금지
-    if constraints.get("forbid_B_then_A", True):
-        for e in employees:
-            for d in range(horizon - 1):
-                model.Add(x[(e, d, "B")] + x[(e, d + 1, "A")] <= 1)
-
-    # N 다음날 최소 1일 휴무(OFF 또는 VAC)
-    # Generic Logic: N(t) -> OFF(t+1)...OFF(t+k)
-    default_min_off = int(constraints.get("min_off_after_N", 1))
-    min_off_overrides = min_off_overrides or {}
-    
-    for e in employees:
-        # Determine employee specific limit
-        limit = min_off_overrides.get(e, default_min_off)
-        if limit < 1:
-            limit = 1 # Safety check
-            
-        for d in range(horizon - limit):
-            # If N at d, then d+1...d+limit must be OFF/VAC
-            for k in range(1, limit + 1):
-                model.Add(x[(e, d, "N")] <= x[(e, d + k, "OFF")] + x[(e, d + k, "VAC")])
-                
-        # Handle boundary near end of horizon?
-        # range(horizon - limit) stops early.
-        # e.g. horizon=28, limit=2. range(26) -> 0..25.
-        # d=25: N(25) -> check 26, 27. OK.
-        # d=26: N(26) -> check 27. (28 out of bounds).
-        # We need to check up to whatever fits.
-        for d in range(horizon - limit, horizon):
-            # Check remaining days
-             for k in range(1, limit + 1):
-                if d + k < horizon:
-                    model.Add(x[(e, d, "N")] <= x[(e, d + k, "OFF")] + x[(e, d + k, "VAC")])
-
-    # N-휴무 직후 A 금지 (수정: d+2의 A만 금지, d+3(N->OFF->OFF->A)은 허용)
-    if constraints.get("forbid_A_after_N_rest", True):
-        for e in employees:
-            for d in range(horizon - 2):
-                model.Add(x[(e, d, "N")] + x[(e, d + 2, "A")] <= 1)
+    def run(subset: List[Tuple]) -> Optional[List[Tuple]]:
+        """subset 가정으로 풀이. 해 없음이면 솔버가 돌려준 충분 가정 집합, 아니면(해 있음/시간 초과) None"""
+        remaining = deadline - time.perf_counter()
+        if remaining <= 0:
+            return None
+        model.ClearAssumptions()
+        model.AddAssumptions([compiled.assumptions[k] for k in subset])
+        solver = cp_model.CpSolver()
+        solver.parameters.max_time_in_seconds = remaining
+        solver.parameters.num_search_workers = 1  # 충분 가정 집합은 단일 워커에서 제공
+        if solver.Solve(model) != cp_model.INFEASIBLE:
+            return None
+        return [by_index[i] for i in solver.SufficientAssumptionsForInfeasibility() if i in by_index]
 
-    # A 3연속 금지
-    if constraints.get("forbid_three_A_in_row", True):
-        for e in employees:
-            for t in range(horizon - 2):
-                model.Add(x[(e, t, "A")] + x[(e, t + 1, "A")] + x[(e, t + 2, "A")] <= 2)
+    core = run(keys)
+    if core is None:
+        return []
+    if not core:
+        return [Violation(rule="structure", message="규칙과 무관하게 모델 자체가 해 없음 (직원/기간 설정 확인)")]
 
-    # (NEW) N -> OFF -> N 금지
-    # 즉, N(t) == 1 이고 N(t+2) == 1 이면, 중간 t+1은 OFF/VAC이면 안 됨(근무여야 함).
-    # 반대로 말하면: N(t) + OFF(t+1) + N(t+2) <= 2  (VAC 포함 시 OFF+VAC)
-    if constraints.get("forbid_N_OFF_N", False):
-        for e in employees:
-            for d in range(horizon - 2):
-                # N - (OFF|VAC) - N 금지
-                # x[N,d] + (x[OFF,d+1] + x[VAC,d+1]) + x[N,d+2] <= 2
-                model.Add(x[(e, d, "N")] + x[(e, d + 1, "OFF")] + x[(e, d + 1, "VAC")] + x[(e, d + 2, "N")] <= 2)
-    
-    # (NEW) 주간 근무(A/A2/B/C) 후 OFF 금지 -> 즉 OFF는 N 뒤에만 올 수 있음 (Forward Rotation Force)
-    if constraints.get("forbid_off_after_day_shift", False):
-        day_shifts = ["A", "A2", "B", "C"]
-        for e in employees:
-            for d in range(horizon - 1):
-                for s in day_shifts:
-                    # s(d) -> OFF(d+1) 금지 (VAC는 허용)
-                    model.Add(x[(e, d, s)] + x[(e, d + 1, "OFF")] <= 1)
-
-    # (NEW) 직원별 최소/최대 N 근무 횟수 보장
-    min_n = int(constraints.get("min_night_shifts_per_employee", 0))
-    max_n = int(constraints.get("max_night_shifts_per_employee", 0))
-    if min_n > 0:
-        for e in employees:
-            model.Add(sum(x[(e, d, "N")] for d in range(horizon)) >= min_n)
-    if max_n > 0:
-        for e in employees:
-            model.Add(sum(x[(e, d, "N")] for d in range(horizon)) <= max_n)
-
-    # (NEW) 최소 연속 근무일수 (예: 3일 이상)
-    # 짧은 근무 패턴 방지: OFF -> Work(1~2일) -> OFF 금지
-    # boundary 처리가 까다로울 수 있으므로, 단순화하여 "Work=1 이면 주변 Work 합계 >= 2" 등으로 접근하거나,
-    # 명시적 패턴 금지 사용. 여기서는 "OFF - W - OFF" (1일), "OFF - W - W - OFF" (2일) 금지로 구현.
-    # W = (A, A2, B, C, N). OFF = (OFF, VAC)
-    min_cons = int(constraints.get("min_consecutive_work_days", 0))
-    if min_cons > 1:
-        # 편의상 "근무 아님"을 0, "근무"를 1로 하는 보조변수 w_bool 생성 가능,
-        # 하지만 변수 늘리기보다 직접 합으로 제약.
-        # OFF/VAC 여부: is_off[d] = x[OFF,d] + x[VAC,d]
-        # Work 여부: is_work[d] = 1 - is_off[d]
-        
-        # 1일 근무 금지: OFF(d) - W(d+1) - OFF(d+2)
-        # => is_work[d+1]가 1이면 is_off[d] + is_off[d+2] < 2  (즉 적어도 하나는 Work여야 함)
-        # => x[O,d] + x[W,d+1] + x[O,d+2] <= 2
-        
-        # 변수 생성 최소화를 위해 루프 안에서 직접 식 구성
-        work_shifts = ["A", "A2", "B", "C", "N"]
-        off_shifts = ["OFF", "VAC"]
-        
-        for e in employees:
-            # 보조 변수: day d가 근무인지 여부
-            is_work = []
-            for d in range(horizon):
-                d_work = model.NewBoolVar(f"is_work_{e}_{d}")
-                model.Add(sum(x[(e, d, s)] for s in work_shifts) == 1).OnlyEnforceIf(d_work)
-                model.Add(sum(x[(e, d, s)] for s in work_shifts) == 0).OnlyEnforceIf(d_work.Not())
-                is_work.append(d_work)
-
-            # (NEW) Generic Logic: 1일 ~ (min_cons-1)일 근무 금지
-            # OFF - W(k) - OFF 패턴 금지
-            if min_cons > 1:
-                for k in range(1, min_cons):
-                    # k일 근무 금지: W[d]...W[d+k-1] == 1 AND others OFF
-                    # => AND(W[d]...W[d+k-1]) -> W[d-1] + W[d+k] >= 1
-                    # Range: d from 1 to horizon - k - 1
-                    for d in range(1, horizon - k):
-                        # k일 근무 금지: W[d]...W[d+k-1] == 1 AND others OFF
-                        # => AND(W[d]...W[d+k-1]) -> W[d-1] + W[d+k] >= 1
-                        # w_block 변수를 사용하면 "w_block => Pattern"만 되고 "Pattern => w_block"이 안되어
-                        # w_block을 False로 두면 제약이 무력화됨.
-                        # 따라서 직접 EnforceIf(list)를 사용해야 함.
-                        
-                        # Conditions: is_work[d] ~ is_work[d+k-1] are ALL True
-                        conds = [is_work[t] for t in range(d, d + k)]
-                        
-                
-                        # Requirement: d-1 or d+k is Work
-                        model.Add(is_work[d - 1] + is_work[d + k] >= 1).OnlyEnforceIf(conds)
-
-    # (NEW) 전월 말일 N 근무자 -> D1(index 0) OFF/VAC 강제
-    if prev_n_employees:
-        for e in prev_n_employees:
-            if e in employees:
-                # D1 is OFF or VAC or mapped equivalent
-                # x[e, 0, "OFF"] + x[e, 0, "VAC"] == 1
-                model.Add(x[(e, 0, "OFF")] + x[(e, 0, "VAC")] == 1)
-
-    # (NEW) 전월 말일 N 근무자 -> D1(index 0) OFF/VAC 강제
-    if prev_n_employees:
-        for e in prev_n_employees:
-            if e in employees:
-                # D1 is OFF or VAC or mapped equivalent
-                # x[e, 0, "OFF"] + x[e, 0, "VAC"] == 1
-                model.Add(x[(e, 0, "OFF")] + x[(e, 0, "VAC")] == 1)
-
-    # (NEW) 하루 N 근무자 최대 3명 제한
-    max_n_day = int(constraints.get("max_night_workers_per_day", 0))
-    if max_n_day > 0:
-        for d in range(horizon):
-            model.Add(sum(x[(e, d, "N")] for e in employees) <= max_n_day)
+    if minimize:
+        # 삭제 기반 축소: 빼도 여전히 해 없음이면 그 가정은 불필요
+        i = 0
+        while i < len(core):
+            trial = core[:i] + core[i + 1:]
+            sub = run(trial) if trial else None
+            if sub is not None:
+                core = [k for k in trial if k in set(sub)] or trial
+            else:
+                i += 1
+            if time.perf_counter() >= deadline:
+                break
 
-    # (NEW) 연속 휴무일 최대값 제한
-    max_off = int(constraints.get("max_consecutive_off_days", 0))
-    if max_off > 0:
-        # 연속된 (max_off + 1)일 동안 적어도 하루는 근무해야 함
-        # window size = k = max_off + 1
-        k = max_off + 1
-        work_shifts = ["A", "A2", "B", "C", "N"]
-        for e in employees:
-            for start in range(horizon - k + 1):
-                # sum(is_work[t] for t in start..start+k) >= 1
-                # is_work[t] = sum(x[e, t, s] for s in work_shifts)
-                # => sum(x[e, t, s] for t in range... for s in work_shifts) >= 1
-                model.Add(sum(x[(e, t, s)] for t in range(start, start + k) for s in work_shifts) >= 1)
-
-    # (NEW) 동반 근무 금지 (같은 날 같은 시프트 불가 -> 요청: N 근무만 금지)
-    if incompatible_employees and len(incompatible_employees) >= 2:
-        group = [e for e in incompatible_employees if e in employees]
-        if len(group) >= 2:
-            # User specifically asked for N shift conflict prevention
-            target_shifts = ["N"] 
-            for d in range(horizon):
-                for s in target_shifts:
-                    # 그룹 내에서 시프트 s(N)는 최대 1명만 가능
-                    model.Add(sum(x[(e, d, s)] for e in group) <= 1)
-
-    # (옵션) 시프트별 수요 충족 (Removed by request, keeping arg for compatibility but verify logic)
-    if demand:
-        # User requested removal, but code supports it. 
-        # If passed None, it's skipped.
-        for d, need_map in demand.items():
-            if 0 <= d < horizon:
-                for s in ["A", "B", "C", "N"]:
-                    need = int(need_map.get(s, 0))
-                    model.Add(sum(x[(e, d, s)] for e in employees) == need)
-
-    # (옵션) 하루 총 근무자 수 제약(OFF/VAC 제외)
-    # demand가 있을 땐 충돌 위험이 있어 사용 안 함
-    if demand is None:
-        if workers_per_day is not None and min_workers_per_day is None and max_workers_per_day is None:
-            for d in range(horizon):
-                model.Add(
-                    sum(x[(e, d, s)] for e in employees for s in ["A", "B", "C", "N"])
-                    == int(workers_per_day)
-                )
-        else:
-            if min_workers_per_day is not None:
-                for d in range(horizon):
-                    model.Add(
-                        sum(x[(e, d, s)] for e in employees for s in ["A", "B", "C", "N"])
-                        >= int(min_workers_per_day)
-                    )
-            if max_workers_per_day is not None:
-                for d in range(horizon):
-                    model.Add(
-                        sum(x[(e, d, s)] for e in employees for s in ["A", "B", "C", "N"])
-                        <= int(max_workers_per_day)
-                    )
-
-    # ---------- 목적함수(균등화 & 페널티) ----------
-    penalties = []
-
-    # (1) 종사자별 A/B/C 근무일수 균등화
-    w_balance_emp = int(weights.get("balance_shift_counts_per_employee", 10))
-    for s in ["A", "B", "C"]:
-        for i in range(len(employees)):
-            for j in range(i + 1, len(employees)):
-                e1, e2 = employees[i], employees[j]
-                diff = model.NewIntVar(-1000, 1000, f"diff_{s}_{e1}_{e2}")
-                model.Add(diff == sum(x[(e1, d, s)] - x[(e2, d, s)] for d in range(horizon)))
-                absdiff = model.NewIntVar(0, 1000, f"absdiff_{s}_{e1}_{e2}")
-                model.AddAbsEquality(absdiff, diff)
-                penalties.append(w_balance_emp * absdiff)
-
-    # (2) 일자별 총 근무자 수 균등화(OFF/VAC 제외)
-    w_balance_day = int(weights.get("balance_total_workers_per_day", 1))
-    workcount = []
-    for d in range(horizon):
-        wc = model.NewIntVar(0, len(employees), f"wc_{d}")
-        model.Add(wc == sum(x[(e, d, s)] for e in employees for s in ["A", "B", "C", "N"]))
-        workcount.append(wc)
-
-    for d1 in range(horizon):
-        for d2 in range(d1 + 1, horizon):
-            diffd = model.NewIntVar(-len(employees), len(employees), f"daydiff_{d1}_{d2}")
-            model.Add(diffd == workcount[d1] - workcount[d2])
-            absdiffd = model.NewIntVar(0, len(employees), f"absdaydiff_{d1}_{d2}")
-            model.AddAbsEquality(absdiffd, diffd)
-            penalties.append(w_balance_day * absdiffd)
-
-    # (3) N 이후 휴무가 2일 초과하면 벌점
-    w_long_rest = int(weights.get("penalty_too_long_rest_after_N", 5))
-    for e in employees:
-        for d in range(horizon - 3):
-            sum_off = (x[(e, d + 1, "OFF")] + x[(e, d + 1, "VAC")] +
-                       x[(e, d + 2, "OFF")] + x[(e, d + 2, "VAC")] +
-                       x[(e, d + 3, "OFF")] + x[(e, d + 3, "VAC")])
-            n_and_three_off = model.NewBoolVar(f"n_and_three_off_{e}_{d}")
-            tmp = model.NewIntVar(0, 6, f"sumoff_{e}_{d}")
-            model.Add(tmp == sum_off)
-            b_off3 = model.NewBoolVar(f"off3_{e}_{d}")
-            model.Add(tmp >= 3).OnlyEnforceIf(b_off3)
-            model.Add(tmp <= 2).OnlyEnforceIf(b_off3.Not())
-            model.AddBoolAnd([x[(e, d, "N")], b_off3]).OnlyEnforceIf(n_and_three_off)
-            model.AddBoolOr([x[(e, d, "N")].Not(), b_off3.Not()]).OnlyEnforceIf(n_and_three_off.Not())
-            penalties.append(w_long_rest * n_and_three_off)
-
-    # (4) 이상적인 패턴 보상 (Soft Constraint)
-    # C -> A -> A2 -> B -> N 순서를 선호.
-    # 즉, C(d) -> A(d+1) 이면 보상(페널티 차감) 등.
-    # 여기서는 "Minimize(penalties)"이므로, 좋은 패턴에 대해 '음수 페널티'를 추가하거나,
-    # 반대로 "나쁜 패턴"에 페널티를 주는 방식이 좋음.
-    # OR-Tools CP-SAT은 Minimize만 지원하므로, 음수 추가 가능.
-    
-    if constraints.get("prefer_ideal_pattern", False):
-        w_pattern = int(weights.get("reward_ideal_pattern", 3))
-        # ... (pattern logic)
-
-    # (NEW) N 후 불필요한 연속 휴무 억제 (Soft Penalty)
-    # 기본 휴무가 1일인데 2일 이상 쉬는 것을 '비선호'하게 만듦.
-    # N(d) -> OFF(d+1) -> OFF(d+2) : Penalty
-    default_min_off = int(constraints.get("min_off_after_N", 1))
-    if default_min_off == 1:
-        w_extra_rest = 10 # Penalty weight increased to discourage 2-day rests
-        for e in employees:
-             for d in range(horizon - 2):
-                 # N(d) -> OFF(d+1) -> OFF(d+2) pattern detection
-                 long_rest = model.NewBoolVar(f"long_rest_{e}_{d}")
-                 model.AddBoolAnd([
-                     x[(e, d, "N")], 
-                     x[(e, d+1, "OFF")], 
-                     x[(e, d+2, "OFF")]
-                 ]).OnlyEnforceIf(long_rest)
-                 # Penalty
-                 penalties.append(w_extra_rest * long_rest)
-
-    # (4) 이상적인 패턴 보상 (Soft Constraint)
-    if constraints.get("prefer_ideal_pattern", False):
-        w_pattern = int(weights.get("reward_ideal_pattern", 3))
-        # 패턴: C->A, A->A2, A2->B, B->N
-        # 각각 발생 시 -w만큼 페널티(즉 보상)
-        pairs = [("C", "A"), ("A", "A2"), ("A2", "B"), ("B", "N")]
-        for e in employees:
-            for d in range(horizon - 1):
-                for s1, s2 in pairs:
-                    # transition = 1 if (s1 at d) and (s2 at d+1)
-                    t_var = model.NewBoolVar(f"trans_{e}_{d}_{s1}_{s2}")
-                    model.AddBoolAnd([x[(e, d, s1)], x[(e, d + 1, s2)]]).OnlyEnforceIf(t_var)
-                    model.AddBoolOr([x[(e, d, s1)].Not(), x[(e, d + 1, s2)].Not()]).OnlyEnforceIf(t_var.Not())
-                    
-                    # 보상(음수 페널티)
-                    penalties.append(-w_pattern * t_var)
-
-    model.Minimize(sum(penalties))
-
-    solver = cp_model.CpSolver()
-    solver.parameters.max_time_in_seconds = 60.0
-    solver.parameters.num_search_workers = 8
-
-    status = solver.Solve(model)
-    status_name = solver.StatusName(status)
-
-    schedule: Dict[str, List[str]] = {}
-    if status in (cp_model.OPTIMAL, cp_model.FEASIBLE):
-        for e in employees:
-            row = []
-            for d in range(horizon):
-                assigned = None
-                for s in shifts:
-                    if solver.Value(x[(e, d, s)]) == 1:
-                        assigned = s
-                        break
-                row.append(assigned or "OFF")
-            schedule[e] = row
-    return schedule, status_name
\ No newline at end of file
+    return [_describe_assumption(k, constraints, lo_w, hi_w, min_off_overrides) for k in core]
@@ -0,0 +1,498 @@
+# src/service.py
+"""
+로컬 스케줄링 서비스: 여러 사용자(앱 세션, CLI)의 풀이 요청을 한 프로세스에서 받아
+크기 제한이 있는 대기열에 넣고, 고정 개수의 작업자가 차례로 푼다 (cached_build_and_solve + SolveJob).
+CPU 코어는 작업자끼리 나눠 num_search_workers 상한으로 적용하므로 동시에 여러 명이 생성을 눌러도
+코어 수 이상으로 탐색 워커가 뜨지 않는다. solver_options 는 허용한 키만 받고(SOLVER_OPTION_KEYS),
+탐색 워커 수는 [1, 작업당 코어], 시간 제한은 서버 상한(--max-time) 안으로 맞춘다.
+
+HTTP JSON API (기본 127.0.0.1:8765):
+    POST   /jobs              build_and_solve 인자 JSON (+ "explain": true 면 INFEASIBLE 일 때 원인 진단까지)
+                              → 202 {"id", "state", "position"} (대기열이 가득 차면 503)
+    GET    /jobs/<id>         상태/진행 상황 (state, position, elapsed, best_objective, history, best_schedule, diagnosing ...)
+    GET    /jobs/<id>/result  완료된 작업의 {"schedule", "status", "stats", "error", "conflicts"} (미완료면 409)
+    DELETE /jobs/<id>         취소 (대기 중이면 실행하지 않음, 실행 중이면 현재 최선해로 종료)
+    GET    /health            작업자 수, 대기/실행 중 작업 수
+
+실행 (work_attendance 폴더에서):
+    python -m src.service --workers 2 --queue 8
+클라이언트: ServiceClient (요청/조회), RemoteSolveJob (SolveJob 과 같은 사용법, 앱/CLI 에서 사용)
+"""
+import argparse
+import dataclasses
+import functools
+import json
+import os
+import queue
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+
+from .data_models import FamilyStats, SolveStats, Violation
+from .jobs import SolveJob
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+MAX_BODY_BYTES = 16 * 1024 * 1024
+
+# 요청으로 받을 수 있는 build_and_solve 인자 (on_solution / stop_event / collect_stats / as_matrix 는 서비스가 정함)
+JOB_ARGS = (
+    "employees", "horizon", "hours", "constraints", "weights", "demand", "vacations",
+    "workers_per_day", "min_workers_per_day", "max_workers_per_day", "forbid_free_vac",
+    "prev_n_employees", "min_off_overrides", "incompatible_employees", "shift_masks", "history",
+    "night_bounds", "hint_schedule", "hint_offset", "solver_options", "reuse_model", "use_cache",
+)
+_REQUIRED_ARGS = ("employees", "horizon", "hours", "constraints", "weights")
+# 진단(explain_infeasibility)에 넘기지 않는 인자 (풀이 설정)
+_NON_MODEL_ARGS = ("hint_schedule", "hint_offset", "solver_options", "reuse_model", "use_cache")
+
+# 요청으로 받을 수 있는 solver_options 키 (scheduler.DEFAULT_SOLVER_OPTIONS 키 + random_seed).
+# 그 밖의 CP-SAT 매개변수(num_workers 등)는 작업당 코어/시간 상한을 우회할 수 있어 받지 않음
+SOLVER_OPTION_KEYS = (
+    "max_time_in_seconds", "num_search_workers", "relative_gap_limit", "absolute_gap_limit",
+    "stall_seconds", "random_seed",
+)
+DEFAULT_MAX_TIME = 600.0
+
+
+class ServiceError(RuntimeError):
+    """서비스 요청 실패 (HTTP 상태 코드와 서버 메시지)"""
+
+    def __init__(self, message: str, code: int = 0):
+        super().__init__(message)
+        self.code = code
+
+
+def job_kwargs(payload: Dict[str, object]) -> Dict[str, object]:
+    """
+    JSON 요청 → build_and_solve 인자 (+ explain 여부). 알 수 없는 키/필수 인자 누락은 ValueError.
+    JSON 객체 키는 문자열이므로 demand 의 일자 키를 정수로, night_bounds 값을 튜플로 되돌림
+    """
+    unknown = sorted(set(payload) - set(JOB_ARGS) - {"explain"})
+    if unknown:
+        raise ValueError(f"알 수 없는 인자: {unknown}")
+    missing = [k for k in _REQUIRED_ARGS if k not in payload]
+    if missing:
+        raise ValueError(f"필수 인자 누락: {missing}")
+    kwargs = dict(payload)
+    if kwargs.get("demand") is not None:
+        kwargs["demand"] = {int(d): m for d, m in kwargs["demand"].items()}
+    if kwargs.get("night_bounds") is not None:
+        kwargs["night_bounds"] = {e: tuple(b) for e, b in kwargs["night_bounds"].items()}
+    kwargs["horizon"] = int(kwargs["horizon"])
+    return kwargs
+
+
+def stats_to_dict(stats: Optional[SolveStats]) -> Optional[Dict[str, object]]:
+    return None if stats is None else dataclasses.asdict(stats)
+
+
+def stats_from_dict(data: Optional[Dict[str, object]]) -> Optional[SolveStats]:
+    if data is None:
+        return None
+    data = dict(data)
+    data["families"] = [FamilyStats(**f) for f in data.get("families", [])]
+    return SolveStats(**data)
+
+
+def conflicts_from_list(data: Optional[List[Dict[str, object]]]) -> List[Violation]:
+    return [Violation(**v) for v in data or []]
+
+
+class _QueuedJob:
+    """대기열 항목: 작업자가 꺼내 SolveJob 으로 실행"""
+
+    def __init__(self, kwargs: Dict[str, object], explain: bool = False):
+        self.id = uuid.uuid4().hex
+        self.kwargs = kwargs
+        self.explain = explain
+        self.submitted_at = time.time()
+        self.job: Optional[SolveJob] = None
+        self.cancelled = False
+
+    @property
+    def state(self) -> str:
+        if self.job is None:
+            return "cancelled" if self.cancelled else "queued"
+        if not self.job.done:
+            return "running"
+        if self.job.status == "ERROR":
+            return "error"
+        return "cancelled" if self.job.cancelled else "done"
+
+
+class SolveService:
+    """
+    크기 제한 대기열 + 고정 크기 작업자 풀.
+    - max_queue: 대기 중인 작업 상한 (넘으면 submit 이 queue.Full)
+    - total_cpus: 작업자끼리 나눌 코어 수 → 작업마다 num_search_workers <= total_cpus // workers
+    - keep_finished: 결과를 보관할 완료 작업 수 (오래된 것부터 삭제)
+    - max_time: 작업 하나의 max_time_in_seconds 상한 (초)
+    """
+
+    def __init__(self, workers: int = 1, max_queue: int = 8, total_cpus: Optional[int] = None,
+                 keep_finished: int = 100, max_time: float = DEFAULT_MAX_TIME):
+        # ortools 는 서비스를 띄울 때만 불러옴
+        from .scheduler import DEFAULT_SOLVER_OPTIONS, explain_infeasibility
+        from .solve_cache import cached_build_and_solve
+
+        self._solve_fn = cached_build_and_solve
+        self._explain_fn = explain_infeasibility
+        self._default_options = DEFAULT_SOLVER_OPTIONS
+        self.workers = max(1, int(workers))
+        self.cpus_per_job = max(1, int(total_cpus or os.cpu_count() or 1) // self.workers)
+        self.max_time = max(1.0, float(max_time))
+        self._queue: "queue.Queue[_QueuedJob]" = queue.Queue(maxsize=max(1, int(max_queue)))
+        self._jobs: "OrderedDict[str, _QueuedJob]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._keep_finished = max(1, int(keep_finished))
+        self._threads = [
+            threading.Thread(target=self._worker, name=f"solve-worker-{i}", daemon=True)
+            for i in range(self.workers)
+        ]
+        for t in self._threads:
+            t.start()
+
+    def _worker(self) -> None:
+        while True:
+            item = self._queue.get()
+            try:
+                if item.cancelled:
+                    continue
+                diagnose = None
+                if item.explain:
+                    # 진단도 같은 작업자에서 실행 (작업자 수/코어 상한 안에서, 단일 워커)
+                    model_kwargs = {k: v for k, v in item.kwargs.items() if k not in _NON_MODEL_ARGS}
+                    diagnose = functools.partial(self._explain_fn, **model_kwargs)
+                job = SolveJob(self._solve_fn, item.kwargs, diagnose=diagnose)
+                with self._lock:
+                    # 대기열에서 꺼낸 뒤 취소된 경우: 작업을 붙이지 않고 건너뜀 (cancel 은 job 이 없어 알릴 곳이 없음)
+                    if item.cancelled:
+                        continue
+                    item.job = job
+                job.start()
+                job.wait()
+            finally:
+                self._queue.task_done()
+                self._prune()
+
+    def _prune(self) -> None:
+        """완료 작업이 keep_finished 를 넘으면 오래된 것부터 삭제"""
+        with self._lock:
+            finished = [k for k, v in self._jobs.items() if v.state not in ("queued", "running")]
+            for k in finished[:max(0, len(finished) - self._keep_finished)]:
+                del self._jobs[k]
+
+    def solver_options(self, opts: Optional[Dict[str, object]]) -> Dict[str, object]:
+        """
+        요청 solver_options → 서버 상한을 적용한 값. 허용하지 않은 키는 ValueError.
+        num_search_workers 는 [1, cpus_per_job] (0 = CP-SAT 의 "모든 코어" 도 상한으로),
+        max_time_in_seconds 는 (0, max_time] 으로 맞춤
+        """
+        opts = dict(opts or {})
+        unknown = sorted(set(opts) - set(SOLVER_OPTION_KEYS))
+        if unknown:
+            raise ValueError(f"허용하지 않는 솔버 설정: {unknown} (가능: {list(SOLVER_OPTION_KEYS)})")
+        n_workers = int(opts.get("num_search_workers") or self.cpus_per_job)
+        opts["num_search_workers"] = min(max(1, n_workers), self.cpus_per_job)
+        max_time = float(opts.get("max_time_in_seconds") or self._default_options["max_time_in_seconds"])
+        opts["max_time_in_seconds"] = min(max_time, self.max_time) if max_time > 0 else self.max_time
+        return opts
+
+    def submit(self, kwargs: Dict[str, object]) -> _QueuedJob:
+        """작업 등록. solver_options 가 허용 범위를 벗어나면 ValueError, 대기열이 가득 차면 queue.Full"""
+        kwargs = {**kwargs, "solver_options": self.solver_options(kwargs.get("solver_options"))}
+        explain = bool(kwargs.pop("explain", False))
+        item = _QueuedJob(kwargs, explain)
+        with self._lock:
+            self._queue.put_nowait(item)  # 가득 차면 queue.Full
+            self._jobs[item.id] = item
+        return item
+
+    def get(self, job_id: str) -> Optional[_QueuedJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> Optional[_QueuedJob]:
+        with self._lock:
+            item = self._jobs.get(job_id)
+            if item is None:
+                return None
+            item.cancelled = True
+            job = item.job
+        if job is not None:
+            job.cancel()
+        return item
+
+    def _position(self, item: _QueuedJob) -> int:
+        """대기 순번 (1 = 다음 실행, 0 = 대기 중 아님)"""
+        if item.state != "queued":
+            return 0
+        waiting = [v for v in self._jobs.values() if v.state == "queued"]
+        return waiting.index(item) + 1
+
+    def describe(self, item: _QueuedJob) -> Dict[str, object]:
+        """GET /jobs/<id> 응답: SolveJob.snapshot() + 대기열 정보"""
+        with self._lock:
+            info = {"id": item.id, "state": item.state, "position": self._position(item),
+                    "submitted_at": item.submitted_at}
+            job = item.job
+        snap = job.snapshot() if job is not None else {
+            "done": item.cancelled, "elapsed": 0.0, "best_schedule": {}, "best_objective": None,
+            "history": [], "status": "UNKNOWN" if item.cancelled else None, "cancelled": item.cancelled,
+            "diagnosing": False,
+        }
+        return {**info, **snap}
+
+    def result(self, item: _QueuedJob) -> Dict[str, object]:
+        """GET /jobs/<id>/result 응답 (완료 작업만)"""
+        job = item.job
+        if job is None:
+            return {"schedule": {}, "status": "UNKNOWN", "stats": None, "error": None, "conflicts": []}
+        schedule = job.schedule
+        if hasattr(schedule, "to_dict"):
+            schedule = schedule.to_dict()
+        return {"schedule": schedule or {}, "status": job.status, "stats": stats_to_dict(job.stats), "error": job.error,
+                "conflicts": [dataclasses.asdict(v) for v in job.conflicts]}
+
+    def health(self) -> Dict[str, object]:
+        with self._lock:
+            states = [v.state for v in self._jobs.values()]
+        return {
+            "workers": self.workers,
+            "cpus_per_job": self.cpus_per_job,
+            "max_time": self.max_time,
+            "queue_limit": self._queue.maxsize,
+            "queued": states.count("queued"),
+            "running": states.count("running"),
+        }
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = "ShiftScheduler/1.0"
+    service: SolveService = None  # make_server 에서 지정
+    verbose = False
+
+    def log_message(self, fmt, *args):
+        if self.verbose:
+            super().log_message(fmt, *args)
+
+    def _send(self, code: int, body: Dict[str, object]) -> None:
+        data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _route(self) -> Tuple[Optional[_QueuedJob], List[str]]:
+        parts = [p for p in self.path.split("?", 1)[0].split("/") if p]
+        if len(parts) >= 2 and parts[0] == "jobs":
+            return self.service.get(parts[1]), parts
+        return None, parts
+
+    def do_GET(self):
+        item, parts = self._route()
+        if parts == ["health"]:
+            self._send(200, self.service.health())
+        elif item is None:
+            self._send(404, {"error": "작업이 없습니다."})
+        elif len(parts) == 2:
+            self._send(200, self.service.describe(item))
+        elif len(parts) == 3 and parts[2] == "result":
+            if item.state in ("queued", "running"):
+                self._send(409, {"error": "작업이 아직 끝나지 않았습니다.", "state": item.state})
+            else:
+                self._send(200, self.service.result(item))
+        else:
+            self._send(404, {"error": "알 수 없는 경로"})
+
+    def do_POST(self):
+        if self.path.split("?", 1)[0].rstrip("/") != "/jobs":
+            self._send(404, {"error": "알 수 없는 경로"})
+            return
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > MAX_BODY_BYTES:
+            self._send(413, {"error": f"요청이 너무 큽니다 (최대 {MAX_BODY_BYTES} bytes)"})
+            return
+        try:
+            kwargs = job_kwargs(json.loads(self.rfile.read(length) or b"{}"))
+        except (ValueError, TypeError, AttributeError) as exc:
+            self._send(400, {"error": str(exc)})
+            return
+        try:
+            item = self.service.submit(kwargs)
+        except (ValueError, TypeError) as exc:
+            self._send(400, {"error": str(exc)})
+            return
+        except queue.Full:
+            self._send(503, {"error": "대기열이 가득 찼습니다. 잠시 후 다시 시도해 주세요."})
+            return
+        self._send(202, self.service.describe(item))
+
+    def do_DELETE(self):
+        item, parts = self._route()
+        if item is None or len(parts) != 2:
+            self._send(404, {"error": "작업이 없습니다."})
+            return
+        # _route() 이후 작업자의 _prune() 으로 지워졌을 수 있음
+        cancelled = self.service.cancel(item.id)
+        if cancelled is None:
+            self._send(404, {"error": "작업이 없습니다."})
+            return
+        self._send(200, self.service.describe(cancelled))
+
+
+def make_server(service: SolveService, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+                verbose: bool = False) -> ThreadingHTTPServer:
+    """service 를 감싼 HTTP 서버 (serve_forever 로 실행, port=0 이면 빈 포트 자동 선택)"""
+    handler = type("Handler", (_Handler,), {"service": service, "verbose": verbose})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+# ---------- 클라이언트 ----------
+class ServiceClient:
+    """스케줄링 서비스 HTTP 클라이언트 (urllib, 추가 의존성 없음)"""
+
+    def __init__(self, url: str, timeout: float = 10.0):
+        self.url = url.rstrip("/")
+        self.timeout = timeout
+
+    def _request(self, method: str, path: str, body: Optional[Dict[str, object]] = None) -> Dict[str, object]:
+        data = None if body is None else json.dumps(body, ensure_ascii=False).encode("utf-8")
+        req = urllib.request.Request(self.url + path, data=data, method=method,
+                                     headers={"Content-Type": "application/json"})
+        try:
+            with urllib.request.urlopen(req, timeout=self.timeout) as resp:
+                return json.loads(resp.read() or b"{}")
+        except urllib.error.HTTPError as exc:
+            try:
+                message = json.loads(exc.read()).get("error", exc.reason)
+            except ValueError:
+                message = exc.reason
+            raise ServiceError(f"{method} {path}: {message}", exc.code) from None
+        except urllib.error.URLError as exc:
+            raise ServiceError(f"스케줄링 서비스({self.url})에 연결할 수 없습니다: {exc.reason}") from None
+
+    def submit(self, **solve_kwargs) -> Dict[str, object]:
+        """작업 등록 → {"id", "state", "position", ...}"""
+        return self._request("POST", "/jobs", solve_kwargs)
+
+    def status(self, job_id: str) -> Dict[str, object]:
+        return self._request("GET", f"/jobs/{job_id}")
+
+    def result(self, job_id: str) -> Dict[str, object]:
+        return self._request("GET", f"/jobs/{job_id}/result")
+
+    def cancel(self, job_id: str) -> Dict[str, object]:
+        return self._request("DELETE", f"/jobs/{job_id}")
+
+    def health(self) -> Dict[str, object]:
+        return self._request("GET", "/health")
+
+
+class RemoteSolveJob:
+    """
+    서비스에 보낸 작업을 SolveJob 과 같은 모양으로 다룸 (start / cancel / snapshot / done / wait,
+    완료 후 schedule / status / stats / error / conflicts). 앱은 로컬 SolveJob 대신 그대로 바꿔 쓸 수 있음.
+    solve_kwargs: build_and_solve 인자 (JSON 으로 보낼 수 있는 값만, use_cache 포함 가능)
+    explain: INFEASIBLE 이면 서비스 작업자가 원인 진단까지 해서 conflicts 로 돌려줌
+    """
+
+    def __init__(self, url: str, solve_kwargs: Dict[str, object], explain: bool = False):
+        self._client = ServiceClient(url)
+        self._kwargs = {k: v for k, v in solve_kwargs.items() if k in JOB_ARGS}
+        if explain:
+            self._kwargs["explain"] = True
+        self.id: Optional[str] = None
+        self._last: Dict[str, object] = {}
+        self.schedule: Dict[str, List[str]] = {}
+        self.status: Optional[str] = None
+        self.stats: Optional[SolveStats] = None
+        self.error: Optional[str] = None
+        self.conflicts: List[Violation] = []
+
+    def start(self) -> "RemoteSolveJob":
+        self._last = self._client.submit(**self._kwargs)
+        self.id = self._last["id"]
+        return self
+
+    def cancel(self) -> None:
+        self._last = self._client.cancel(self.id)
+
+    @property
+    def cancelled(self) -> bool:
+        return bool(self._last.get("cancelled"))
+
+    @property
+    def done(self) -> bool:
+        return self.status is not None
+
+    def _fetch_result(self) -> None:
+        res = self._client.result(self.id)
+        self.schedule = res.get("schedule") or {}
+        self.stats = stats_from_dict(res.get("stats"))
+        self.error = res.get("error")
+        self.conflicts = conflicts_from_list(res.get("conflicts"))
+        self.status = res.get("status") or "UNKNOWN"
+
+    def snapshot(self) -> Dict[str, object]:
+        """서비스에서 현재 상태를 읽어 SolveJob.snapshot() 형식 + state/position 으로 반환"""
+        if self.done:
+            return {**self._last, "done": True, "status": self.status}
+        self._last = self._client.status(self.id)
+        if self._last.get("state") not in ("queued", "running"):
+            self._fetch_result()
+            return {**self._last, "done": True, "status": self.status}
+        return {**self._last, "done": False}
+
+    def wait(self, timeout: Optional[float] = None, poll: float = 1.0, on_progress=None) -> bool:
+        """완료까지 poll 초 간격으로 조회 (on_progress(snapshot) 호출). 완료면 True"""
+        deadline = None if timeout is None else time.time() + timeout
+        while True:
+            snap = self.snapshot()
+            if on_progress is not None:
+                on_progress(snap)
+            if snap["done"]:
+                return True
+            if deadline is not None and time.time() >= deadline:
+                return False
+            time.sleep(poll)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m src.service", description="로컬 스케줄링 서비스 (HTTP JSON API)")
+    parser.add_argument("--host", type=str, default=DEFAULT_HOST, help=f"바인딩 주소 (기본 {DEFAULT_HOST}, 외부 공개 시 주의)")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"포트 (기본 {DEFAULT_PORT})")
+    parser.add_argument("--workers", type=int, default=1, help="동시에 푸는 작업 수 (기본 1)")
+    parser.add_argument("--queue", type=int, default=8, help="대기열 최대 길이 (넘으면 503)")
+    parser.add_argument("--cpus", type=int, default=None, help="작업자끼리 나눌 CPU 코어 수 (기본 os.cpu_count())")
+    parser.add_argument("--keep", type=int, default=100, help="결과를 보관할 완료 작업 수")
+    parser.add_argument("--max-time", type=float, default=DEFAULT_MAX_TIME,
+                        help=f"작업당 시간 제한 상한(초, 기본 {DEFAULT_MAX_TIME:g}). 요청 값이 더 크면 이 값으로 줄임")
+    parser.add_argument("--verbose", action="store_true", help="요청 로그 출력")
+    args = parser.parse_args(argv)
+
+    service = SolveService(workers=args.workers, max_queue=args.queue, total_cpus=args.cpus,
+                           keep_finished=args.keep, max_time=args.max_time)
+    server = make_server(service, args.host, args.port, verbose=args.verbose)
+    host, port = server.server_address[:2]
+    print(f"스케줄링 서비스: http://{host}:{port} (작업자 {service.workers}, 작업당 코어 {service.cpus_per_job}, "
+          f"작업당 최대 {service.max_time:g}초, 대기열 {args.queue})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
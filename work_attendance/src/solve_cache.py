@@ -0,0 +1,165 @@
+# src/solve_cache.py
+"""
+build_and_solve 앞단의 결과 캐시 (outputs/cache).
+같은 입력(직원, 기간, 규칙, 휴가, 옵션)과 같은 솔버 설정이면 저장된 해를 그대로 돌려준다.
+- 키: 모델 버전(scheduler.MODEL_VERSION) + 입력 전체 + 솔버 설정(제한 시간 제외)의 정규화 JSON → sha256
+  (모델을 바꾸면 MODEL_VERSION 을 올려 이전 모델의 결과를 무효화)
+- OPTIMAL / INFEASIBLE: 증명된 결과이므로 항상 재사용
+- FEASIBLE: 저장 당시 제한 시간 >= 이번 요청 제한 시간일 때만 재사용
+- 용량 상한을 넘으면 가장 오래 사용하지 않은 항목부터 삭제(LRU, 파일 mtime 기준)
+"""
+import hashlib
+import json
+import os
+import time
+from typing import Dict, List, Optional
+
+from .data_models import ScheduleMatrix, SolveStats
+from .scheduler import DEFAULT_SOLVER_OPTIONS, MODEL_VERSION, build_and_solve
+
+BASE_DIR = os.path.dirname(os.path.dirname(__file__))
+OUTPUT_DIR = os.path.join(BASE_DIR, "outputs")
+CACHE_DIR = os.path.join(OUTPUT_DIR, "cache")
+DEFAULT_MAX_CACHE_BYTES = 50 * 1024 * 1024
+
+# 문제 자체를 바꾸지 않는 인자 (키에서 제외)
+_NON_KEY_ARGS = (
+    "collect_stats", "reuse_model", "hint_schedule", "hint_offset", "solver_options",
+    "on_solution", "on_objective", "on_bound", "stop_event", "as_matrix",
+)
+_PROVEN = ("OPTIMAL", "INFEASIBLE")
+
+
+def _canonical(obj):
+    """dict 키 문자열화 + 정렬, 집합/튜플은 리스트로"""
+    if isinstance(obj, dict):
+        return {str(k): _canonical(v) for k, v in sorted(obj.items(), key=lambda kv: str(kv[0]))}
+    if isinstance(obj, (list, tuple)):
+        return [_canonical(v) for v in obj]
+    if isinstance(obj, set):
+        return sorted(_canonical(v) for v in obj)
+    return obj
+
+
+def solve_cache_key(solve_kwargs: Dict[str, object]) -> str:
+    """build_and_solve 인자(dict)로부터 캐시 키 생성"""
+    opts = {**DEFAULT_SOLVER_OPTIONS, **(solve_kwargs.get("solver_options") or {})}
+    opts.pop("max_time_in_seconds", None)
+    inputs = {k: v for k, v in solve_kwargs.items() if k not in _NON_KEY_ARGS}
+    # 휴가 일자, 전월 말 N 근무자는 순서와 무관
+    if inputs.get("vacations"):
+        inputs["vacations"] = {e: sorted(set(days)) for e, days in inputs["vacations"].items()}
+    if inputs.get("prev_n_employees"):
+        inputs["prev_n_employees"] = sorted(set(inputs["prev_n_employees"]))
+    payload = json.dumps(
+        {"model_version": MODEL_VERSION, "inputs": _canonical(inputs), "solver": _canonical(opts)},
+        sort_keys=True, ensure_ascii=False, default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _entry_path(key: str, cache_dir: str) -> str:
+    return os.path.join(cache_dir, f"{key}.json")
+
+
+def load_cached(key: str, time_limit: float, cache_dir: str = CACHE_DIR) -> Optional[dict]:
+    """재사용 가능한 항목이 있으면 dict 반환 (사용 시각 갱신), 없으면 None"""
+    path = _entry_path(key, cache_dir)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            entry = json.load(f)
+    except (OSError, ValueError):
+        return None
+    status = entry.get("status")
+    if status not in _PROVEN:
+        if status != "FEASIBLE" or float(entry.get("time_limit", 0)) < float(time_limit):
+            return None
+    try:
+        os.utime(path)  # LRU: 최근 사용 표시
+    except OSError:
+        pass
+    return entry
+
+
+def store(key: str, entry: dict, cache_dir: str = CACHE_DIR, max_bytes: int = DEFAULT_MAX_CACHE_BYTES) -> None:
+    """항목 저장(임시 파일 → 교체로 원자적 기록) 후 용량 초과분 정리"""
+    os.makedirs(cache_dir, exist_ok=True)
+    path = _entry_path(key, cache_dir)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(entry, f, ensure_ascii=False)
+    os.replace(tmp, path)
+    evict(cache_dir, max_bytes)
+
+
+def evict(cache_dir: str = CACHE_DIR, max_bytes: int = DEFAULT_MAX_CACHE_BYTES) -> int:
+    """총 용량이 max_bytes 이하가 될 때까지 오래된 항목 삭제. 삭제 개수 반환"""
+    if not os.path.isdir(cache_dir):
+        return 0
+    files = []
+    for name in os.listdir(cache_dir):
+        if not name.endswith(".json"):
+            continue
+        p = os.path.join(cache_dir, name)
+        try:
+            st = os.stat(p)
+        except OSError:
+            continue
+        files.append((st.st_mtime, st.st_size, p))
+    total = sum(size for _, size, _ in files)
+    removed = 0
+    for _, size, p in sorted(files):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(p)
+            total -= size
+            removed += 1
+        except OSError:
+            pass
+    return removed
+
+
+def cached_build_and_solve(
+    cache_dir: str = CACHE_DIR,
+    max_cache_bytes: int = DEFAULT_MAX_CACHE_BYTES,
+    use_cache: bool = True,
+    **solve_kwargs,
+):
+    """
+    build_and_solve와 같은 인자/반환 형식. 캐시에 재사용 가능한 결과가 있으면 솔버를 건너뜀.
+    collect_stats=True 이면 캐시 적중 시 SolveStats(cache_hit=True, objective=저장값)를 반환.
+    """
+    collect_stats = bool(solve_kwargs.get("collect_stats", False))
+    if not use_cache:
+        return build_and_solve(**solve_kwargs)
+
+    opts = {**DEFAULT_SOLVER_OPTIONS, **(solve_kwargs.get("solver_options") or {})}
+    time_limit = float(opts["max_time_in_seconds"])
+    key = solve_cache_key(solve_kwargs)
+
+    entry = load_cached(key, time_limit, cache_dir)
+    if entry is not None:
+        schedule: Dict[str, List[str]] = entry.get("schedule") or {}
+        if solve_kwargs.get("as_matrix"):
+            schedule = ScheduleMatrix.from_dict(schedule) if schedule else None
+        if collect_stats:
+            return schedule, entry["status"], SolveStats(
+                cache_hit=True, objective=entry.get("objective"), stop_reason=entry.get("stop_reason", ""),
+            )
+        return schedule, entry["status"]
+
+    schedule, status, stats = build_and_solve(**{**solve_kwargs, "collect_stats": True})
+    # 사용자가 중간에 멈춘 결과는 요청한 시간만큼 탐색한 것이 아니므로 저장하지 않음
+    if (status in _PROVEN or status == "FEASIBLE") and stats.stop_reason != "user":
+        store(key, {
+            "status": status,
+            "schedule": schedule.to_dict() if isinstance(schedule, ScheduleMatrix) else schedule,
+            "objective": stats.objective,
+            "stop_reason": stats.stop_reason,
+            "time_limit": time_limit,
+            "created": time.time(),
+        }, cache_dir, max_cache_bytes)
+    if collect_stats:
+        return schedule, status, stats
+    return schedule, status
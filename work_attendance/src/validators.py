@@ -1,14 +1,319 @@
-from typing import Dict, List
+from typing import Dict, List, Optional, Sequence, Tuple, Union
 
-def check_rules(schedule: Dict[str, List[str]], hours: Dict[str, int]) -> Dict[str, List[str]]:
+import numpy as np
+
+from .aggregate import OTHER, SHIFT_CODES, encode_schedule, hours_vector
+from .data_models import ScheduleMatrix, Violation
+from .rules import (
+    RULE_LABELS, _PARAM_MAX, _night_range, _rest_cap, _trim_history, _workers_range, history_span,
+)
+
+_C = {s: i for i, s in enumerate(SHIFT_CODES)}
+_NONE = -1  # 이력이 없는 앞쪽 칸 (어떤 시프트와도 다름)
+_WORK = np.zeros(OTHER + 2, dtype=bool)  # 코드 → 근무 여부 (마지막 칸 = _NONE)
+_WORK[[_C[s] for s in ("A", "A2", "B", "C", "N")]] = True
+_DAY_SHIFTS = ("A", "A2", "B", "C")
+
+
+def _label(rule: str) -> str:
+    return RULE_LABELS.get(rule, rule)
+
+
+def _lag(a: np.ndarray, k: int, fill=False) -> np.ndarray:
+    """a[..., p - k] 를 p 위치로 (앞쪽 k 칸은 fill)"""
+    if k == 0:
+        return a
+    out = np.full_like(a, fill)
+    out[..., k:] = a[..., :-k]
+    return out
+
+
+def _window_sum(a: np.ndarray, w: int) -> np.ndarray:
+    """창 끝 위치 p 기준 a[..., p-w+1 .. p] 합 (앞쪽 w-1 칸은 불완전 창이라 0)"""
+    c = np.cumsum(a, axis=-1, dtype=np.int64)
+    out = c.copy()
+    out[..., w:] -= c[..., :-w]
+    out[..., :w - 1] = 0
+    return out
+
+
+def _rule_cells(
+    full: np.ndarray,
+    lead: int,
+    first: np.ndarray,
+    constraints: Dict[str, object],
+    hours: np.ndarray,
+    min_off: np.ndarray,
+) -> List[Tuple[str, np.ndarray, int, Optional[np.ndarray]]]:
+    """
+    직원×일자 순서/창 규칙 위반 위치. full: (직원, lead + 일수) 코드 (앞 lead 칸은 경계 이력, 없으면 _NONE),
+    first: 직원별 이력 시작 칸. 반환: [(rule, 위반한 창의 끝 칸 bool 행렬 (직원, 일수), 창 길이, 창 값 또는 None)]
+    창은 끝이 기간 안이고 시작이 이력 범위 안인 것만 (scheduler 의 first(e, 창 길이) 와 같은 범위)
     """
-    간단한 사후검증: 규칙 위반을 문자열로 모아 리턴
-    (필요시 더 상세 검증을 추가하세요)
+    pos = np.arange(full.shape[-1])
+    is_ = {s: full == _C[s] for s in SHIFT_CODES}
+    rest = is_["OFF"] | is_["VAC"]
+    work = _WORK[full]
+
+    def inside(w: int) -> np.ndarray:
+        return pos - w + 1 >= first[:, None]
+
+    out: List[Tuple[str, np.ndarray, int, Optional[np.ndarray]]] = []
+
+    def add(rule: str, mask: np.ndarray, w: int, values: Optional[np.ndarray] = None) -> None:
+        mask = mask & inside(w)
+        out.append((rule, mask[:, lead:], w, None if values is None else values[:, lead:]))
+
+    W = int(constraints.get("weekly_hours_window", 7) or 0)
+    max_h = int(constraints.get("max_weekly_hours", 52) or 0)
+    if W and max_h:
+        total = _window_sum(hours[full], W)
+        add("max_weekly_hours", total > max_h, W, total)
+    if constraints.get("forbid_B_then_A", True):
+        add("forbid_B_then_A", _lag(is_["B"], 1) & is_["A"], 2)
+    # N 다음 k일(직원별 휴무일수까지)은 OFF/VAC
+    for k in range(1, int(min_off.max(initial=1)) + 1):
+        add("min_off_after_N", _lag(is_["N"], k) & ~rest & (min_off >= k)[:, None], k + 1)
+    if constraints.get("forbid_A_after_N_rest", True):
+        add("forbid_A_after_N_rest", _lag(is_["N"], 2) & is_["A"], 3)
+    if constraints.get("forbid_three_A_in_row", True):
+        add("forbid_three_A_in_row", _lag(is_["A"], 2) & _lag(is_["A"], 1) & is_["A"], 3)
+    if constraints.get("forbid_N_OFF_N", False):
+        add("forbid_N_OFF_N", _lag(is_["N"], 2) & _lag(rest, 1) & is_["N"], 3)
+    if constraints.get("forbid_off_after_day_shift", False):
+        day = np.isin(full, [_C[s] for s in _DAY_SHIFTS])
+        add("forbid_off_after_day_shift", _lag(day, 1) & is_["OFF"], 2)
+    # 휴무 - 근무 k일 - 휴무 (1 <= k < min_cons): 오른쪽 휴무 칸 기준
+    min_cons = int(constraints.get("min_consecutive_work_days", 0))
+    for k in range(1, min_cons):
+        run = _window_sum(work, k) == k
+        add("min_consecutive_work_days", _lag(rest, k + 1) & _lag(run, 1) & rest, k + 2)
+    max_off = int(constraints.get("max_consecutive_off_days", 0))
+    if max_off > 0:
+        k = max_off + 1
+        add("max_consecutive_off_days", _window_sum(work, k) == 0, k)
+    return out
+
+
+def validate_schedule(
+    schedule: Union[Dict[str, List[str]], ScheduleMatrix],
+    hours: Dict[str, int],
+    constraints: Dict[str, object],
+    demand: Optional[Dict[int, Dict[str, int]]] = None,
+    vacations: Optional[Dict[str, List[int]]] = None,
+    workers_per_day: Optional[int] = None,
+    min_workers_per_day: Optional[int] = None,
+    max_workers_per_day: Optional[int] = None,
+    forbid_free_vac: bool = True,
+    prev_n_employees: Optional[List[str]] = None,
+    min_off_overrides: Optional[Dict[str, int]] = None,
+    incompatible_employees: Optional[List[str]] = None,
+    shift_masks: Optional[Dict[str, List[str]]] = None,
+    history: Optional[Dict[str, List[str]]] = None,
+    night_bounds: Optional[Dict[str, Tuple[int, int]]] = None,
+) -> List[Violation]:
+    """
+    build_and_solve 가 거는 모든 필수 제약을 근무표에 대해 다시 검사 (손으로 고친 근무표, 배치 결과 재검증용).
+    인자는 build_and_solve 와 같은 뜻. 근무표를 코드 행렬로 바꾼 뒤 규칙마다 슬라이딩 창 연산으로 위반 칸을 찾는다.
+    반환: 위반 목록 (칸 규칙은 employee/day = 창의 마지막 날, 일자 규칙은 day 만, 직원 규칙은 employee 만)
+    """
+    employees, codes = encode_schedule(schedule)
+    n_emp, horizon = codes.shape
+    codes = codes.astype(np.int64)
+    row = {e: i for i, e in enumerate(employees)}
+    out: List[Violation] = []
+
+    def cell(rule: str, i: int, d: int, msg: str) -> None:
+        out.append(Violation(rule=rule, message=f"{employees[i]} {msg}", day=int(d), employee=employees[i]))
+
+    # 알 수 없는 표기 (하루 1개 시프트를 확인할 수 없음)
+    for i, d in zip(*np.nonzero(codes == OTHER)):
+        cell("shift_label", i, d, f"D{d + 1} 알 수 없는 시프트")
+
+    # 휴가 요청일 = VAC, 그 외 VAC 금지 / 전월 말일 N 근무자 D1 휴무 / 직원별 금지 시프트
+    requested = np.zeros_like(codes, dtype=bool)
+    for e, days in (vacations or {}).items():
+        if e in row:
+            requested[row[e], [d for d in days if 0 <= d < horizon]] = True
+    is_vac = codes == _C["VAC"]
+    for i, d in zip(*np.nonzero(requested & ~is_vac)):
+        cell("vacation", i, d, f"D{d + 1} 휴가 요청일인데 {SHIFT_CODES[codes[i, d]] if codes[i, d] < OTHER else '?'}")
+    if forbid_free_vac:
+        for i, d in zip(*np.nonzero(is_vac & ~requested)):
+            cell("vacation", i, d, f"D{d + 1} 요청하지 않은 휴가(VAC)")
+    if horizon:
+        for e in prev_n_employees or []:
+            if e in row and codes[row[e], 0] not in (_C["OFF"], _C["VAC"]):
+                cell("prev_n_employees", row[e], 0, "전월 말일 N 근무 → D1 휴무여야 함")
+    for e, masked in (shift_masks or {}).items():
+        if e in row and masked:
+            hit = np.isin(codes[row[e]], [_C[s] for s in masked if s in _C])
+            for d in np.nonzero(hit)[0]:
+                cell("shift_masks", row[e], d, f"D{d + 1} 금지 시프트 {SHIFT_CODES[codes[row[e], d]]}")
+
+    # 순서/창 규칙: 경계 이력을 앞에 붙인 행렬에서 검사
+    rest_cap = _rest_cap(constraints, min_off_overrides)
+    hist = _trim_history(history, employees, history_span(constraints, min_off_overrides), list(SHIFT_CODES))
+    lead = max((len(h) for h in hist.values()), default=0)
+    full = np.full((n_emp, lead + horizon), _NONE, dtype=np.int64)
+    full[:, lead:] = codes
+    first = np.full(n_emp, lead, dtype=np.int64)
+    for e, h in hist.items():
+        full[row[e], lead - len(h):lead] = [_C[s] for s in h]
+        first[row[e]] = lead - len(h)
+    default_off = max(1, int(constraints.get("min_off_after_N", 1)))
+    min_off = np.array([max(1, int((min_off_overrides or {}).get(e, default_off))) for e in employees], dtype=np.int64)
+    min_off = np.minimum(min_off, max(rest_cap, default_off))
+    hours_vec = np.append(hours_vector(hours), 0)  # _NONE(-1) → 마지막 칸 0시간
+    max_h = int(constraints.get("max_weekly_hours", 52) or 0)
+    for rule, mask, w, values in _rule_cells(full, lead, first, constraints, hours_vec, min_off):
+        for i, d in zip(*np.nonzero(mask)):
+            start = d - w + 1
+            span = f"D{d + 1}" if w == 1 else (f"D{start + 1}~D{d + 1}" if start >= 0 else f"전월 {-start}일~D{d + 1}")
+            detail = f" {values[i, d]}시간 > {max_h}시간" if rule == "max_weekly_hours" else ""
+            cell(rule, i, d, f"{span} {_label(rule)}{detail}")
+
+    # 직원별 N 횟수
+    n_count = (codes == _C["N"]).sum(axis=1)
+    lo_n, hi_n = _night_range(
+        int(constraints.get("min_night_shifts_per_employee", 0)),
+        int(constraints.get("max_night_shifts_per_employee", 0)),
+    )
+    for i, e in enumerate(employees):
+        lo, hi = (night_bounds or {}).get(e, (lo_n, hi_n))
+        if n_count[i] < lo and "N" not in (shift_masks or {}).get(e, ()):
+            out.append(Violation("min_night_shifts_per_employee", f"{e} N {n_count[i]}회 < 최소 {lo}회", employee=e))
+        if n_count[i] > hi:
+            out.append(Violation("max_night_shifts_per_employee", f"{e} N {n_count[i]}회 > 최대 {hi}회", employee=e))
+
+    # 일자 규칙: 하루 N 근무자, 동반 N 금지, 수요, 근무 인원 범위
+    per_day = np.zeros((OTHER + 1, horizon), dtype=np.int64)
+    for k in range(OTHER + 1):
+        per_day[k] = (codes == k).sum(axis=0)
+    max_n_day = int(constraints.get("max_night_workers_per_day", 0))
+    if max_n_day > 0:
+        for d in np.nonzero(per_day[_C["N"]] > max_n_day)[0]:
+            out.append(Violation("max_night_workers_per_day", f"D{d + 1} N {per_day[_C['N'], d]}명 > {max_n_day}명", day=int(d)))
+    group = [row[e] for e in (incompatible_employees or []) if e in row]
+    if len(group) >= 2:
+        together = (codes[group] == _C["N"]).sum(axis=0)
+        for d in np.nonzero(together > 1)[0]:
+            out.append(Violation("incompatible_employees", f"D{d + 1} 동반 N 금지 그룹 {together[d]}명 N", day=int(d)))
+    if demand:
+        for d, need_map in demand.items():
+            if 0 <= d < horizon:
+                for s in ("A", "B", "C", "N"):
+                    need = int(need_map.get(s, 0))
+                    if per_day[_C[s], d] != need:
+                        out.append(Violation("demand", f"D{d + 1} {s} {per_day[_C[s], d]}명 ≠ 수요 {need}명", day=int(d)))
+    else:
+        # scheduler 의 근무 인원 집계와 같이 A/B/C/N (A2 제외)
+        wc = per_day[[_C[s] for s in ("A", "B", "C", "N")]].sum(axis=0)
+        lo_w, hi_w = _workers_range(workers_per_day, min_workers_per_day, max_workers_per_day)
+        for d in np.nonzero(wc < lo_w)[0]:
+            out.append(Violation("min_workers_per_day", f"D{d + 1} 근무 {wc[d]}명 < 최소 {lo_w}명", day=int(d)))
+        if hi_w < _PARAM_MAX:
+            for d in np.nonzero(wc > hi_w)[0]:
+                out.append(Violation("max_workers_per_day", f"D{d + 1} 근무 {wc[d]}명 > 최대 {hi_w}명", day=int(d)))
+    return out
+
+
+def validate_many(
+    schedules: Sequence[Union[Dict[str, List[str]], ScheduleMatrix]], hours: Dict[str, int],
+    constraints: Dict[str, object], **inputs,
+) -> List[List[Violation]]:
+    """여러 근무표(배치 결과/후보)를 같은 규칙·입력으로 검사. inputs: validate_schedule 의 나머지 인자"""
+    return [validate_schedule(s, hours, constraints, **inputs) for s in schedules]
+
+
+def check_rules(
+    schedule: Dict[str, List[str]], hours: Dict[str, int], constraints: Optional[Dict[str, object]] = None, **inputs,
+) -> Dict[str, List[str]]:
+    """
+    사후검증: 위반 메시지를 직원별로 모아 리턴 (일자 규칙은 "(일자)" 키).
+    constraints 를 넘기면 validate_schedule 로 필수 규칙 전체를 검사하고,
+    생략하면 기존 동작대로 A 3연속만 확인 (inputs 는 무시)
     """
     msgs: Dict[str, List[str]] = {}
-    # 예시: 3연속 A 금지 확인
-    for e, days in schedule.items():
-        for i in range(len(days) - 2):
-            if days[i] == days[i+1] == days[i+2] == "A":
-                msgs.setdefault(e, []).append(f"D{i+1}~D{i+3} A 3연속")
-    return msgs
\ No newline at end of file
+    if constraints is None:
+        for e, days in schedule.items():
+            for i in range(len(days) - 2):
+                if days[i] == days[i + 1] == days[i + 2] == "A":
+                    msgs.setdefault(e, []).append(f"D{i + 1}~D{i + 3} A 3연속")
+        return msgs
+    for v in validate_schedule(schedule, hours, constraints, **inputs):
+        msgs.setdefault(v.employee or "(일자)", []).append(v.message)
+    return msgs
+
+
+def _imbalance(values: List[int], mode: str) -> int:
+    """scheduler 의 균등화 항과 같은 정의: pairwise |차| 합 / spread 최대-최소 / deviation |n*v - 합| 합"""
+    n = len(values)
+    if mode == "pairwise":
+        return sum(abs(values[i] - values[j]) for i in range(n) for j in range(i + 1, n))
+    if n < 2:
+        return 0
+    if mode == "spread":
+        return max(values) - min(values)
+    total = sum(values)
+    return sum(abs(n * v - total) for v in values)
+
+
+def evaluate_objective(
+    schedule: Dict[str, List[str]],
+    constraints: Dict[str, object],
+    weights: Dict[str, int],
+    history: Optional[Dict[str, List[str]]] = None,
+) -> Dict[str, int]:
+    """
+    근무표만으로 목적함수를 다시 계산 (솔버 변수와 무관한 독립 검산용).
+    history(경계 이력)를 함께 풀었다면 같은 값을 넘겨야 첫날에 걸친 벌점/보상이 맞음.
+    반환: 항목별 값 + "total" (솔버의 ObjectiveValue 와 같아야 함)
+    """
+    employees = list(schedule)
+    horizon = len(next(iter(schedule.values()), []))
+    mode = str(weights.get("balance_mode", "pairwise"))
+    rest = ("OFF", "VAC")
+    out: Dict[str, int] = {}
+
+    # 순서 벌점/보상은 이력 3일을 앞에 붙인 행에서, 마지막 날이 기간 안(>= lead)인 창만 셈
+    rows, leads = {}, {}
+    for e in employees:
+        hist = [str(s).strip().upper() for s in (history or {}).get(e, [])][-3:]
+        rows[e], leads[e] = hist + list(schedule[e]), len(hist)
+
+    w_emp = int(weights.get("balance_shift_counts_per_employee", 10))
+    out["balance_shift_counts_per_employee"] = w_emp * sum(
+        _imbalance([schedule[e].count(s) for e in employees], mode) for s in ("A", "B", "C")
+    )
+
+    w_day = int(weights.get("balance_total_workers_per_day", 1))
+    workcount = [sum(1 for e in employees if schedule[e][d] in ("A", "B", "C", "N")) for d in range(horizon)]
+    out["balance_total_workers_per_day"] = w_day * _imbalance(workcount, mode)
+
+    w_long = int(weights.get("penalty_too_long_rest_after_N", 5))
+    out["penalty_too_long_rest_after_N"] = w_long * sum(
+        1 for e in employees for d in range(max(0, leads[e] - 3), len(rows[e]) - 3)
+        if rows[e][d] == "N" and all(rows[e][t] in rest for t in range(d + 1, d + 4))
+    )
+
+    extra = 0
+    if int(constraints.get("min_off_after_N", 1)) == 1:
+        extra = 10 * sum(
+            1 for e in employees for d in range(max(0, leads[e] - 2), len(rows[e]) - 2)
+            if rows[e][d] == "N" and rows[e][d + 1] == "OFF" and rows[e][d + 2] == "OFF"
+        )
+    out["penalty_extra_rest_after_N"] = extra
+
+    reward = 0
+    if constraints.get("prefer_ideal_pattern", False):
+        pairs = {("C", "A"), ("A", "A2"), ("A2", "B"), ("B", "N")}
+        w_pattern = int(weights.get("reward_ideal_pattern", 3))
+        reward = -w_pattern * sum(
+            1 for e in employees for d in range(max(0, leads[e] - 1), len(rows[e]) - 1)
+            if (rows[e][d], rows[e][d + 1]) in pairs
+        )
+    out["prefer_ideal_pattern"] = reward
+
+    out["total"] = sum(out.values())
+    return out